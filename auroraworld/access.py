@@ -0,0 +1,86 @@
+from django.db import connections, transaction
+
+# user_link_access holds one row per (user, access level, link) and is kept in step with links and shares by
+# triggers, so single saves, bulk inserts, queryset updates and cascaded deletes are all covered.
+# Migrations that rebuild the links or shares table drop these triggers, so they must reinstall them from a copy
+# of this SQL, as 0006_user_link_access does.
+SHARE_LEVEL = "CASE WHEN {0}.is_writable THEN 'shared-writable' ELSE 'shared-unwritable' END"
+
+EXPECTED_SQL = f"""
+    SELECT user_id, id, 'own', category_id FROM links
+    UNION ALL
+    SELECT shares.user_id, shares.link_id, {SHARE_LEVEL.format('shares')}, links.category_id
+    FROM shares JOIN links ON links.id = shares.link_id
+"""
+
+ACTUAL_SQL = 'SELECT user_id, link_id, access_level, category_id FROM user_link_access'
+
+CREATE_SQL = [
+    """CREATE TRIGGER IF NOT EXISTS access_link_insert AFTER INSERT ON links BEGIN
+        INSERT INTO user_link_access (user_id, link_id, access_level, category_id)
+        VALUES (new.user_id, new.id, 'own', new.category_id);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS access_link_delete AFTER DELETE ON links BEGIN
+        DELETE FROM user_link_access WHERE link_id = old.id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS access_link_update AFTER UPDATE OF user_id, category_id ON links
+    WHEN old.user_id IS NOT new.user_id OR old.category_id IS NOT new.category_id BEGIN
+        UPDATE user_link_access SET category_id = new.category_id WHERE link_id = new.id;
+        UPDATE user_link_access SET user_id = new.user_id WHERE link_id = new.id AND access_level = 'own';
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS access_share_insert AFTER INSERT ON shares BEGIN
+        INSERT INTO user_link_access (user_id, link_id, access_level, category_id)
+        SELECT new.user_id, new.link_id, {SHARE_LEVEL.format('new')}, category_id FROM links WHERE id = new.link_id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS access_share_delete AFTER DELETE ON shares BEGIN
+        DELETE FROM user_link_access WHERE user_id = old.user_id AND link_id = old.link_id
+        AND access_level IN ('shared-writable', 'shared-unwritable');
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS access_share_update AFTER UPDATE OF user_id, link_id, is_writable ON shares
+    WHEN old.user_id IS NOT new.user_id OR old.link_id IS NOT new.link_id OR old.is_writable IS NOT new.is_writable
+    BEGIN
+        DELETE FROM user_link_access WHERE user_id = old.user_id AND link_id = old.link_id
+        AND access_level IN ('shared-writable', 'shared-unwritable');
+        INSERT INTO user_link_access (user_id, link_id, access_level, category_id)
+        SELECT new.user_id, new.link_id, {SHARE_LEVEL.format('new')}, category_id FROM links WHERE id = new.link_id;
+    END""",
+]
+
+DROP_SQL = [
+    'DROP TRIGGER IF EXISTS access_link_insert',
+    'DROP TRIGGER IF EXISTS access_link_delete',
+    'DROP TRIGGER IF EXISTS access_link_update',
+    'DROP TRIGGER IF EXISTS access_share_insert',
+    'DROP TRIGGER IF EXISTS access_share_delete',
+    'DROP TRIGGER IF EXISTS access_share_update',
+]
+
+REBUILD_SQL = [
+    'DELETE FROM user_link_access',
+    f'INSERT INTO user_link_access (user_id, link_id, access_level, category_id) {EXPECTED_SQL}',
+]
+
+MISSING_SQL = f'SELECT COUNT(*) FROM ({EXPECTED_SQL} EXCEPT {ACTUAL_SQL})'
+
+STALE_SQL = f'SELECT COUNT(*) FROM ({ACTUAL_SQL} EXCEPT SELECT * FROM ({EXPECTED_SQL}))'
+
+
+def is_supported(using='default'):
+    return connections[using].vendor == 'sqlite'
+
+
+def check(using='default'):
+    with connections[using].cursor() as cursor:
+        cursor.execute(MISSING_SQL)
+        missing = cursor.fetchone()[0]
+
+        cursor.execute(STALE_SQL)
+        stale = cursor.fetchone()[0]
+
+    return missing, stale
+
+
+def rebuild(using='default'):
+    with transaction.atomic(using=using), connections[using].cursor() as cursor:
+        for sql in CREATE_SQL + REBUILD_SQL:
+            cursor.execute(sql)
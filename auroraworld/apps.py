@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class AuroraworldConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'auroraworld'
+
+    def ready(self):
+        from . import signals  # noqa: F401
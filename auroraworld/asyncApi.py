@@ -0,0 +1,35 @@
+import json
+from functools import wraps
+
+from django.http import JsonResponse, HttpResponseNotModified
+
+
+def async_api_view(methods, parse_body=True):
+    # Django 4.2's method and csrf_exempt decorators only wrap sync views, so async views do both here.
+    # Views that stream the request body themselves pass parse_body=False.
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(request, *args, **kwargs):
+            if request.method not in methods:
+                return JsonResponse({'detail': f'Method "{request.method}" not allowed.'}, status=405)
+
+            try:
+                request.data = json.loads(request.body or b'{}') \
+                    if parse_body and request.method in ('POST', 'PUT') else {}
+            except ValueError:
+                return JsonResponse({'detail': 'JSON parse error'}, status=400)
+
+            return await func(request, *args, **kwargs)
+
+        wrapper.csrf_exempt = True
+
+        return wrapper
+
+    return decorator
+
+
+def not_modified(etag):
+    response = HttpResponseNotModified()
+    response['ETag'] = etag
+
+    return response
@@ -0,0 +1,151 @@
+import jwt
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import IntegrityError
+from django.http import JsonResponse
+
+from . import hashing
+from .asyncApi import async_api_view
+from .ids import new_id
+from .models import User
+from .ratelimit import arate_limit
+from .routers import aread_from_replica
+from .tokens import create_refresh_token, set_refresh_cookie, session_data, rotate_refresh_token, \
+    revoke_refresh_token
+
+
+@arate_limit
+@aread_from_replica
+@async_api_view(['GET'])
+async def refresh(request):
+    try:
+        refresh_token = request.COOKIES.get('refreshToken')
+
+        if not refresh_token:
+            return JsonResponse({'message': 'Refresh failed.'}, status=401)
+
+        result = jwt.decode(refresh_token, settings.REFRESH_TOKEN_SECRET, algorithms=['HS256'])
+
+        user_id = result.get('id')
+        email = result.get('email')
+
+        if not user_id or not email:
+            return JsonResponse({'message': 'Refresh failed.'}, status=401)
+
+        # Each refresh token is good for one refresh: it is revoked here and replaced by a new one.
+        session = await sync_to_async(rotate_refresh_token)(refresh_token, result)
+
+        if not session:
+            return JsonResponse({'message': 'Refresh failed.'}, status=401)
+
+        session_user_id, session_user_email = session
+
+        response = JsonResponse({
+            'message': 'Refreshed successfully.',
+            'data': session_data(session_user_id, session_user_email),
+        }, status=200)
+
+        set_refresh_cookie(response, create_refresh_token(session_user_id, session_user_email))
+
+        return response
+    except Exception as error:
+        print(error)
+
+        return JsonResponse({'message': 'Server Error'}, status=500)
+
+
+@arate_limit
+@async_api_view(['POST'])
+async def sign_in(request):
+    try:
+        email = request.data.get('email').strip()
+        password = request.data.get('password').strip()
+
+        if not email or not password:
+            return JsonResponse({'message': 'Invalid Input'}, status=400)
+
+        try:
+            existing_user = await User.objects.aget(email=email)
+        except User.DoesNotExist:
+            return JsonResponse({'message': 'Sign-in failed.'}, status=401)
+
+        is_match, rehashed_password = await hashing.acheck_password(password, existing_user.password)
+
+        if not is_match:
+            return JsonResponse({'message': 'Sign-in failed.'}, status=401)
+
+        if rehashed_password:
+            await User.objects.filter(id=existing_user.id).aupdate(password=rehashed_password)
+
+        refresh_token = create_refresh_token(existing_user.id, existing_user.email)
+
+        response = JsonResponse({
+            'message': 'Signed in successfully.',
+            'data': session_data(existing_user.id, existing_user.email),
+        }, status=200)
+
+        set_refresh_cookie(response, refresh_token)
+
+        return response
+    except Exception as error:
+        print(error)
+
+        return JsonResponse({'message': 'Server Error'}, status=500)
+
+
+@arate_limit
+@async_api_view(['POST'])
+async def sign_out(request):
+    try:
+        refresh_token = request.COOKIES.get('refreshToken')
+
+        if refresh_token:
+            await sync_to_async(revoke_refresh_token)(refresh_token)
+
+        response = JsonResponse({'message': 'Signed out successfully.'}, status=200)
+
+        response.delete_cookie('refreshToken')
+
+        return response
+    except Exception as error:
+        print(error)
+
+        return JsonResponse({'message': 'Server Error'}, status=500)
+
+
+@arate_limit
+@async_api_view(['POST'])
+async def sign_up(request):
+    try:
+        email = request.data.get('email').strip()
+        password = request.data.get('password').strip()
+
+        if not email or not password:
+            return JsonResponse({'message': 'Invalid Input'}, status=400)
+
+        if await User.objects.filter(email=email).aexists():
+            return JsonResponse({'message': 'User already exists.'}, status=409)
+
+        hashed_password = await hashing.amake_password(password)
+
+        try:
+            new_user = await User.objects.acreate(
+                id=new_id(),
+                email=email,
+                password=hashed_password
+            )
+        except IntegrityError:
+            # The email check above can lose a race with a concurrent sign-up.
+            return JsonResponse({'message': 'User already exists.'}, status=409)
+
+        return JsonResponse({
+            'message': 'User created successfully.',
+            'data': {
+                'id': new_user.id,
+                'email': new_user.email,
+            },
+        }, status=201)
+    except Exception as error:
+        print(error)
+
+        return JsonResponse({'message': 'Server Error'}, status=500)
@@ -0,0 +1,34 @@
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+
+from auroraworld.asyncApi import async_api_view, not_modified
+from auroraworld.category import get_registry
+from auroraworld.etag import etag_matches
+from auroraworld.ratelimit import arate_limit
+from auroraworld.routers import aread_from_replica
+from auroraworld.verifyToken import averify_token
+
+
+@arate_limit
+@averify_token
+@aread_from_replica
+@async_api_view(['GET'])
+async def get_categories(request):
+    try:
+        session_user_id = getattr(request, 'user_id', None)
+        session_user_email = getattr(request, 'user_email', None)
+
+        if not session_user_id or not session_user_email:
+            return JsonResponse({'message': 'Unauthorized'}, status=401)
+
+        registry = await sync_to_async(get_registry)()
+
+        if etag_matches(request, registry['etag']):
+            return not_modified(registry['etag'])
+
+        return JsonResponse({'message': '', 'data': registry['data']}, status=200,
+                            headers={'ETag': registry['etag']})
+    except Exception as error:
+        print(error)
+
+        return JsonResponse({'message': 'Server Error'}, status=500)
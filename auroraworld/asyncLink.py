@@ -0,0 +1,319 @@
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse, StreamingHttpResponse
+
+from .asyncApi import async_api_view, not_modified
+from .category import get_category_name
+from .etag import make_etag, etag_matches
+from .ids import new_id
+from .link import MAX_LIMIT, MAX_BATCH_OPERATIONS, STREAM_CHUNK_SIZE, filter_links, paginate_links, link_rows, \
+    serialize_link, serialize_row, page_rows, writable_links, filter_export_links, export_headers, apply_link_operations
+from .models import Link
+from .paging import parse_limit
+from .ratelimit import arate_limit
+from .renderers import FastJsonResponse, json_line
+from .routers import aread_from_replica, asticky_writes, pin_reads
+from .verifyToken import averify_token
+from .versions import aget_versions, links_key
+
+
+async def alinks_etag(session_user_id, mode, *params):
+    return make_etag(session_user_id, mode, *params, await aget_versions(links_key(session_user_id)))
+
+
+def next_chunk(rows):
+    return list(islice(rows, STREAM_CHUNK_SIZE))
+
+
+async def astream_links(existing_links):
+    # Django 4.2's values_list iterable runs its query as soon as iteration starts, so aiterator() would touch the
+    # database from the event loop. The sync iterator is drained a chunk at a time in a thread instead.
+    rows = link_rows(existing_links).iterator(chunk_size=STREAM_CHUNK_SIZE)
+
+    while True:
+        chunk = await sync_to_async(next_chunk)(rows)
+
+        for row in chunk:
+            yield json_line(serialize_row(row))
+
+        if len(chunk) < STREAM_CHUNK_SIZE:
+            break
+
+
+async def aexport_lines(encoder, existing_links):
+    yield encoder.header()
+
+    async for existing_link in existing_links:
+        yield encoder.encode(existing_link)
+
+    yield encoder.footer()
+
+
+@arate_limit
+@averify_token
+@asticky_writes
+@async_api_view(['POST'])
+async def add_link(request):
+    try:
+        category_id = request.data.get('categoryId').strip()
+        name = request.data.get('name').strip()
+        url = request.data.get('url').strip()
+
+        if not category_id or not name or not url:
+            return JsonResponse({'message': 'Invalid Input'}, status=400)
+
+        session_user_id = getattr(request, 'user_id', None)
+        session_user_email = getattr(request, 'user_email', None)
+
+        if not session_user_id or not session_user_email:
+            return JsonResponse({'message': 'Unauthorized'}, status=401)
+
+        category_name = await sync_to_async(get_category_name)(category_id)
+
+        if not category_name:
+            return JsonResponse({'message': 'Invalid Input'}, status=400)
+
+        new_link = await Link.objects.acreate(
+            id=new_id(),
+            user_id=session_user_id,
+            created_by=session_user_email,
+            category_id=category_id,
+            category_name=category_name,
+            name=name,
+            url=url,
+        )
+
+        return JsonResponse({
+            'message': 'Link created successfully.',
+            'data': serialize_link(new_link),
+        }, status=201)
+    except Exception as error:
+        print(error)
+
+        return JsonResponse({'message': 'Server Error'}, status=500)
+
+
+@arate_limit
+@averify_token
+@aread_from_replica
+@async_api_view(['GET'])
+async def get_links(request):
+    try:
+        mode = request.GET.get('mode').strip()
+        category_id = request.GET.get('categoryId').strip()
+        name = request.GET.get('name').strip()
+        limit = request.GET.get('limit', '').strip()
+        cursor = request.GET.get('cursor', '').strip()
+        output_format = request.GET.get('output', '').strip()
+
+        try:
+            limit = parse_limit(limit, cursor, MAX_LIMIT)
+        except ValueError:
+            return JsonResponse({'message': 'Invalid Input'}, status=400)
+
+        session_user_id = getattr(request, 'user_id', None)
+        session_user_email = getattr(request, 'user_email', None)
+
+        if not session_user_id or not session_user_email:
+            return JsonResponse({'message': 'Unauthorized'}, status=401)
+
+        existing_links = filter_links(session_user_id, mode, category_id, name)
+
+        etag = await alinks_etag(session_user_id, mode, category_id, name, limit, cursor, output_format)
+
+        if etag_matches(request, etag):
+            return not_modified(etag)
+
+        if cursor:
+            existing_links = paginate_links(existing_links, cursor)
+
+        if output_format == 'ndjson':
+            if limit:
+                existing_links = existing_links[:limit]
+
+            return StreamingHttpResponse(astream_links(pin_reads(existing_links)), content_type='application/x-ndjson',
+                                         status=200, headers={'ETag': etag})
+
+        next_cursor = None
+        rows = link_rows(existing_links)
+
+        if limit:
+            rows = rows[:limit + 1]
+
+        rows = [row async for row in rows]
+
+        if limit:
+            rows, next_cursor = page_rows(rows, limit)
+
+        return FastJsonResponse({'message': '', 'data': [
+            serialize_row(row)
+            for row in rows
+        ], 'next': next_cursor}, status=200, headers={'ETag': etag})
+    except Exception as error:
+        print(error)
+
+        return JsonResponse({'message': 'Server Error'}, status=500)
+
+
+@arate_limit
+@averify_token
+@asticky_writes
+@async_api_view(['DELETE', 'PUT'])
+async def remove_update_link(request, link_id):
+    try:
+        if request.method == 'DELETE':
+            if not link_id.strip():
+                return JsonResponse({'message': 'Invalid Input'}, status=400)
+
+            session_user_id = getattr(request, 'user_id', None)
+            session_user_email = getattr(request, 'user_email', None)
+
+            if not session_user_id or not session_user_email:
+                return JsonResponse({'message': 'Unauthorized'}, status=401)
+
+            deleted_link = await Link.objects.filter(id=link_id, user_id=session_user_id).afirst()
+
+            if not deleted_link:
+                return JsonResponse({'message': 'No link removed.'}, status=400)
+
+            deleted_count, _ = await deleted_link.adelete()
+
+            if 0 < deleted_count:
+                return JsonResponse({'message': 'Link removed successfully.'}, status=200)
+            else:
+                return JsonResponse({'message': 'No link removed.'}, status=400)
+        elif request.method == 'PUT':
+            category_id = request.data.get('categoryId').strip()
+            name = request.data.get('name').strip()
+            url = request.data.get('url').strip()
+
+            if not link_id.strip() or not category_id or not name or not url:
+                return JsonResponse({'message': 'Invalid Input'}, status=400)
+
+            session_user_id = getattr(request, 'user_id', None)
+            session_user_email = getattr(request, 'user_email', None)
+
+            if not session_user_id or not session_user_email:
+                return JsonResponse({'message': 'Unauthorized'}, status=401)
+
+            category_name = await sync_to_async(get_category_name)(category_id)
+
+            if not category_name:
+                return JsonResponse({'message': 'Invalid Input'}, status=400)
+
+            updated_link = await writable_links(session_user_id).filter(id=link_id).afirst()
+
+            if not updated_link:
+                return JsonResponse({'message': 'No link updated.'}, status=400)
+
+            updated_link.category_id = category_id
+            updated_link.category_name = category_name
+            updated_link.name = name
+            updated_link.url = url
+            await updated_link.asave()
+
+            return JsonResponse({'message': 'Link updated successfully.', 'data': serialize_link(updated_link)},
+                                status=200)
+    except Exception as error:
+        print(error)
+
+        return JsonResponse({'message': 'Server Error'}, status=500)
+
+
+@arate_limit
+@averify_token
+@asticky_writes
+@async_api_view(['POST'], parse_body=False)
+async def import_links(request):
+    try:
+        default_category_id = request.GET.get('categoryId', '').strip()
+
+        session_user_id = getattr(request, 'user_id', None)
+        session_user_email = getattr(request, 'user_email', None)
+
+        if not session_user_id or not session_user_email:
+            return JsonResponse({'message': 'Unauthorized'}, status=401)
+
+        # Imported here so workers that never import or export links skip the csv and html parsers.
+        from . import transfer
+
+        reader = transfer.get_reader(request.content_type)
+
+        if not reader:
+            return JsonResponse({'message': 'Invalid Input'}, status=400)
+
+        # Batches commit in their own transactions, which the async ORM cannot open yet.
+        result = await sync_to_async(transfer.import_rows)(session_user_id, session_user_email, reader(request),
+                                                           default_category_id)
+
+        if 0 < result['created']:
+            return JsonResponse({'message': 'Links imported successfully.', 'data': result}, status=201)
+        else:
+            return JsonResponse({'message': 'No link imported.', 'data': result}, status=400)
+    except Exception as error:
+        print(error)
+
+        return JsonResponse({'message': 'Server Error'}, status=500)
+
+
+@arate_limit
+@averify_token
+@aread_from_replica
+@async_api_view(['GET'])
+async def export_links(request):
+    try:
+        mode = request.GET.get('mode', '').strip()
+        category_id = request.GET.get('categoryId', '').strip()
+        output_format = request.GET.get('output', '').strip()
+
+        session_user_id = getattr(request, 'user_id', None)
+        session_user_email = getattr(request, 'user_email', None)
+
+        if not session_user_id or not session_user_email:
+            return JsonResponse({'message': 'Unauthorized'}, status=401)
+
+        from . import transfer
+
+        encoder = transfer.get_encoder(output_format)
+
+        if not encoder:
+            return JsonResponse({'message': 'Invalid Input'}, status=400)
+
+        existing_links = pin_reads(filter_export_links(session_user_id, mode, category_id, output_format))
+
+        return StreamingHttpResponse(
+            aexport_lines(encoder, existing_links.aiterator(chunk_size=STREAM_CHUNK_SIZE)),
+            content_type=encoder.content_type, status=200, headers=export_headers(encoder),
+        )
+    except Exception as error:
+        print(error)
+
+        return JsonResponse({'message': 'Server Error'}, status=500)
+
+
+@arate_limit
+@averify_token
+@asticky_writes
+@async_api_view(['POST'])
+async def batch_links(request):
+    try:
+        operations = request.data.get('operations')
+
+        if not operations or not isinstance(operations, list) or MAX_BATCH_OPERATIONS < len(operations):
+            return JsonResponse({'message': 'Invalid Input'}, status=400)
+
+        session_user_id = getattr(request, 'user_id', None)
+        session_user_email = getattr(request, 'user_email', None)
+
+        if not session_user_id or not session_user_email:
+            return JsonResponse({'message': 'Unauthorized'}, status=401)
+
+        # The batch runs in one transaction, which the async ORM cannot open yet.
+        results = await sync_to_async(apply_link_operations)(session_user_id, operations)
+
+        return JsonResponse({'message': 'Batch applied.', 'data': results}, status=200)
+    except Exception as error:
+        print(error)
+
+        return JsonResponse({'message': 'Server Error'}, status=500)
@@ -0,0 +1,218 @@
+from asgiref.sync import sync_to_async
+from django.db import IntegrityError
+from django.http import JsonResponse
+
+from auroraworld.asyncApi import async_api_view, not_modified
+from auroraworld.etag import make_etag, etag_matches
+from auroraworld.ids import new_id
+from auroraworld.models import Link, User, Share
+from auroraworld.ratelimit import arate_limit
+from auroraworld.renderers import FastJsonResponse
+from auroraworld.routers import aread_from_replica, asticky_writes
+from auroraworld.share import MAX_BATCH_OPERATIONS, create_shares, apply_share_operations, serialize_share
+from auroraworld.verifyToken import averify_token
+from auroraworld.versions import aget_versions, shares_key
+
+
+async def ashares_etag(session_user_id, link_id):
+    return make_etag(session_user_id, link_id, await aget_versions(shares_key(link_id)))
+
+
+@arate_limit
+@averify_token
+@asticky_writes
+@async_api_view(['POST'])
+async def add_share(request):
+    try:
+        share_id = request.data.get('linkId').strip()
+        user_id = request.data.get('userId').strip()
+        is_writable = request.data.get('isWritable')
+
+        if not share_id or not user_id:
+            return JsonResponse({'message': 'Invalid Input'}, status=400)
+
+        session_user_id = getattr(request, 'user_id', None)
+        session_user_email = getattr(request, 'user_email', None)
+
+        if not session_user_id or not session_user_email:
+            return JsonResponse({'message': 'Unauthorized'}, status=401)
+
+        try:
+            existing_link = await Link.objects.aget(id=share_id)
+        except Link.DoesNotExist:
+            return JsonResponse({'message': 'Invalid Input'}, status=400)
+
+        try:
+            existing_user = await User.objects.aget(id=user_id)
+        except User.DoesNotExist:
+            return JsonResponse({'message': 'Invalid Input'}, status=400)
+
+        try:
+            new_share = await Share.objects.acreate(
+                id=new_id(),
+                link=existing_link,
+                user=existing_user,
+                user_email=existing_user.email,
+                is_writable=1 if is_writable else 0,
+            )
+        except IntegrityError:
+            return JsonResponse({'message': 'Share already exists.'}, status=409)
+
+        return JsonResponse({
+            'message': 'Share created successfully.',
+            'data': serialize_share(new_share),
+        }, status=201)
+    except Exception as error:
+        print(error)
+
+        return JsonResponse({'message': 'Server Error'}, status=500)
+
+
+@arate_limit
+@averify_token
+@asticky_writes
+@async_api_view(['POST'])
+async def add_shares(request):
+    try:
+        link_ids = request.data.get('linkIds')
+        user_ids = request.data.get('userIds')
+        is_writable = request.data.get('isWritable')
+
+        if not link_ids or not isinstance(link_ids, list) or len(link_ids) <= 0 \
+                or not user_ids or not isinstance(user_ids, list) or len(user_ids) <= 0:
+            return JsonResponse({'message': 'Invalid Input'}, status=400)
+
+        session_user_id = getattr(request, 'user_id', None)
+        session_user_email = getattr(request, 'user_email', None)
+
+        if not session_user_id or not session_user_email:
+            return JsonResponse({'message': 'Unauthorized'}, status=401)
+
+        # The async ORM has no transactions yet, so the bulk insert keeps running in a thread.
+        created_shares = await sync_to_async(create_shares)(session_user_id, link_ids, user_ids, is_writable)
+
+        if 0 < len(created_shares):
+            return JsonResponse({
+                'message': 'Shares created successfully.',
+                'data': created_shares
+            }, status=201)
+        else:
+            return JsonResponse({'message': 'No share created.'}, status=400)
+    except Exception as error:
+        print(error)
+
+        return JsonResponse({'message': 'Server Error'}, status=500)
+
+
+@arate_limit
+@averify_token
+@aread_from_replica
+@async_api_view(['GET'])
+async def get_shares(request, link_id):
+    try:
+        if not link_id.strip():
+            return JsonResponse({'message': 'Invalid Input'}, status=400)
+
+        session_user_id = getattr(request, 'user_id', None)
+        session_user_email = getattr(request, 'user_email', None)
+
+        if not session_user_id or not session_user_email:
+            return JsonResponse({'message': 'Unauthorized'}, status=401)
+
+        existing_shares = Share.objects.filter(link_id=link_id, link__user_id=session_user_id)
+
+        etag = await ashares_etag(session_user_id, link_id)
+
+        if etag_matches(request, etag):
+            return not_modified(etag)
+
+        return FastJsonResponse({'message': '', 'data': [
+            serialize_share(existing_share)
+            async for existing_share in existing_shares
+        ]}, status=200, headers={'ETag': etag})
+    except Exception as error:
+        print(error)
+
+        return JsonResponse({'message': 'Server Error'}, status=500)
+
+
+@arate_limit
+@averify_token
+@asticky_writes
+@async_api_view(['DELETE', 'PUT'])
+async def remove_update_share(request, share_id):
+    try:
+        if request.method == 'DELETE':
+            if not share_id.strip():
+                return JsonResponse({'message': 'Invalid Input'}, status=400)
+
+            session_user_id = getattr(request, 'user_id', None)
+            session_user_email = getattr(request, 'user_email', None)
+
+            if not session_user_id or not session_user_email:
+                return JsonResponse({'message': 'Unauthorized'}, status=401)
+
+            deleted_share = await Share.objects.filter(id=share_id, link__user_id=session_user_id).afirst()
+
+            if not deleted_share:
+                return JsonResponse({'message': 'No share removed.'}, status=400)
+
+            deleted_count, _ = await deleted_share.adelete()
+
+            if 0 < deleted_count:
+                return JsonResponse({'message': 'Share removed successfully.'}, status=200)
+            else:
+                return JsonResponse({'message': 'No share removed.'}, status=400)
+        elif request.method == 'PUT':
+            is_writable = request.data.get('isWritable')
+
+            if not share_id.strip():
+                return JsonResponse({'message': 'Invalid Input'}, status=400)
+
+            session_user_id = getattr(request, 'user_id', None)
+            session_user_email = getattr(request, 'user_email', None)
+
+            if not session_user_id or not session_user_email:
+                return JsonResponse({'message': 'Unauthorized'}, status=401)
+
+            updated_share = await Share.objects.filter(id=share_id, link__user_id=session_user_id).afirst()
+
+            if not updated_share:
+                return JsonResponse({'message': 'No share updated.'}, status=400)
+
+            updated_share.is_writable = is_writable
+            await updated_share.asave()
+
+            return JsonResponse({'message': 'Share updated successfully.', 'data': serialize_share(updated_share)},
+                                status=200)
+    except Exception as error:
+        print(error)
+
+        return JsonResponse({'message': 'Server Error'}, status=500)
+
+
+@arate_limit
+@averify_token
+@asticky_writes
+@async_api_view(['POST'])
+async def batch_shares(request):
+    try:
+        operations = request.data.get('operations')
+
+        if not operations or not isinstance(operations, list) or MAX_BATCH_OPERATIONS < len(operations):
+            return JsonResponse({'message': 'Invalid Input'}, status=400)
+
+        session_user_id = getattr(request, 'user_id', None)
+        session_user_email = getattr(request, 'user_email', None)
+
+        if not session_user_id or not session_user_email:
+            return JsonResponse({'message': 'Unauthorized'}, status=401)
+
+        # The batch runs in one transaction, which the async ORM cannot open yet.
+        results = await sync_to_async(apply_share_operations)(session_user_id, operations)
+
+        return JsonResponse({'message': 'Batch applied.', 'data': results}, status=200)
+    except Exception as error:
+        print(error)
+
+        return JsonResponse({'message': 'Server Error'}, status=500)
@@ -0,0 +1,79 @@
+from django.http import JsonResponse
+
+from auroraworld.asyncApi import async_api_view, not_modified
+from auroraworld.etag import make_etag, etag_matches
+from auroraworld.paging import parse_limit
+from auroraworld.ratelimit import arate_limit
+from auroraworld.renderers import FastJsonResponse
+from auroraworld.routers import aread_from_replica
+from auroraworld.user import MAX_LIMIT, filter_users, paginate_users, page_cursor, filter_recent_recipients, \
+    serialize_user
+from auroraworld.verifyToken import averify_token
+from auroraworld.versions import USERS_KEY, aget_versions, links_key
+
+
+@arate_limit
+@averify_token
+@aread_from_replica
+@async_api_view(['GET'])
+async def get_users(request):
+    try:
+        q = request.GET.get('q', '').strip()
+        limit = request.GET.get('limit', '').strip()
+        cursor = request.GET.get('cursor', '').strip()
+        recent = request.GET.get('recent', '').strip() in ('1', 'true')
+
+        try:
+            limit = parse_limit(limit, cursor, MAX_LIMIT)
+        except ValueError:
+            return JsonResponse({'message': 'Invalid Input'}, status=400)
+
+        session_user_id = getattr(request, 'user_id', None)
+        session_user_email = getattr(request, 'user_email', None)
+
+        if not session_user_id or not session_user_email:
+            return JsonResponse({'message': 'Unauthorized'}, status=401)
+
+        existing_users = filter_users(session_user_id, q)
+
+        # The directory changes with any user; the recent recipients with the shares on the caller's links.
+        versions = await aget_versions(USERS_KEY, links_key(session_user_id))
+        etag = make_etag(session_user_id, q, limit, cursor, recent, versions)
+
+        if etag_matches(request, etag):
+            return not_modified(etag)
+
+        recent_users = []
+
+        if recent:
+            recent_user_ids = [user_id async for user_id in filter_recent_recipients(session_user_id, limit)]
+
+            if not cursor:
+                recent_users = sorted([
+                    existing_user async for existing_user in existing_users.filter(id__in=recent_user_ids)
+                ], key=lambda existing_user: recent_user_ids.index(existing_user.id))
+
+            existing_users = existing_users.exclude(id__in=recent_user_ids)
+
+        if cursor:
+            existing_users = paginate_users(existing_users, cursor)
+
+        next_cursor = None
+
+        if limit:
+            page_limit = limit - len(recent_users)
+            existing_users = existing_users[:page_limit + 1]
+
+        existing_users = [existing_user async for existing_user in existing_users]
+
+        if limit:
+            existing_users, next_cursor = page_cursor(existing_users, page_limit)
+
+        return FastJsonResponse({'message': '', 'data': [
+            serialize_user(existing_user)
+            for existing_user in recent_users + existing_users
+        ], 'next': next_cursor}, status=200, headers={'ETag': etag})
+    except Exception as error:
+        print(error)
+
+        return JsonResponse({'message': 'Server Error'}, status=500)
@@ -1,16 +1,20 @@
-import datetime
-import uuid
-
 import jwt
 from django.conf import settings
-from django.contrib.auth.hashers import make_password, check_password
 from django.db import IntegrityError
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 
+from . import hashing
+from .ids import new_id
 from .models import User
+from .ratelimit import rate_limit
+from .routers import read_from_replica
+from .tokens import create_refresh_token, set_refresh_cookie, session_data, rotate_refresh_token, \
+    revoke_refresh_token
 
 
+@rate_limit
+@read_from_replica
 @api_view(['GET'])
 def refresh(request):
     try:
@@ -19,10 +23,7 @@ def refresh(request):
         if not refresh_token:
             return Response({'message': 'Refresh failed.'}, status=401)
 
-        access_token_secret = settings.ACCESS_TOKEN_SECRET
-        refresh_token_secret = settings.REFRESH_TOKEN_SECRET
-
-        result = jwt.decode(refresh_token, refresh_token_secret, algorithms=['HS256'])
+        result = jwt.decode(refresh_token, settings.REFRESH_TOKEN_SECRET, algorithms=['HS256'])
 
         user_id = result.get('id')
         email = result.get('email')
@@ -30,32 +31,29 @@ def refresh(request):
         if not user_id or not email:
             return Response({'message': 'Refresh failed.'}, status=401)
 
-        try:
-            existing_user = User.objects.get(id=user_id)
-        except User.DoesNotExist:
+        # Each refresh token is good for one refresh: it is revoked here and replaced by a new one.
+        session = rotate_refresh_token(refresh_token, result)
+
+        if not session:
             return Response({'message': 'Refresh failed.'}, status=401)
 
-        access_token = jwt.encode({
-            'id': existing_user.id,
-            'email': existing_user.email,
-            'iat': datetime.datetime.utcnow(),
-            'exp': datetime.datetime.utcnow() + datetime.timedelta(days=1),
-        }, access_token_secret, algorithm='HS256')
+        session_user_id, session_user_email = session
 
-        return Response({
+        response = Response({
             'message': 'Refreshed successfully.',
-            'data': {
-                'accessToken': access_token,
-                'id': existing_user.id,
-                'email': existing_user.email,
-            },
+            'data': session_data(session_user_id, session_user_email),
         }, status=200)
+
+        set_refresh_cookie(response, create_refresh_token(session_user_id, session_user_email))
+
+        return response
     except Exception as error:
         print(error)
 
         return Response({'message': 'Server Error'}, status=500)
 
 
+@rate_limit
 @api_view(['POST'])
 def sign_in(request):
     try:
@@ -70,43 +68,22 @@ def sign_in(request):
         except User.DoesNotExist:
             return Response({'message': 'Sign-in failed.'}, status=401)
 
-        is_match = check_password(password, existing_user.password)
+        is_match, rehashed_password = hashing.check_password(password, existing_user.password)
 
         if not is_match:
             return Response({'message': 'Sign-in failed.'}, status=401)
 
-        access_token_secret = settings.ACCESS_TOKEN_SECRET
-        refresh_token_secret = settings.REFRESH_TOKEN_SECRET
+        if rehashed_password:
+            User.objects.filter(id=existing_user.id).update(password=rehashed_password)
 
-        access_token = jwt.encode({
-            'id': existing_user.id,
-            'email': existing_user.email,
-            'exp': datetime.datetime.utcnow() + datetime.timedelta(days=1)
-        }, access_token_secret, algorithm='HS256')
-
-        refresh_token = jwt.encode({
-            'id': existing_user.id,
-            'email': existing_user.email,
-            'exp': datetime.datetime.utcnow() + datetime.timedelta(days=7)
-        }, refresh_token_secret, algorithm='HS256')
+        refresh_token = create_refresh_token(existing_user.id, existing_user.email)
 
         response = Response({
             'message': 'Signed in successfully.',
-            'data': {
-                'accessToken': access_token,
-                'id': existing_user.id,
-                'email': existing_user.email
-            }
+            'data': session_data(existing_user.id, existing_user.email),
         }, status=200)
 
-        response.set_cookie(
-            key='refreshToken',
-            value=refresh_token,
-            httponly=True,
-            max_age=7 * 24 * 60 * 60,
-            samesite='None',
-            secure=True
-        )
+        set_refresh_cookie(response, refresh_token)
 
         return response
     except Exception as error:
@@ -115,9 +92,15 @@ def sign_in(request):
         return Response({'message': 'Server Error'}, status=500)
 
 
+@rate_limit
 @api_view(['POST'])
 def sign_out(request):
     try:
+        refresh_token = request.COOKIES.get('refreshToken')
+
+        if refresh_token:
+            revoke_refresh_token(refresh_token)
+
         response = Response({'message': 'Signed out successfully.'}, status=200)
 
         response.delete_cookie('refreshToken')
@@ -129,6 +112,7 @@ def sign_out(request):
         return Response({'message': 'Server Error'}, status=500)
 
 
+@rate_limit
 @api_view(['POST'])
 def sign_up(request):
     try:
@@ -143,34 +127,17 @@ def sign_up(request):
         if len(existing_users) != 0:
             return Response({'message': 'User already exists.'}, status=409)
 
-        hashed_password = make_password(password)
-
-        new_user = None
+        hashed_password = hashing.make_password(password)
 
-        attempts = 0
-        max_attempts = 5
-        while attempts < max_attempts:
-            user_id = uuid.uuid4().hex
-
-            try:
-                new_user = User.objects.create(
-                    id=user_id,
-                    email=email,
-                    password=hashed_password
-                )
-
-                break
-            except IntegrityError as error:
-                error_str = str(error).lower()
-
-                if 'users.email' in error_str:
-                    return Response({'message': 'User already exists.'}, status=409)
-                elif 'users.id' in error_str:
-                    attempts += 1
-
-                    continue
-                else:
-                    raise error
+        try:
+            new_user = User.objects.create(
+                id=new_id(),
+                email=email,
+                password=hashed_password
+            )
+        except IntegrityError:
+            # The email check above can lose a race with a concurrent sign-up.
+            return Response({'message': 'User already exists.'}, status=409)
 
         return Response({
             'message': 'User created successfully.',
@@ -0,0 +1,535 @@
+import json
+import os
+import random
+import re
+import shutil
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.db import connections, transaction
+from django.test import Client
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from .category import get_registry
+from .ids import new_id
+from .models import Link, RevokedToken, Share, User
+from .tokens import create_access_token, create_refresh_token
+
+BENCHMARK_EMAIL_PREFIX = 'bench-'
+BENCHMARK_PASSWORD = 'benchmark-password'
+SEED_BATCH_SIZE = 1000
+
+METRIC_PATTERN = re.compile(r'^auroraworld_request_queries_(sum|count)\{route="(.*)",method="(.*)"\} (\S+)$')
+
+
+@contextmanager
+def temporary_database():
+    # A throwaway SQLite file built by the test runner machinery, so a run never touches db.sqlite3. The test
+    # environment also runs with DEBUG off, so connections do not keep a log of every query.
+    setup_test_environment()
+
+    directory = tempfile.mkdtemp()
+    connection = connections['default']
+    old_name = connection.settings_dict['NAME']
+
+    connection.settings_dict['TEST']['NAME'] = os.path.join(directory, 'benchmark.sqlite3')
+
+    try:
+        name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+
+        for alias in connections:
+            if alias != 'default':
+                connections[alias].close()
+                connections[alias].settings_dict['NAME'] = name
+
+        call_command('loaddata', 'default', verbosity=0)
+
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        shutil.rmtree(directory, ignore_errors=True)
+        teardown_test_environment()
+
+
+def clear():
+    users = User.objects.filter(email__startswith=BENCHMARK_EMAIL_PREFIX)
+
+    RevokedToken.objects.filter(user_id__in=users.values('id')).delete()
+    Share.objects.filter(link__user__in=users).delete()
+    Share.objects.filter(user__in=users).delete()
+    Link.objects.filter(user__in=users).delete()
+    users.delete()
+
+
+def seed(users, links_per_user, shares_per_link, seed_value=0):
+    # Synthetic users, links and shares written through the models, so the search and access triggers run.
+    generator = random.Random(seed_value)
+    category_names = get_registry()['names']
+    category_ids = sorted(category_names)
+    password = make_password(BENCHMARK_PASSWORD)
+
+    with transaction.atomic():
+        clear()
+
+        new_users = [
+            User(id=new_id(), email=f'{BENCHMARK_EMAIL_PREFIX}{index}@example.com', password=password)
+            for index in range(users)
+        ]
+        User.objects.bulk_create(new_users, batch_size=SEED_BATCH_SIZE)
+
+        new_links = []
+
+        for user in new_users:
+            for index in range(links_per_user):
+                category_id = generator.choice(category_ids)
+
+                new_links.append(Link(
+                    id=new_id(),
+                    user=user,
+                    created_by=user.email,
+                    category_id=category_id,
+                    category_name=category_names[category_id],
+                    name=f'Link {index} {generator.choice(["guide", "notes", "docs", "news", "video"])}',
+                    url=f'https://example.com/{user.id}/{index}',
+                ))
+
+        Link.objects.bulk_create(new_links, batch_size=SEED_BATCH_SIZE)
+
+        new_shares = []
+        fan_out = min(shares_per_link, users - 1)
+
+        for link in new_links:
+            for user in generator.sample([user for user in new_users if user.id != link.user_id], fan_out):
+                new_shares.append(Share(
+                    id=new_id(),
+                    link=link,
+                    user=user,
+                    user_email=user.email,
+                    is_writable=generator.random() < 0.5,
+                ))
+
+        Share.objects.bulk_create(new_shares, batch_size=SEED_BATCH_SIZE)
+
+    return {'users': len(new_users), 'links': len(new_links), 'shares': len(new_shares)}
+
+
+class Dataset:
+    # The seeded rows a scenario picks its requests from, read back from whichever database was seeded.
+    def __init__(self, seed_value=0):
+        self.generator = random.Random(seed_value)
+        self.users = list(User.objects.filter(email__regex=rf'^{BENCHMARK_EMAIL_PREFIX}[0-9]+@')
+                          .order_by('id').values_list('id', 'email'))
+        self.category_ids = sorted(get_registry()['names'])
+
+        if len(self.users) < 2:
+            raise ValueError('Seed at least two benchmark users first.')
+
+        self.links = {}
+        self.shares = {}
+
+        for link_id, user_id in Link.objects.filter(user_id__in=self.user_ids()).values_list('id', 'user_id'):
+            self.links.setdefault(user_id, []).append(link_id)
+
+        for share_id, link_id, user_id in Share.objects.filter(link__user_id__in=self.user_ids()) \
+                .values_list('id', 'link_id', 'link__user_id'):
+            self.shares.setdefault(user_id, []).append((share_id, link_id))
+
+    def user_ids(self):
+        return [user_id for user_id, _ in self.users]
+
+    def user(self):
+        return self.generator.choice(self.users)
+
+    def owner(self):
+        # A user with at least one shared link, so every link and share scenario has something to act on.
+        return self.generator.choice([user for user in self.users if self.shares.get(user[0])])
+
+    def other_users(self, user_id, count):
+        # Fewer users than asked for just means a smaller fan-out, as when seeding the shares.
+        population = [user for user in self.users if user[0] != user_id]
+
+        return self.generator.sample(population, min(count, len(population)))
+
+    def fresh_links(self, user, count):
+        # Share scenarios need links nobody has been shared yet; they are created before the clock starts.
+        category_id = self.generator.choice(self.category_ids)
+        category_name = get_registry()['names'][category_id]
+        new_links = [
+            Link(id=new_id(), user_id=user[0], created_by=user[1], category_id=category_id,
+                 category_name=category_name, name='Fresh link', url='https://example.com/fresh')
+            for _ in range(count)
+        ]
+
+        Link.objects.bulk_create(new_links, batch_size=SEED_BATCH_SIZE)
+
+        return [link.id for link in new_links]
+
+
+def request_spec(method, path, user=None, body=None, content_type='application/json', refresh_token=None):
+    headers = {}
+
+    if user:
+        headers['Authorization'] = 'Bearer ' + create_access_token(*user)
+
+    if refresh_token:
+        headers['Cookie'] = f'refreshToken={refresh_token}'
+
+    if body is not None and not isinstance(body, bytes):
+        body = json.dumps(body).encode()
+
+    return {'method': method, 'path': path, 'headers': headers, 'body': body, 'content_type': content_type}
+
+
+def build_index(dataset, count):
+    return [request_spec('GET', '/') for _ in range(count)]
+
+
+def metrics_headers():
+    return {'Authorization': f'Bearer {settings.METRICS_TOKEN}'} if settings.METRICS_TOKEN else {}
+
+
+def build_metrics(dataset, count):
+    specs = [request_spec('GET', '/metrics') for _ in range(count)]
+
+    for spec in specs:
+        spec['headers'].update(metrics_headers())
+
+    return specs
+
+
+def build_refresh(dataset, count):
+    return [request_spec('GET', '/auth/refresh', refresh_token=create_refresh_token(*dataset.user()))
+            for _ in range(count)]
+
+
+def build_sign_in(dataset, count):
+    return [request_spec('POST', '/auth/sign-in', body={'email': dataset.user()[1], 'password': BENCHMARK_PASSWORD})
+            for _ in range(count)]
+
+
+def build_sign_out(dataset, count):
+    return [request_spec('POST', '/auth/sign-out', refresh_token=create_refresh_token(*dataset.user()))
+            for _ in range(count)]
+
+
+def build_sign_up(dataset, count):
+    return [request_spec('POST', '/auth/sign-up', body={
+        'email': f'{BENCHMARK_EMAIL_PREFIX}signup-{new_id()}@example.com', 'password': BENCHMARK_PASSWORD,
+    }) for _ in range(count)]
+
+
+def build_categories(dataset, count):
+    return [request_spec('GET', '/api/categories', dataset.user()) for _ in range(count)]
+
+
+def build_add_link(dataset, count):
+    return [request_spec('POST', '/api/link', dataset.user(), {
+        'categoryId': dataset.generator.choice(dataset.category_ids), 'name': 'Added link',
+        'url': 'https://example.com/added',
+    }) for _ in range(count)]
+
+
+def build_links(mode, name=''):
+    def build(dataset, count):
+        return [request_spec('GET', f'/api/links?mode={mode}&categoryId=all&name={name}', dataset.user())
+                for _ in range(count)]
+
+    return build
+
+
+def build_import(dataset, count):
+    def body():
+        category_id = dataset.generator.choice(dataset.category_ids)
+
+        return ''.join(json.dumps({'categoryId': category_id, 'name': f'Imported {index}',
+                                   'url': f'https://example.com/imported/{index}'}) + '\n'
+                       for index in range(10)).encode()
+
+    return [request_spec('POST', '/api/links/import', dataset.user(), body(), 'application/x-ndjson')
+            for _ in range(count)]
+
+
+def build_export(dataset, count):
+    return [request_spec('GET', '/api/links/export?mode=own&categoryId=all&output=ndjson', dataset.user())
+            for _ in range(count)]
+
+
+def build_batch_links(dataset, count):
+    specs = []
+
+    for _ in range(count):
+        user = dataset.owner()
+        link_ids = dataset.generator.sample(dataset.links[user[0]], min(10, len(dataset.links[user[0]])))
+
+        specs.append(request_spec('POST', '/api/links/batch', user, {'operations': [
+            {'op': 'update', 'id': link_id, 'categoryId': dataset.generator.choice(dataset.category_ids),
+             'name': 'Batch updated', 'url': 'https://example.com/batch'}
+            for link_id in link_ids
+        ]}))
+
+    return specs
+
+
+def build_update_link(dataset, count):
+    specs = []
+
+    for _ in range(count):
+        user = dataset.owner()
+
+        specs.append(request_spec('PUT', f'/api/link/{dataset.generator.choice(dataset.links[user[0]])}', user, {
+            'categoryId': dataset.generator.choice(dataset.category_ids), 'name': 'Updated link',
+            'url': 'https://example.com/updated',
+        }))
+
+    return specs
+
+
+def build_add_share(dataset, count):
+    user = dataset.owner()
+    link_ids = dataset.fresh_links(user, count)
+
+    return [request_spec('POST', '/api/share', user, {
+        'linkId': link_id, 'userId': dataset.other_users(user[0], 1)[0][0], 'isWritable': True,
+    }) for link_id in link_ids]
+
+
+def build_add_shares(dataset, count):
+    user = dataset.owner()
+    link_ids = dataset.fresh_links(user, count)
+
+    return [request_spec('POST', '/api/shares', user, {
+        'linkIds': [link_id], 'userIds': [other[0] for other in dataset.other_users(user[0], 3)],
+        'isWritable': False,
+    }) for link_id in link_ids]
+
+
+def build_batch_shares(dataset, count):
+    specs = []
+
+    for _ in range(count):
+        user = dataset.owner()
+        shares = dataset.generator.sample(dataset.shares[user[0]], min(10, len(dataset.shares[user[0]])))
+
+        specs.append(request_spec('POST', '/api/shares/batch', user, {'operations': [
+            {'op': 'update', 'id': share_id, 'isWritable': dataset.generator.random() < 0.5}
+            for share_id, _ in shares
+        ]}))
+
+    return specs
+
+
+def build_get_shares(dataset, count):
+    specs = []
+
+    for _ in range(count):
+        user = dataset.owner()
+
+        specs.append(request_spec('GET', f'/api/shares/{dataset.generator.choice(dataset.shares[user[0]])[1]}', user))
+
+    return specs
+
+
+def build_update_share(dataset, count):
+    specs = []
+
+    for _ in range(count):
+        user = dataset.owner()
+        share_id, _ = dataset.generator.choice(dataset.shares[user[0]])
+
+        specs.append(request_spec('PUT', f'/api/share/{share_id}', user,
+                                  {'isWritable': dataset.generator.random() < 0.5}))
+
+    return specs
+
+
+def build_users(dataset, count):
+    return [request_spec('GET', f'/api/users?q={BENCHMARK_EMAIL_PREFIX}1&limit=20', dataset.user())
+            for _ in range(count)]
+
+
+# name: (URL pattern as reported by /metrics, method, request builder, expected statuses)
+SCENARIOS = {
+    'index': ('', 'GET', build_index, {200}),
+    'metrics': ('metrics', 'GET', build_metrics, {200}),
+    'auth.refresh': ('auth/refresh', 'GET', build_refresh, {200}),
+    'auth.sign-in': ('auth/sign-in', 'POST', build_sign_in, {200}),
+    'auth.sign-out': ('auth/sign-out', 'POST', build_sign_out, {200}),
+    'auth.sign-up': ('auth/sign-up', 'POST', build_sign_up, {201}),
+    'categories': ('api/categories', 'GET', build_categories, {200}),
+    'link.add': ('api/link', 'POST', build_add_link, {201}),
+    'links.own': ('api/links', 'GET', build_links('own'), {200}),
+    'links.shared': ('api/links', 'GET', build_links('shared-writable'), {200}),
+    'links.search': ('api/links', 'GET', build_links('own', 'guide'), {200}),
+    'links.import': ('api/links/import', 'POST', build_import, {201}),
+    'links.export': ('api/links/export', 'GET', build_export, {200}),
+    'links.batch': ('api/links/batch', 'POST', build_batch_links, {200}),
+    'link.update': ('api/link/<str:link_id>', 'PUT', build_update_link, {200}),
+    'share.add': ('api/share', 'POST', build_add_share, {201}),
+    'shares.add': ('api/shares', 'POST', build_add_shares, {201}),
+    'shares.batch': ('api/shares/batch', 'POST', build_batch_shares, {200}),
+    'shares.get': ('api/shares/<str:link_id>', 'GET', build_get_shares, {200}),
+    'share.update': ('api/share/<str:share_id>', 'PUT', build_update_share, {200}),
+    'users': ('api/users', 'GET', build_users, {200}),
+}
+
+
+class InProcessTransport:
+    name = 'in-process'
+
+    def send(self, spec):
+        client = Client()
+
+        for cookie in spec['headers'].get('Cookie', '').split(';'):
+            if cookie:
+                key, value = cookie.split('=', 1)
+                client.cookies[key.strip()] = value
+
+        headers = {key: value for key, value in spec['headers'].items() if key != 'Cookie'}
+
+        started = time.perf_counter()
+
+        response = client.generic(spec['method'], spec['path'], spec['body'] or b'', spec['content_type'],
+                                  headers=headers)
+        body = b''.join(response.streaming_content) if response.streaming else response.content
+
+        elapsed = time.perf_counter() - started
+
+        return response.status_code, elapsed, len(body)
+
+    def scrape(self):
+        response = Client().get('/metrics', headers=metrics_headers())
+
+        return response.content.decode() if response.status_code == 200 else ''
+
+
+class HttpTransport:
+    name = 'http'
+
+    def __init__(self, url):
+        self.url = url.rstrip('/')
+
+    def send(self, spec):
+        headers = dict(spec['headers'])
+
+        if spec['body'] is not None:
+            headers['Content-Type'] = spec['content_type']
+
+        request = urllib.request.Request(self.url + spec['path'], data=spec['body'], headers=headers,
+                                         method=spec['method'])
+
+        started = time.perf_counter()
+
+        try:
+            with urllib.request.urlopen(request) as response:
+                status, size = response.status, len(response.read())
+        except urllib.error.HTTPError as error:
+            status, size = error.code, len(error.read())
+        except OSError:
+            status, size = 0, 0
+
+        return status, time.perf_counter() - started, size
+
+    def scrape(self):
+        try:
+            with urllib.request.urlopen(urllib.request.Request(self.url + '/metrics', headers=metrics_headers())) as r:
+                return r.read().decode()
+        except OSError:
+            return ''
+
+
+def scrape_queries(transport):
+    # Query totals per URL pattern, read back from the server's own /metrics so both transports count alike.
+    text = transport.scrape()
+
+    totals = {}
+
+    for line in text.splitlines():
+        match = METRIC_PATTERN.match(line)
+
+        if match:
+            kind, route, method, value = match.groups()
+            totals.setdefault((route, method), {'sum': 0.0, 'count': 0.0})[kind] = float(value)
+
+    return totals
+
+
+def percentile(latencies, quantile):
+    # Nearest-rank percentile over the sorted latencies.
+    return latencies[max(0, min(len(latencies) - 1, int(round(quantile * len(latencies))) - 1))]
+
+
+def run_scenario(transport, dataset, name, requests, concurrency, warmup):
+    route, method, build, expected = SCENARIOS[name]
+
+    if warmup:
+        for spec in build(dataset, warmup):
+            transport.send(spec)
+
+    specs = build(dataset, requests)
+    before = scrape_queries(transport).get((route, method))
+
+    with ThreadPoolExecutor(max_workers=concurrency) as workers:
+        started = time.perf_counter()
+        results = list(workers.map(transport.send, specs))
+        elapsed = time.perf_counter() - started
+
+    after = scrape_queries(transport).get((route, method))
+    latencies = sorted(latency for _, latency, _ in results)
+
+    queries = None
+
+    if before is not None or after is not None:
+        before = before or {'sum': 0.0, 'count': 0.0}
+        counted = after['count'] - before['count']
+        queries = (after['sum'] - before['sum']) / counted if counted else None
+
+    return {
+        'requests': requests,
+        'concurrency': concurrency,
+        'failures': sum(1 for status, _, _ in results if status not in expected),
+        'requests_per_second': requests / elapsed,
+        'p50_ms': percentile(latencies, 0.5) * 1000,
+        'p95_ms': percentile(latencies, 0.95) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+        'mean_ms': sum(latencies) / len(latencies) * 1000,
+        'bytes_per_request': sum(size for _, _, size in results) / len(results),
+        'queries_per_request': queries,
+    }
+
+
+def compare(baseline, current, threshold):
+    # Flags median or p95 latency and throughput that moved by more than threshold percent, and any extra query
+    # per request or failure. p99 is reported but not compared, as short runs leave it to a handful of samples.
+    regressions = []
+
+    for key, result in current['results'].items():
+        previous = baseline['results'].get(key)
+
+        if not previous:
+            continue
+
+        for field in ('p50_ms', 'p95_ms'):
+            if previous[field] and (result[field] - previous[field]) / previous[field] * 100 > threshold:
+                regressions.append((key, field, previous[field], result[field]))
+
+        field = 'requests_per_second'
+
+        if previous[field] and (previous[field] - result[field]) / previous[field] * 100 > threshold:
+            regressions.append((key, field, previous[field], result[field]))
+
+        field = 'queries_per_request'
+
+        if previous[field] is not None and result[field] is not None and previous[field] + 0.01 < result[field]:
+            regressions.append((key, field, previous[field], result[field]))
+
+        if previous['failures'] < result['failures']:
+            regressions.append((key, 'failures', previous['failures'], result['failures']))
+
+    return regressions
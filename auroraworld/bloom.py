@@ -0,0 +1,44 @@
+import hashlib
+import math
+import threading
+
+
+class BloomFilter:
+    def __init__(self, capacity, error_rate):
+        self.capacity = capacity
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+        self._lock = threading.Lock()
+
+    def _positions(self, key):
+        # Double hashing: two 64-bit halves of one digest stand in for hash_count independent hashes.
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'big')
+        second = int.from_bytes(digest[8:], 'big') | 1
+
+        return [(first + i * second) % self.size for i in range(self.hash_count)]
+
+    def add(self, key):
+        positions = self._positions(key)
+
+        with self._lock:
+            for position in positions:
+                self._bits[position >> 3] |= 1 << (position & 7)
+
+            self.count += 1
+
+    def __contains__(self, key):
+        return all(self._bits[position >> 3] & 1 << (position & 7) for position in self._positions(key))
+
+    def is_full(self):
+        return self.capacity <= self.count
+
+    def stats(self):
+        return {
+            'count': self.count,
+            'capacity': self.capacity,
+            'bits': self.size,
+            'hash_count': self.hash_count,
+        }
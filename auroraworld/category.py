@@ -1,11 +1,87 @@
+import time
+
+from django.conf import settings
+from django.core.cache import caches
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 
+from auroraworld.etag import make_etag, etag_matches, not_modified
+from auroraworld.lru import LRUCache
 from auroraworld.models import Category
+from auroraworld.ratelimit import rate_limit
+from auroraworld.routers import read_from_replica
 from auroraworld.verifyToken import verify_token
 
+VERSION_KEY = 'categories:version'
+
+local_categories = LRUCache(4)
+
+
+def get_version():
+    # The version expires after CATEGORY_CACHE_TTL, so a worker whose cache never sees another worker's
+    # invalidation (such as the per-process LocMemCache) still reloads the categories within that time.
+    cache = caches[settings.CATEGORY_CACHE]
+
+    version = cache.get(VERSION_KEY)
+
+    if version is None:
+        cache.add(VERSION_KEY, time.time_ns(), settings.CATEGORY_CACHE_TTL)
+        version = cache.get(VERSION_KEY)
+
+    return version
+
+
+def invalidate_categories():
+    cache = caches[settings.CATEGORY_CACHE]
+
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, time.time_ns(), settings.CATEGORY_CACHE_TTL)
+
+
+def get_registry():
+    version = get_version()
+
+    registry = local_categories.get(version)
+
+    if registry is not None:
+        return registry
+
+    cache = caches[settings.CATEGORY_CACHE]
+    key = f'categories:{version}'
+
+    registry = cache.get(key)
 
+    if registry is None:
+        data = [
+            {
+                'id': existing_category.id,
+                'name': existing_category.name,
+            }
+            for existing_category in Category.objects.all()
+        ]
+
+        registry = {
+            'data': data,
+            'names': {category['id']: category['name'] for category in data},
+            'etag': make_etag(data),
+        }
+
+        cache.set(key, registry, settings.CATEGORY_CACHE_TTL)
+
+    local_categories.set(version, registry)
+
+    return registry
+
+
+def get_category_name(category_id):
+    return get_registry()['names'].get(category_id)
+
+
+@rate_limit
 @verify_token
+@read_from_replica
 @api_view(['GET'])
 def get_categories(request):
     try:
@@ -15,15 +91,12 @@ def get_categories(request):
         if not session_user_id or not session_user_email:
             return Response({'message': 'Unauthorized'}, status=401)
 
-        existing_categories = Category.objects.all()
+        registry = get_registry()
 
-        return Response({'message': '', 'data': [
-            {
-                'id': existing_category.id,
-                'name': existing_category.name,
-            }
-            for existing_category in existing_categories
-        ]}, status=200)
+        if etag_matches(request, registry['etag']):
+            return not_modified(registry['etag'])
+
+        return Response({'message': '', 'data': registry['data']}, status=200, headers={'ETag': registry['etag']})
     except Exception as error:
         print(error)
 
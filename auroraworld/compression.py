@@ -0,0 +1,250 @@
+import gzip
+import os
+import zlib
+from functools import lru_cache
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+
+try:
+    # Optional: pip install brotli
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    # Optional: pip install zstandard
+    import zstandard
+except ImportError:
+    zstandard = None
+
+COMPRESSIBLE_TYPES = (
+    'text/',
+    'application/json',
+    'application/x-ndjson',
+    'application/javascript',
+    'application/xml',
+    'image/svg+xml',
+    'image/x-icon',
+    'image/vnd.microsoft.icon',
+)
+
+
+class GzipCodec:
+    encoding = 'gzip'
+    extension = 'gz'
+
+    def compress(self, data, level=None):
+        return gzip.compress(data, compresslevel=level or settings.COMPRESSION_GZIP_LEVEL, mtime=0)
+
+    def compressor(self):
+        # wbits=31 writes the gzip header and trailer around the deflate stream.
+        stream = zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+
+        return stream.compress, lambda: stream.flush(zlib.Z_SYNC_FLUSH), stream.flush
+
+
+class BrotliCodec:
+    encoding = 'br'
+    extension = 'br'
+
+    def compress(self, data, level=None):
+        return brotli.compress(data, quality=level or settings.COMPRESSION_BROTLI_QUALITY)
+
+    def compressor(self):
+        stream = brotli.Compressor(quality=settings.COMPRESSION_BROTLI_QUALITY)
+
+        return stream.process, stream.flush, stream.finish
+
+
+class ZstdCodec:
+    encoding = 'zstd'
+    extension = 'zst'
+
+    def compress(self, data, level=None):
+        return zstandard.ZstdCompressor(level=level or settings.COMPRESSION_ZSTD_LEVEL).compress(data)
+
+    def compressor(self):
+        stream = zstandard.ZstdCompressor(level=settings.COMPRESSION_ZSTD_LEVEL).compressobj()
+
+        return (stream.compress, lambda: stream.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK),
+                lambda: stream.flush(zstandard.COMPRESSOBJ_FLUSH_FINISH))
+
+
+CODECS = {
+    'zstd': ZstdCodec() if zstandard else None,
+    'br': BrotliCodec() if brotli else None,
+    'gzip': GzipCodec(),
+}
+
+
+def available_codecs():
+    # Server preference order, restricted to the codecs whose packages are installed.
+    return [CODECS[encoding] for encoding in settings.COMPRESSION_ENCODINGS if CODECS.get(encoding)]
+
+
+def parse_accept_encoding(header):
+    weights = {}
+
+    for item in header.split(','):
+        encoding, _, params = item.strip().partition(';')
+        weight = 1.0
+
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+
+            if key == 'q':
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+
+        if encoding:
+            weights[encoding.strip().lower()] = weight
+
+    return weights
+
+
+def negotiate(request, codecs=None):
+    weights = parse_accept_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+
+    for codec in available_codecs() if codecs is None else codecs:
+        if 0 < weights.get(codec.encoding, weights.get('*', 0)):
+            return codec
+
+    return None
+
+
+def is_compressible(response):
+    content_type = response.get('Content-Type', '').split(';')[0].strip().lower()
+
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+def weaken_etag(response):
+    # The compressed body is a different representation, so a strong validator would no longer hold.
+    etag = response.get('ETag')
+
+    if etag and etag.startswith('"'):
+        response.headers['ETag'] = 'W/' + etag
+
+
+def compress_response(request, response):
+    if response.has_header('Content-Encoding') or not is_compressible(response):
+        return response
+
+    # Token responses are never compressed: a secret next to reflected input is what BREACH exploits.
+    if request.path.startswith(settings.COMPRESSION_EXCLUDED_PATHS):
+        return response
+
+    if not response.streaming and len(response.content) < settings.COMPRESSION_MIN_SIZE:
+        return response
+
+    patch_vary_headers(response, ('Accept-Encoding',))
+
+    codec = negotiate(request)
+
+    if not codec:
+        return response
+
+    if response.streaming:
+        if response.is_async:
+            response.streaming_content = acompress_stream(codec, response.streaming_content)
+        else:
+            response.streaming_content = compress_stream(codec, response.streaming_content)
+
+        del response['Content-Length']
+    else:
+        content = codec.compress(response.content)
+
+        if len(response.content) <= len(content):
+            return response
+
+        response.content = content
+        response.headers['Content-Length'] = str(len(content))
+
+    weaken_etag(response)
+    response.headers['Content-Encoding'] = codec.encoding
+
+    return response
+
+
+class StreamCompressor:
+    # Flushes once COMPRESSION_STREAM_FLUSH_BYTES of input have gone in, so a slow stream still reaches the client
+    # in pieces without paying a flush block for every small chunk.
+    def __init__(self, codec):
+        self._compress, self._flush, self._finish = codec.compressor()
+        self.pending = 0
+
+    def compress(self, chunk):
+        output = self._compress(chunk)
+        self.pending += len(chunk)
+
+        if settings.COMPRESSION_STREAM_FLUSH_BYTES <= self.pending:
+            output += self._flush()
+            self.pending = 0
+
+        return output
+
+    def finish(self):
+        return self._finish()
+
+
+def compress_stream(codec, chunks):
+    compressor = StreamCompressor(codec)
+
+    for chunk in chunks:
+        output = compressor.compress(chunk)
+
+        if output:
+            yield output
+
+    yield compressor.finish()
+
+
+async def acompress_stream(codec, chunks):
+    compressor = StreamCompressor(codec)
+
+    async for chunk in chunks:
+        output = compressor.compress(chunk)
+
+        if output:
+            yield output
+
+    yield compressor.finish()
+
+
+@lru_cache(maxsize=64)
+def read_file(path, modified_at):
+    with open(path, 'rb') as file:
+        return file.read()
+
+
+def serve_precompressed(request, name, content_type):
+    # Serves a file written by the precompress_static command, picking the best encoding that was built for it.
+    # Returns None when the build step has not been run, so callers can fall back to rendering.
+    path = os.path.join(settings.PRECOMPRESSED_ROOT, name)
+
+    if not os.path.isfile(path):
+        return None
+
+    codec = negotiate(request, [
+        codec for codec in available_codecs() if os.path.isfile(f'{path}.{codec.extension}')
+    ])
+
+    if codec:
+        path = f'{path}.{codec.extension}'
+
+    content = read_file(path, os.stat(path).st_mtime_ns)
+
+    response = HttpResponse(content, content_type=content_type)
+    response.headers['Content-Length'] = str(len(content))
+    response.headers['Cache-Control'] = f'public, max-age={settings.PRECOMPRESSED_MAX_AGE}'
+
+    if codec:
+        response.headers['Content-Encoding'] = codec.encoding
+
+    patch_vary_headers(response, ('Accept-Encoding',))
+
+    return response
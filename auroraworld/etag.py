@@ -0,0 +1,24 @@
+import hashlib
+import json
+
+from rest_framework.response import Response
+
+
+def make_etag(*parts):
+    return '"' + hashlib.sha256(json.dumps(parts, separators=(',', ':'), default=str).encode()).hexdigest()[:32] + '"'
+
+
+def etag_matches(request, etag):
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+
+    if not if_none_match:
+        return False
+
+    # If-None-Match compares weakly, and compressed responses carry the weak form of the ETag.
+    candidates = [candidate.strip().removeprefix('W/') for candidate in if_none_match.split(',')]
+
+    return '*' in candidates or etag in candidates
+
+
+def not_modified(etag):
+    return Response(status=304, headers={'ETag': etag})
@@ -0,0 +1,88 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import hashers
+
+executor = None
+executor_lock = threading.Lock()
+
+
+def init_worker():
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'project.settings')
+
+    import django
+
+    django.setup()
+
+
+def get_context():
+    # The pool is first used from a request thread. Forking there would copy the other threads' held locks and the
+    # worker's open database connections into the children, so they start from a clean interpreter instead.
+    method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+    return multiprocessing.get_context(method)
+
+
+def get_executor():
+    global executor
+
+    if executor is None and 0 < settings.PASSWORD_HASHING_WORKERS:
+        # Two request threads seeing no pool at once would otherwise each start one, and one would leak its workers.
+        with executor_lock:
+            if executor is None:
+                executor = ProcessPoolExecutor(max_workers=settings.PASSWORD_HASHING_WORKERS,
+                                               mp_context=get_context(), initializer=init_worker)
+
+    return executor
+
+
+def hash_password(password):
+    return hashers.make_password(password)
+
+
+def verify_password(password, encoded):
+    rehashed = []
+
+    # check_password calls the setter only when the stored hash uses an outdated hasher or cost.
+    is_match = hashers.check_password(password, encoded, setter=lambda raw: rehashed.append(hashers.make_password(raw)))
+
+    return is_match, rehashed[0] if rehashed else None
+
+
+def run(func, *args):
+    pool = get_executor()
+
+    if pool is None:
+        return func(*args)
+
+    return pool.submit(func, *args).result()
+
+
+async def arun(func, *args):
+    pool = get_executor()
+
+    if pool is None:
+        return await sync_to_async(func, thread_sensitive=False)(*args)
+
+    return await asyncio.wrap_future(pool.submit(func, *args))
+
+
+def make_password(password):
+    return run(hash_password, password)
+
+
+def check_password(password, encoded):
+    return run(verify_password, password, encoded)
+
+
+async def amake_password(password):
+    return await arun(hash_password, password)
+
+
+async def acheck_password(password, encoded):
+    return await arun(verify_password, password, encoded)
@@ -0,0 +1,52 @@
+import threading
+
+
+class Histogram:
+    # HDR-style log-linear histogram over non-negative integers. Each bucket keeps the top significant_bits bits
+    # of a value, so any recorded value is reported within 2 ** (1 - significant_bits) of itself (under 2% by
+    # default) while the number of buckets only grows with the logarithm of the range.
+    def __init__(self, significant_bits=7):
+        self.significant_bits = significant_bits
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, value):
+        shift = max(0, value.bit_length() - self.significant_bits)
+
+        return value >> shift << shift
+
+    def record(self, value):
+        value = max(0, int(value))
+        bucket = self.bucket(value)
+
+        with self._lock:
+            self._counts[bucket] = self._counts.get(bucket, 0) + 1
+            self.count += 1
+            self.total += value
+            self.min = value if self.min is None else min(self.min, value)
+            self.max = max(self.max, value)
+
+    def percentiles(self, quantiles):
+        with self._lock:
+            counts = sorted(self._counts.items())
+            count = self.count
+            maximum = self.max
+
+        results = {}
+        seen = 0
+        index = 0
+
+        for quantile in sorted(quantiles):
+            target = quantile * count
+
+            while index < len(counts) and seen + counts[index][1] < target:
+                seen += counts[index][1]
+                index += 1
+
+            results[quantile] = min(counts[index][0], maximum) if index < len(counts) else maximum
+
+        return results
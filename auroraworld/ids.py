@@ -0,0 +1,74 @@
+import os
+import threading
+import time
+import uuid
+
+from django.conf import settings
+
+CROCKFORD_ALPHABET = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+
+
+class MonotonicClock:
+    # Hands out (millisecond, sequence) pairs that strictly increase within the process. The sequence starts
+    # from a random value each millisecond, with the top bit clear so increments cannot overflow it in practice.
+    def __init__(self, bits):
+        self.bits = bits
+        self.lock = threading.Lock()
+        self.last_ms = 0
+        self.sequence = 0
+
+    def seed(self):
+        return int.from_bytes(os.urandom(16), 'big') >> (128 - self.bits + 1)
+
+    def next(self):
+        with self.lock:
+            now_ms = time.time_ns() // 1_000_000
+
+            if self.last_ms < now_ms:
+                self.last_ms = now_ms
+                self.sequence = self.seed()
+            else:
+                self.sequence += 1
+
+                if self.sequence >> self.bits:
+                    self.last_ms += 1
+                    self.sequence = self.seed()
+
+            return self.last_ms, self.sequence
+
+
+uuid7_clock = MonotonicClock(74)
+ulid_clock = MonotonicClock(80)
+
+
+def uuid4_id():
+    return uuid.uuid4().hex
+
+
+def uuid7_id():
+    # RFC 9562 UUIDv7: 48-bit Unix milliseconds, version, 12 + 62 sequence bits split around the variant.
+    timestamp, sequence = uuid7_clock.next()
+
+    value = timestamp << 80 | 0x7 << 76 | (sequence >> 62) << 64 | 0b10 << 62 | sequence & (2 ** 62 - 1)
+
+    return f'{value:032x}'
+
+
+def ulid_id():
+    # ULID: 48-bit Unix milliseconds and 80 sequence bits as 26 Crockford base32 characters.
+    timestamp, sequence = ulid_clock.next()
+
+    value = timestamp << 80 | sequence
+
+    return ''.join(CROCKFORD_ALPHABET[value >> shift & 31] for shift in range(125, -1, -5))
+
+
+GENERATORS = {
+    'uuid4': uuid4_id,
+    'uuid7': uuid7_id,
+    'ulid': ulid_id,
+}
+
+
+def new_id():
+    return GENERATORS[settings.ID_GENERATOR]()
@@ -1,15 +1,32 @@
-import uuid
-
-from django.db import IntegrityError
-from django.db.models import Q
+from django.http import StreamingHttpResponse
+from django.utils import timezone
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 
-from .models import Link, Category, Share
+from . import search
+from .category import get_category_name
+from .etag import make_etag, etag_matches, not_modified
+from .ids import new_id
+from .models import Link, UserLinkAccess
+from .paging import parse_limit
+from .ratelimit import rate_limit
+from .renderers import json_line
+from .routers import pin_reads, read_from_replica, sticky_writes
+from .sqlite import immediate_atomic
 from .verifyToken import verify_token
+from .versions import get_versions, links_key
+
+MAX_LIMIT = 1000
+STREAM_CHUNK_SIZE = 500
+MAX_BATCH_OPERATIONS = 1000
+BULK_BATCH_SIZE = 500
+
+LINK_FIELDS = ('id', 'user_id', 'created_by', 'category_id', 'category_name', 'name', 'url')
 
 
+@rate_limit
 @verify_token
+@sticky_writes
 @api_view(['POST'])
 def add_link(request):
     try:
@@ -26,68 +43,225 @@ def add_link(request):
         if not session_user_id or not session_user_email:
             return Response({'message': 'Unauthorized'}, status=401)
 
-        try:
-            existing_category = Category.objects.get(id=category_id)
-        except Category.DoesNotExist:
+        category_name = get_category_name(category_id)
+
+        if not category_name:
             return Response({'message': 'Invalid Input'}, status=400)
 
-        new_link = None
-
-        attempts = 0
-        max_attempts = 5
-        while attempts < max_attempts:
-            try:
-                link_id = uuid.uuid4().hex
-
-                new_link = Link.objects.create(
-                    id=link_id,
-                    user_id=session_user_id,
-                    created_by=session_user_email,
-                    category=existing_category,
-                    category_name=existing_category.name,
-                    name=name,
-                    url=url,
-                )
-
-                break
-            except IntegrityError as error:
-                error_str = str(error).lower()
-
-                if 'links.id' in error_str:
-                    attempts += 1
-
-                    continue
-                else:
-                    raise error
-
-        if new_link:
-            return Response({
-                'message': 'Link created successfully.',
-                'data': {
-                    'id': new_link.id,
-                    'user_id': new_link.user_id,
-                    'created_by': new_link.created_by,
-                    'category_id': new_link.category.id,
-                    'category_name': new_link.category_name,
-                    'name': new_link.name,
-                    'url': new_link.url,
-                },
-            }, status=201)
-        else:
-            return Response({'message': 'No link created.'}, status=400)
+        new_link = Link.objects.create(
+            id=new_id(),
+            user_id=session_user_id,
+            created_by=session_user_email,
+            category_id=category_id,
+            category_name=category_name,
+            name=name,
+            url=url,
+        )
+
+        return Response({
+            'message': 'Link created successfully.',
+            'data': serialize_link(new_link),
+        }, status=201)
     except Exception as error:
         print(error)
 
         return Response({'message': 'Server Error'}, status=500)
 
 
+def access_level(mode):
+    if mode in (UserLinkAccess.OWN, UserLinkAccess.SHARED_UNWRITABLE):
+        return mode
+
+    return UserLinkAccess.SHARED_WRITABLE
+
+
+def filter_links(session_user_id, mode, category_id, name):
+    # Every mode is one range over user_link_access (user_id, access_level, category_id, link_id) in link id order.
+    conditions = {'accesses__user_id': session_user_id, 'accesses__access_level': access_level(mode)}
+
+    if category_id and category_id != 'all':
+        conditions['accesses__category_id'] = category_id
+
+    existing_links = Link.objects.filter(**conditions)
+
+    if name:
+        return search.search_links(existing_links, name)
+
+    return existing_links.order_by('accesses__link_id')
+
+
+def paginate_links(existing_links, cursor):
+    if search.is_ranked(existing_links):
+        search_rank, _, link_id = cursor.rpartition(':')
+
+        try:
+            return search.after_rank(existing_links, float(search_rank), link_id)
+        except ValueError:
+            return existing_links.none()
+
+    return existing_links.filter(id__gt=cursor)
+
+
+def link_rows(existing_links):
+    # Tuples straight from values_list, so list responses skip building a Link per row only to turn it into a dict.
+    if search.is_ranked(existing_links):
+        return existing_links.values_list(*LINK_FIELDS, 'search_rank')
+
+    return existing_links.values_list(*LINK_FIELDS)
+
+
+def serialize_row(row):
+    return dict(zip(LINK_FIELDS, row))
+
+
+def row_cursor(row):
+    if len(LINK_FIELDS) < len(row):
+        return f'{row[-1]!r}:{row[0]}'
+
+    return row[0]
+
+
+def page_rows(rows, limit):
+    # Trims a page fetched with one extra row and returns it with the cursor to the next page, if there is one.
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+
+    return rows, row_cursor(rows[-1])
+
+
+def writable_links(session_user_id):
+    return Link.objects.filter(
+        accesses__user_id=session_user_id,
+        accesses__access_level__in=[UserLinkAccess.OWN, UserLinkAccess.SHARED_WRITABLE],
+    ).distinct()
+
+
+def links_etag(session_user_id, mode, *params):
+    return make_etag(session_user_id, mode, *params, get_versions(links_key(session_user_id)))
+
+
+def serialize_link(existing_link):
+    return {
+        'id': existing_link.id,
+        'user_id': existing_link.user_id,
+        'created_by': existing_link.created_by,
+        'category_id': existing_link.category_id,
+        'category_name': existing_link.category_name,
+        'name': existing_link.name,
+        'url': existing_link.url,
+    }
+
+
+def filter_export_links(session_user_id, mode, category_id, output_format):
+    existing_links = filter_links(session_user_id, mode or 'own', category_id or 'all', '')
+
+    if output_format == 'html':
+        return existing_links.order_by('accesses__category_id', 'accesses__link_id')
+
+    return existing_links
+
+
+def export_headers(encoder):
+    return {'Content-Disposition': f'attachment; filename="links.{encoder.extension}"'}
+
+
+def apply_link_operations(session_user_id, operations):
+    results = []
+    deletes = {}
+    updates = {}
+
+    for operation in operations:
+        result = {'id': None, 'op': None, 'status': 400, 'message': 'Invalid Input'}
+        results.append(result)
+
+        if not isinstance(operation, dict):
+            continue
+
+        link_id = str(operation.get('id') or '').strip()
+        op = operation.get('op')
+
+        result.update(id=link_id, op=op)
+
+        if not link_id or link_id in deletes or link_id in updates:
+            continue
+
+        if op == 'delete':
+            deletes[link_id] = result
+        elif op == 'update':
+            category_id = str(operation.get('categoryId') or '').strip()
+            name = str(operation.get('name') or '').strip()
+            url = str(operation.get('url') or '').strip()
+            category_name = get_category_name(category_id)
+
+            if category_name and name and url:
+                updates[link_id] = (result, {'category_id': category_id, 'category_name': category_name,
+                                             'name': name, 'url': url})
+
+    # One ownership query per kind, then every change in the same transaction, which holds the write lock from the
+    # start so the ownership reads cannot leave it stuck behind another writer.
+    with immediate_atomic():
+        deleted_ids = set(Link.objects.filter(id__in=deletes, user_id=session_user_id).values_list('id', flat=True))
+        updated_links = list(Link.objects.filter(
+            id__in=updates,
+            accesses__user_id=session_user_id,
+            accesses__access_level__in=[UserLinkAccess.OWN, UserLinkAccess.SHARED_WRITABLE],
+        ).distinct())
+
+        if deleted_ids:
+            Link.objects.filter(id__in=deleted_ids).delete()
+
+        updated_at = timezone.now()
+
+        for updated_link in updated_links:
+            for field, value in updates[updated_link.id][1].items():
+                setattr(updated_link, field, value)
+
+            updated_link.updated_at = updated_at
+
+        Link.objects.bulk_update(updated_links, ['category_id', 'category_name', 'name', 'url', 'updated_at'],
+                                 batch_size=BULK_BATCH_SIZE)
+
+    for link_id, result in deletes.items():
+        if link_id in deleted_ids:
+            result.update(status=200, message='Link removed successfully.')
+        else:
+            result.update(message='No link removed.')
+
+    for updated_link in updated_links:
+        updates[updated_link.id][0].update(status=200, message='Link updated successfully.',
+                                           data=serialize_link(updated_link))
+
+    for result, _ in updates.values():
+        if result['status'] != 200:
+            result.update(message='No link updated.')
+
+    return results
+
+
+def stream_links(existing_links):
+    for row in link_rows(existing_links).iterator(chunk_size=STREAM_CHUNK_SIZE):
+        yield json_line(serialize_row(row))
+
+
+@rate_limit
 @verify_token
+@read_from_replica
 @api_view(['GET'])
 def get_links(request):
     try:
         mode = request.GET.get('mode').strip()
         category_id = request.GET.get('categoryId').strip()
         name = request.GET.get('name').strip()
+        limit = request.GET.get('limit', '').strip()
+        cursor = request.GET.get('cursor', '').strip()
+        output_format = request.GET.get('output', '').strip()
+
+        try:
+            limit = parse_limit(limit, cursor, MAX_LIMIT)
+        except ValueError:
+            return Response({'message': 'Invalid Input'}, status=400)
 
         session_user_id = getattr(request, 'user_id', None)
         session_user_email = getattr(request, 'user_email', None)
@@ -95,42 +269,42 @@ def get_links(request):
         if not session_user_id or not session_user_email:
             return Response({'message': 'Unauthorized'}, status=401)
 
-        if mode == 'own':
-            existing_links = Link.objects.filter(user_id=session_user_id)
-        elif mode == 'shared-unwritable':
-            link_ids = Share.objects.filter(user_id=session_user_id, is_writable=False).values_list('link_id',
-                                                                                                    flat=True)
-            existing_links = Link.objects.filter(id__in=link_ids)
-        else:
-            link_ids = Share.objects.filter(user_id=session_user_id, is_writable=True).values_list('link_id', flat=True)
+        existing_links = filter_links(session_user_id, mode, category_id, name)
+
+        etag = links_etag(session_user_id, mode, category_id, name, limit, cursor, output_format)
+
+        if etag_matches(request, etag):
+            return not_modified(etag)
+
+        if cursor:
+            existing_links = paginate_links(existing_links, cursor)
 
-            existing_links = Link.objects.filter(id__in=link_ids)
+        if output_format == 'ndjson':
+            if limit:
+                existing_links = existing_links[:limit]
 
-        if category_id and category_id != 'all':
-            existing_links = existing_links.filter(category_id=category_id)
+            return StreamingHttpResponse(stream_links(pin_reads(existing_links)), content_type='application/x-ndjson',
+                                         status=200, headers={'ETag': etag})
 
-        if name:
-            existing_links = existing_links.filter(name__icontains=name)
+        next_cursor = None
+        rows = link_rows(existing_links)
+
+        if limit:
+            rows, next_cursor = page_rows(list(rows[:limit + 1]), limit)
 
         return Response({'message': '', 'data': [
-            {
-                'id': existing_link.id,
-                'user_id': existing_link.user_id,
-                'created_by': existing_link.created_by,
-                'category_id': existing_link.category_id,
-                'category_name': existing_link.category_name,
-                'name': existing_link.name,
-                'url': existing_link.url,
-            }
-            for existing_link in existing_links
-        ]}, status=200)
+            serialize_row(row)
+            for row in rows
+        ], 'next': next_cursor}, status=200, headers={'ETag': etag})
     except Exception as error:
         print(error)
 
         return Response({'message': 'Server Error'}, status=500)
 
 
+@rate_limit
 @verify_token
+@sticky_writes
 @api_view(['DELETE', 'PUT'])
 def remove_update_link(request, link_id):
     try:
@@ -169,33 +343,118 @@ def remove_update_link(request, link_id):
             if not session_user_id or not session_user_email:
                 return Response({'message': 'Unauthorized'}, status=401)
 
-            try:
-                existing_category = Category.objects.get(id=category_id)
-            except Category.DoesNotExist:
+            category_name = get_category_name(category_id)
+
+            if not category_name:
                 return Response({'message': 'Invalid Input'}, status=400)
 
-            updated_link = Link.objects.filter(id=link_id).filter(
-                Q(user_id=session_user_id) | Q(share__user_id=session_user_id,
-                                               share__is_writable=True)).distinct().first()
+            updated_link = writable_links(session_user_id).filter(id=link_id).first()
 
             if not updated_link:
                 return Response({'message': 'No link updated.'}, status=400)
 
-            updated_link.category = existing_category
-            updated_link.category_name = existing_category.name
+            updated_link.category_id = category_id
+            updated_link.category_name = category_name
             updated_link.name = name
             updated_link.url = url
             updated_link.save()
 
-            return Response({'message': 'Link updated successfully.', 'data': {
-                'id': updated_link.id,
-                'user_id': updated_link.user.id,
-                'created_by': updated_link.created_by,
-                'category_id': updated_link.category.id,
-                'category_name': updated_link.category_name,
-                'name': updated_link.name,
-                'url': updated_link.url,
-            }}, status=200)
+            return Response({'message': 'Link updated successfully.', 'data': serialize_link(updated_link)},
+                            status=200)
+    except Exception as error:
+        print(error)
+
+        return Response({'message': 'Server Error'}, status=500)
+
+
+@rate_limit
+@verify_token
+@sticky_writes
+@api_view(['POST'])
+def import_links(request):
+    try:
+        default_category_id = request.GET.get('categoryId', '').strip()
+
+        session_user_id = getattr(request, 'user_id', None)
+        session_user_email = getattr(request, 'user_email', None)
+
+        if not session_user_id or not session_user_email:
+            return Response({'message': 'Unauthorized'}, status=401)
+
+        # Imported here so workers that never import or export links skip the csv and html parsers.
+        from . import transfer
+
+        reader = transfer.get_reader(request.content_type)
+
+        if not reader:
+            return Response({'message': 'Invalid Input'}, status=400)
+
+        result = transfer.import_rows(session_user_id, session_user_email, reader(request), default_category_id)
+
+        if 0 < result['created']:
+            return Response({'message': 'Links imported successfully.', 'data': result}, status=201)
+        else:
+            return Response({'message': 'No link imported.', 'data': result}, status=400)
+    except Exception as error:
+        print(error)
+
+        return Response({'message': 'Server Error'}, status=500)
+
+
+@rate_limit
+@verify_token
+@read_from_replica
+@api_view(['GET'])
+def export_links(request):
+    try:
+        mode = request.GET.get('mode', '').strip()
+        category_id = request.GET.get('categoryId', '').strip()
+        output_format = request.GET.get('output', '').strip()
+
+        session_user_id = getattr(request, 'user_id', None)
+        session_user_email = getattr(request, 'user_email', None)
+
+        if not session_user_id or not session_user_email:
+            return Response({'message': 'Unauthorized'}, status=401)
+
+        from . import transfer
+
+        encoder = transfer.get_encoder(output_format)
+
+        if not encoder:
+            return Response({'message': 'Invalid Input'}, status=400)
+
+        existing_links = pin_reads(filter_export_links(session_user_id, mode, category_id, output_format))
+
+        return StreamingHttpResponse(
+            transfer.export_lines(encoder, existing_links.iterator(chunk_size=STREAM_CHUNK_SIZE)),
+            content_type=encoder.content_type, status=200, headers=export_headers(encoder),
+        )
+    except Exception as error:
+        print(error)
+
+        return Response({'message': 'Server Error'}, status=500)
+
+
+@rate_limit
+@verify_token
+@sticky_writes
+@api_view(['POST'])
+def batch_links(request):
+    try:
+        operations = request.data.get('operations')
+
+        if not operations or not isinstance(operations, list) or MAX_BATCH_OPERATIONS < len(operations):
+            return Response({'message': 'Invalid Input'}, status=400)
+
+        session_user_id = getattr(request, 'user_id', None)
+        session_user_email = getattr(request, 'user_email', None)
+
+        if not session_user_id or not session_user_email:
+            return Response({'message': 'Unauthorized'}, status=401)
+
+        return Response({'message': 'Batch applied.', 'data': apply_link_operations(session_user_id, operations)},
+                        status=200)
     except Exception as error:
         print(error)
 
@@ -0,0 +1,112 @@
+import datetime
+import json
+import secrets
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+
+from auroraworld import benchmark
+
+
+class Command(BaseCommand):
+    help = ('Seeds a synthetic dataset and drives every API route in-process or over HTTP, reporting latency '
+            'percentiles, throughput and queries per request, with a JSON baseline to compare against.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', help='Benchmark a running server instead of an in-process temporary database.')
+        parser.add_argument('--seed', action='store_true', help='Reseed the configured database before an HTTP run.')
+        parser.add_argument('--users', type=int, default=20)
+        parser.add_argument('--links-per-user', type=int, default=50)
+        parser.add_argument('--shares-per-link', type=int, default=3)
+        parser.add_argument('--requests', type=int, default=100)
+        parser.add_argument('--warmup', type=int, default=5)
+        parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8])
+        parser.add_argument('--scenarios', nargs='+', choices=sorted(benchmark.SCENARIOS))
+        parser.add_argument('--save', help='Write the results to this JSON file.')
+        parser.add_argument('--compare', help='Compare the results against this JSON baseline.')
+        parser.add_argument('--threshold', type=float, default=10.0,
+                            help='Percent change in latency or throughput reported as a regression.')
+
+    def handle(self, *args, **options):
+        if options['users'] < 2:
+            raise CommandError('--users must be at least 2, so the share scenarios have someone to share with.')
+
+        scale = {key: options[key] for key in ('users', 'links_per_user', 'shares_per_link')}
+
+        if options['url']:
+            if options['seed']:
+                self.seed(scale)
+
+            results = self.run(benchmark.HttpTransport(options['url']), options)
+        else:
+            # Query counts are scraped from /metrics, which needs a token.
+            with benchmark.temporary_database(), \
+                    override_settings(RATE_LIMIT_ENABLED=False, METRICS_TOKEN=secrets.token_urlsafe()):
+                self.seed(scale)
+
+                results = self.run(benchmark.InProcessTransport(), options)
+
+        report = {
+            'transport': 'http' if options['url'] else 'in-process',
+            'created_at': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            'scale': scale,
+            'results': results,
+        }
+
+        if options['save']:
+            with open(options['save'], 'w') as file:
+                json.dump(report, file, indent=2)
+
+            self.stdout.write(f'Saved the results to {options["save"]}.')
+
+        if options['compare']:
+            self.compare(options['compare'], report, options['threshold'])
+
+    def seed(self, scale):
+        counts = benchmark.seed(scale['users'], scale['links_per_user'], scale['shares_per_link'])
+
+        self.stdout.write(f'Seeded {counts["users"]} users, {counts["links"]} links and {counts["shares"]} shares.')
+
+    def run(self, transport, options):
+        try:
+            dataset = benchmark.Dataset()
+        except ValueError as error:
+            raise CommandError(f'{error} Run with --seed.')
+
+        results = {}
+
+        self.stdout.write(f'{"scenario":<16}{"conc":>5}{"req/s":>10}{"p50 ms":>9}{"p95 ms":>9}{"p99 ms":>9}'
+                          f'{"queries":>9}{"failed":>8}')
+
+        for concurrency in options['concurrency']:
+            for name in options['scenarios'] or benchmark.SCENARIOS:
+                result = benchmark.run_scenario(transport, dataset, name, options['requests'], concurrency,
+                                                options['warmup'])
+                results[f'{name}@{concurrency}'] = result
+
+                queries = result['queries_per_request']
+
+                self.stdout.write(
+                    f'{name:<16}{concurrency:>5}{result["requests_per_second"]:>10.1f}{result["p50_ms"]:>9.2f}'
+                    f'{result["p95_ms"]:>9.2f}{result["p99_ms"]:>9.2f}'
+                    f'{"-" if queries is None else f"{queries:.2f}":>9}{result["failures"]:>8}'
+                )
+
+        return results
+
+    def compare(self, path, report, threshold):
+        try:
+            with open(path) as file:
+                baseline = json.load(file)
+        except (OSError, ValueError) as error:
+            raise CommandError(f'Could not read the baseline: {error}')
+
+        regressions = benchmark.compare(baseline, report, threshold)
+
+        for key, field, previous, current in regressions:
+            self.stdout.write(self.style.ERROR(f'{key} {field}: {previous:.2f} -> {current:.2f}'))
+
+        if regressions:
+            raise CommandError(f'{len(regressions)} regressions beyond {threshold:g}% against {path}.')
+
+        self.stdout.write(self.style.SUCCESS(f'No regressions beyond {threshold:g}% against {path}.'))
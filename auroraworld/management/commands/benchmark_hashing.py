@@ -0,0 +1,57 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher, get_hasher
+from django.core.management.base import BaseCommand
+
+from auroraworld import hashing
+
+
+class Command(BaseCommand):
+    help = 'Measures password checks per second for the stock and the configured hasher, inline and pooled.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--logins', type=int, default=50)
+        parser.add_argument('--concurrency', type=int, default=8)
+
+    def handle(self, *args, **options):
+        logins = options['logins']
+        workers = settings.PASSWORD_HASHING_WORKERS
+
+        stock = PBKDF2PasswordHasher()
+        stock_encoded = stock.encode('password', stock.salt())
+        configured_encoded = get_hasher().encode('password', get_hasher().salt())
+
+        started = time.perf_counter()
+
+        for _ in range(logins):
+            stock.verify('password', stock_encoded)
+
+        self.report(f'stock {stock.algorithm} ({stock.iterations} iterations), inline', logins, started, 1)
+
+        started = time.perf_counter()
+
+        for _ in range(logins):
+            hashing.verify_password('password', configured_encoded)
+
+        self.report(f'configured {get_hasher().algorithm}, inline', logins, started, 1)
+
+        if workers <= 0:
+            self.stdout.write('PASSWORD_HASHING_WORKERS is 0, skipping the pooled run.')
+
+            return
+
+        hashing.check_password('password', configured_encoded)
+
+        started = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as requests:
+            list(requests.map(lambda _: hashing.check_password('password', configured_encoded), range(logins)))
+
+        self.report(f'configured {get_hasher().algorithm}, {workers} hashing processes', logins, started, workers)
+
+    def report(self, label, logins, started, cores):
+        rate = logins / (time.perf_counter() - started)
+
+        self.stdout.write(f'{label}: {rate:.1f} logins/s, {rate / cores:.1f} logins/s per core')
@@ -0,0 +1,60 @@
+import os
+import sqlite3
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand
+
+from auroraworld.ids import GENERATORS
+from auroraworld.sqlite import get_pragmas, apply_pragmas
+
+
+class Command(BaseCommand):
+    help = 'Measures insert throughput into a links-shaped SQLite table with random and time-ordered primary keys.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000000)
+        parser.add_argument('--batch', type=int, default=10000)
+        parser.add_argument('--generators', nargs='+', default=list(GENERATORS), choices=list(GENERATORS))
+
+    def handle(self, *args, **options):
+        for label in options['generators']:
+            new_id = GENERATORS[label]
+
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, 'benchmark.sqlite3')
+
+                connection = sqlite3.connect(path, isolation_level=None)
+                apply_pragmas(connection, get_pragmas())
+                connection.execute(
+                    'CREATE TABLE links (id varchar(255) NOT NULL PRIMARY KEY, user_id varchar(255) NOT NULL, '
+                    'name varchar(255) NOT NULL)'
+                )
+
+                # The last batch shows how insert cost holds up once the primary key index is large.
+                started = time.perf_counter()
+                last_batch = 0.0
+
+                for offset in range(0, options['rows'], options['batch']):
+                    rows = [(new_id(), 'user', 'name') for _ in range(min(options['batch'], options['rows'] - offset))]
+
+                    batch_started = time.perf_counter()
+
+                    connection.execute('BEGIN')
+                    connection.executemany('INSERT INTO links VALUES (?, ?, ?)', rows)
+                    connection.execute('COMMIT')
+
+                    last_batch = time.perf_counter() - batch_started
+
+                elapsed = time.perf_counter() - started
+
+                page_count = connection.execute('PRAGMA page_count').fetchone()[0]
+                page_size = connection.execute('PRAGMA page_size').fetchone()[0]
+
+                connection.close()
+
+            self.stdout.write(
+                f'{label}: {options["rows"] / elapsed:.0f} rows/s overall, '
+                f'{options["batch"] / last_batch:.0f} rows/s in the last batch, '
+                f'{page_count * page_size / 1024 / 1024:.1f} MiB on disk'
+            )
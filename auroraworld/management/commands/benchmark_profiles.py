@@ -0,0 +1,120 @@
+import json
+import os
+import secrets
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+PROFILES = {
+    'full': 'project.wsgi',
+    'api': 'project.wsgi_api',
+}
+
+# Neither path reaches the database: /metrics renders from memory and /auth/refresh without a cookie is turned away
+# inside the view, so the timings are the middleware, DRF and Django request handling each profile puts around it.
+PATHS = ['/metrics', '/auth/refresh']
+
+# Runs in a fresh interpreter per sample, so imports and the first request are really cold.
+PROBE = '''
+import importlib, json, os, resource, sys, time
+from wsgiref.util import setup_testing_defaults
+
+module, requests, paths = sys.argv[1], int(sys.argv[2]), sys.argv[3:]
+
+started = time.perf_counter()
+application = importlib.import_module(module).application
+loaded = time.perf_counter()
+
+
+def call(path):
+    environ = {'PATH_INFO': path, 'HTTP_HOST': 'localhost',
+               'HTTP_AUTHORIZATION': 'Bearer ' + os.environ['METRICS_TOKEN']}
+    setup_testing_defaults(environ)
+    statuses = []
+    response = application(environ, lambda status, headers, exc_info=None: statuses.append(status))
+    b''.join(response)
+    response.close()
+    return statuses[0]
+
+
+call(paths[0])
+first = time.perf_counter()
+
+per_request = {}
+
+for path in paths:
+    for _ in range(100):
+        call(path)
+
+    path_started = time.perf_counter()
+
+    for _ in range(requests):
+        call(path)
+
+    per_request[path] = (time.perf_counter() - path_started) / requests
+
+print(json.dumps({
+    'import': loaded - started,
+    'first_request': first - loaded,
+    'per_request': per_request,
+    'statuses': {path: call(path) for path in paths},
+    'max_rss_kib': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    'modules': len(sys.modules),
+}))
+'''
+
+
+class Command(BaseCommand):
+    help = ('Starts each settings profile through its WSGI entry point in fresh interpreters and reports cold-start '
+            'time, per-request overhead, peak RSS and modules loaded per worker.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5,
+                            help='Cold starts per profile. Times are the best run, sizes the median.')
+        parser.add_argument('--requests', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        environment = {**os.environ, 'RATE_LIMIT_ENABLED': 'False', 'METRICS_TOKEN': secrets.token_urlsafe()}
+        environment.pop('DJANGO_SETTINGS_MODULE', None)
+
+        self.stdout.write(f'{"profile":<8}{"import ms":>11}{"first ms":>10}'
+                          + ''.join(f'{path + " us":>18}' for path in PATHS) + f'{"RSS MiB":>9}{"modules":>9}')
+
+        for profile, module in PROFILES.items():
+            samples = [self.probe(module, options['requests'], environment) for _ in range(options['runs'])]
+
+            # Noise on a shared machine only ever adds time, so the fastest run is the steadiest estimate.
+            def best(key):
+                return min(sample[key] for sample in samples)
+
+            def median(key):
+                return statistics.median(sample[key] for sample in samples)
+
+            per_request = ''.join(
+                f'{min(sample["per_request"][path] for sample in samples) * 1_000_000:>18.1f}' for path in PATHS
+            )
+
+            self.stdout.write(
+                f'{profile:<8}{best("import") * 1000:>11.1f}{best("first_request") * 1000:>10.1f}{per_request}'
+                f'{median("max_rss_kib") / 1024:>9.1f}{median("modules"):>9.0f}'
+            )
+
+    def probe(self, module, requests, environment):
+        result = subprocess.run(
+            [sys.executable, '-c', PROBE, module, str(requests), *PATHS],
+            cwd=settings.BASE_DIR, env=environment, capture_output=True, text=True,
+        )
+
+        if result.returncode:
+            raise CommandError(f'{module} failed to start:\n{result.stderr}')
+
+        sample = json.loads(result.stdout.splitlines()[-1])
+
+        if any(400 <= status_code for status_code in (int(status[:3]) for status in sample['statuses'].values())
+               if status_code != 401):
+            raise CommandError(f'{module} answered {sample["statuses"]}.')
+
+        return sample
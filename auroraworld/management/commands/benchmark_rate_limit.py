@@ -0,0 +1,86 @@
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+
+from auroraworld import ratelimit
+
+
+def drain(path, key, attempts, results):
+    # Runs in a child process with its own connection, standing in for a gunicorn worker.
+    store = ratelimit.TokenBucketStore(path)
+
+    results.put(sum(store.take(key, 1000, 0.001)[0] for _ in range(attempts)))
+
+
+class Command(BaseCommand):
+    help = ('Measures the rate limiter against a throwaway bucket file: microseconds per bucket update and per '
+            'decorated request check, and whether several processes draining one bucket stay within its burst.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=20000)
+        parser.add_argument('--processes', type=int, default=4)
+
+    def handle(self, *args, **options):
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, 'ratelimit.sqlite3')
+
+        try:
+            store = ratelimit.TokenBucketStore(path)
+            requests = options['requests']
+
+            store.take('warmup', 1, 1)
+
+            started = time.perf_counter()
+
+            for index in range(requests):
+                store.take(f'user:{index % 1000}', 1000, 1000)
+
+            self.report('bucket update', requests, time.perf_counter() - started)
+
+            request = RequestFactory().get('/api/links')
+            default_store, ratelimit.store = ratelimit.store, store
+
+            try:
+                started = time.perf_counter()
+
+                for index in range(requests):
+                    request.user_id = f'user:{index % 1000}'
+
+                    ratelimit.check_rate(request)
+
+                self.report('request check', requests, time.perf_counter() - started)
+            finally:
+                ratelimit.store = default_store
+
+            self.check_shared(path, options['processes'])
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    def check_shared(self, path, processes):
+        # 1000 tokens refilled at one per 1000 seconds: however the processes interleave, about 1000 get through.
+        results = multiprocessing.Queue()
+        workers = [
+            multiprocessing.Process(target=drain, args=(path, 'shared', 1000, results)) for _ in range(processes)
+        ]
+
+        for worker in workers:
+            worker.start()
+
+        allowed = sum(results.get() for _ in workers)
+
+        for worker in workers:
+            worker.join()
+
+        self.stdout.write(f'shared bucket: {allowed} of {processes * 1000} requests allowed across {processes} '
+                          f'processes with a burst of 1000')
+
+        if 1001 < allowed:
+            raise CommandError('Processes sharing the bucket file let more requests through than its burst.')
+
+    def report(self, label, requests, elapsed):
+        self.stdout.write(f'{label}: {elapsed / requests * 1_000_000:.1f}us each ({requests} in {elapsed:.2f}s)')
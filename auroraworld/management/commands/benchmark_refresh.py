@@ -0,0 +1,81 @@
+import time
+
+from django.db import connection
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory, override_settings
+
+from auroraworld.auth import refresh
+from auroraworld.ids import new_id
+from auroraworld.models import RevokedToken, User
+from auroraworld.tokens import create_refresh_token, user_cache
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+
+        return execute(sql, params, many, context)
+
+
+class Command(BaseCommand):
+    help = 'Drives the refresh view in-process with a throwaway user and reports refreshes per second.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000)
+
+    @override_settings(RATE_LIMIT_ENABLED=False)
+    def handle(self, *args, **options):
+        factory = RequestFactory()
+        user = User.objects.create(id=new_id(), email=f'benchmark-{new_id()}@example.com', password='!')
+
+        try:
+            for label, cold in (('rotation, cold user cache', True), ('rotation, warm user cache', False)):
+                refresh_token = create_refresh_token(user.id, user.email)
+
+                queries = QueryCounter()
+
+                with connection.execute_wrapper(queries):
+                    started = time.perf_counter()
+
+                    for _ in range(options['requests']):
+                        if cold:
+                            user_cache.clear()
+
+                        request = factory.get('/auth/refresh')
+                        request.COOKIES['refreshToken'] = refresh_token
+
+                        response = refresh(request)
+
+                        if response.status_code != 200:
+                            raise RuntimeError(f'Refresh failed with {response.status_code}.')
+
+                        refresh_token = response.cookies['refreshToken'].value
+
+                    elapsed = time.perf_counter() - started
+
+                self.stdout.write(
+                    f'{label}: {options["requests"] / elapsed:.0f} refreshes/s, '
+                    f'{queries.count / options["requests"]:.2f} queries per refresh'
+                )
+
+            # A revoked token must be rejected; the filter hit sends it to the table once.
+            request = factory.get('/auth/refresh')
+            request.COOKIES['refreshToken'] = create_refresh_token(user.id, user.email)
+
+            refresh(request)
+
+            started = time.perf_counter()
+
+            for _ in range(options['requests']):
+                if refresh(request).status_code != 401:
+                    raise RuntimeError('A reused refresh token was accepted.')
+
+            elapsed = time.perf_counter() - started
+
+            self.stdout.write(f'reused token: {options["requests"] / elapsed:.0f} rejections/s')
+        finally:
+            RevokedToken.objects.filter(user_id=user.id).delete()
+            user.delete()
@@ -0,0 +1,63 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+from rest_framework.renderers import JSONRenderer
+
+from auroraworld import benchmark, renderers
+from auroraworld.link import filter_links, link_rows, serialize_link, serialize_row
+from auroraworld.models import User
+
+
+class Command(BaseCommand):
+    help = ('Seeds one user with many links in a temporary database and reports rows per second for building '
+            'get_links rows from model instances or values_list tuples, and for rendering them with each encoder.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        with benchmark.temporary_database():
+            benchmark.seed(1, options['rows'], 0)
+
+            user_id = User.objects.values_list('id', flat=True).get()
+            existing_links = filter_links(user_id, 'own', 'all', '')
+
+            builders = {
+                'model instances': lambda: [serialize_link(existing_link) for existing_link in existing_links.all()],
+                'values_list': lambda: [serialize_row(row) for row in link_rows(existing_links.all())],
+            }
+
+            encoders = {'JSONRenderer': JSONRenderer().render}
+
+            if renderers.orjson:
+                encoders['FastJSONRenderer'] = renderers.FastJSONRenderer().render
+            else:
+                self.stdout.write('orjson is not installed; FastJSONRenderer falls back to JSONRenderer.')
+
+            for builder_name, build in builders.items():
+                data, elapsed = self.best(build, options['repeat'])
+
+                self.report(f'build, {builder_name}', len(data), elapsed)
+
+            payload = {'message': '', 'data': data, 'next': None}
+
+            with override_settings(FAST_JSON=True):
+                for encoder_name, render in encoders.items():
+                    content, elapsed = self.best(lambda: render(payload), options['repeat'])
+
+                    self.report(f'render, {encoder_name} ({len(content) // 1024} KiB)', len(data), elapsed)
+
+    def best(self, func, repeat):
+        elapsed = None
+
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = func()
+            elapsed = min(elapsed or float('inf'), time.perf_counter() - started)
+
+        return result, elapsed
+
+    def report(self, label, rows, elapsed):
+        self.stdout.write(f'{label}: {rows / elapsed:,.0f} rows/s ({elapsed * 1000:.1f}ms for {rows} rows)')
@@ -0,0 +1,88 @@
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand
+
+from auroraworld import search
+
+SYLLABLES = ['au', 'ro', 'ra', 'wor', 'ld', 'gi', 'ft', 'plu', 'sh', 'dja', 'ngo', 'py', 'thon', 're', 'ci', 'pe',
+             'tra', 'vel', 'mu', 'sic', 'ne', 'ws', 'de', 'sign', 'sto', 'doc', 'gui', 'tu', 'to', 'ri', 'al']
+
+
+class Command(BaseCommand):
+    help = 'Compares the LIKE name filter with the FTS5 index on a synthetic links table.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--links', type=int, default=1000000)
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--vocabulary', type=int, default=20000)
+        parser.add_argument('--queries', type=int, default=200)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        randomizer = random.Random(options['seed'])
+        words = list({
+            ''.join(randomizer.choices(SYLLABLES, k=randomizer.randint(2, 4)))
+            for _ in range(options['vocabulary'])
+        })
+
+        with tempfile.TemporaryDirectory() as directory:
+            connection = sqlite3.connect(os.path.join(directory, 'benchmark.sqlite3'))
+
+            connection.execute(
+                'CREATE TABLE links (id TEXT PRIMARY KEY, user_id TEXT NOT NULL, name TEXT NOT NULL, url TEXT NOT NULL)'
+            )
+            connection.execute('CREATE INDEX links_user_idx ON links (user_id)')
+
+            for sql in search.CREATE_SQL:
+                connection.execute(sql)
+
+            started = time.perf_counter()
+
+            connection.executemany('INSERT INTO links VALUES (?, ?, ?, ?)', (
+                (
+                    f'{index:032x}',
+                    f'user{randomizer.randrange(options["users"])}',
+                    ' '.join(randomizer.sample(words, 3)),
+                    f'https://{randomizer.choice(words)}.example.com/{index}',
+                )
+                for index in range(options['links'])
+            ))
+            connection.commit()
+
+            self.stdout.write(f'Inserted {options["links"]} links in {time.perf_counter() - started:.2f}s')
+
+            terms = [randomizer.choice(words) for _ in range(options['queries'])]
+            users = [f'user{randomizer.randrange(options["users"])}' for _ in range(options['queries'])]
+
+            cases = [
+                ('LIKE, all links', 'SELECT id FROM links WHERE name LIKE ?',
+                 lambda term, user: ('%' + term + '%',)),
+                ('FTS5, all links',
+                 'SELECT links.id FROM links, links_fts WHERE links_fts.rowid = links.rowid AND links_fts MATCH ? '
+                 'ORDER BY links_fts.rank',
+                 lambda term, user: (search.build_match_query(term),)),
+                ('LIKE, one user', 'SELECT id FROM links WHERE user_id = ? AND name LIKE ?',
+                 lambda term, user: (user, '%' + term + '%')),
+                ('FTS5, one user',
+                 'SELECT links.id FROM links, links_fts WHERE links_fts.rowid = links.rowid AND links_fts MATCH ? '
+                 'AND links.user_id = ? ORDER BY links_fts.rank',
+                 lambda term, user: (search.build_match_query(term), user)),
+            ]
+
+            for label, sql, params in cases:
+                started = time.perf_counter()
+
+                for term, user in zip(terms, users):
+                    connection.execute(sql, params(term, user)).fetchall()
+
+                elapsed = time.perf_counter() - started
+
+                self.stdout.write(
+                    f'{label}: {elapsed / len(terms) * 1000:.2f}ms/query ({len(terms) / elapsed:.1f} queries/s)'
+                )
+
+            connection.close()
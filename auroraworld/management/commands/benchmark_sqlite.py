@@ -0,0 +1,86 @@
+import os
+import sqlite3
+import tempfile
+import time
+import uuid
+from multiprocessing import Pool
+
+from django.core.management.base import BaseCommand
+
+from auroraworld.sqlite import get_pragmas, apply_pragmas
+
+
+def run_client(args):
+    path, role, seconds, pragmas = args
+
+    connection = sqlite3.connect(path, isolation_level=None)
+
+    if pragmas:
+        apply_pragmas(connection, pragmas)
+
+    operations = 0
+    locked = 0
+    deadline = time.perf_counter() + seconds
+
+    while time.perf_counter() < deadline:
+        try:
+            if role == 'writer':
+                connection.execute('BEGIN IMMEDIATE')
+                connection.execute('INSERT INTO links (id, user_id, name) VALUES (?, ?, ?)',
+                                   (uuid.uuid4().hex, 'user', 'name'))
+                connection.execute('COMMIT')
+            else:
+                connection.execute("SELECT id, name FROM links WHERE user_id = 'user' LIMIT 100").fetchall()
+
+            operations += 1
+        except sqlite3.OperationalError as error:
+            if 'locked' not in str(error):
+                raise
+
+            if connection.in_transaction:
+                connection.execute('ROLLBACK')
+
+            locked += 1
+
+    connection.close()
+
+    return role, operations, locked
+
+
+class Command(BaseCommand):
+    help = 'Measures concurrent read/write throughput on SQLite with and without the connection pragmas.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=4)
+        parser.add_argument('--writers', type=int, default=2)
+        parser.add_argument('--seconds', type=float, default=5)
+        parser.add_argument('--rows', type=int, default=10000)
+
+    def handle(self, *args, **options):
+        for label, pragmas in (('without pragmas', None), ('with pragmas', get_pragmas())):
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, 'benchmark.sqlite3')
+
+                connection = sqlite3.connect(path)
+                connection.execute(
+                    'CREATE TABLE links (id TEXT PRIMARY KEY, user_id TEXT NOT NULL, name TEXT NOT NULL)'
+                )
+                connection.execute('CREATE INDEX links_user_idx ON links (user_id)')
+                connection.executemany('INSERT INTO links VALUES (?, ?, ?)', (
+                    (uuid.uuid4().hex, 'user', 'name') for _ in range(options['rows'])
+                ))
+                connection.commit()
+                connection.close()
+
+                clients = ['reader'] * options['readers'] + ['writer'] * options['writers']
+
+                with Pool(len(clients)) as pool:
+                    results = pool.map(run_client, [(path, role, options['seconds'], pragmas) for role in clients])
+
+            for role in ('reader', 'writer'):
+                operations = sum(result[1] for result in results if result[0] == role)
+                locked = sum(result[2] for result in results if result[0] == role)
+
+                self.stdout.write(
+                    f'{label}, {role}s: {operations / options["seconds"]:.1f} ops/s, {locked} "database is locked"'
+                )
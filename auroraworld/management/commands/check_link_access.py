@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from auroraworld import access
+
+
+class Command(BaseCommand):
+    help = 'Compares user_link_access with the links and shares it is derived from, and optionally rebuilds it.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default')
+        parser.add_argument('--rebuild', action='store_true')
+
+    def handle(self, *args, **options):
+        if not access.is_supported(options['database']):
+            raise CommandError('The link access table is only maintained on SQLite.')
+
+        if options['rebuild']:
+            access.rebuild(options['database'])
+
+            self.stdout.write(self.style.SUCCESS('Link access table rebuilt.'))
+
+        missing, stale = access.check(options['database'])
+
+        if missing or stale:
+            raise CommandError(f'Link access table is out of date: {missing} missing rows, {stale} stale rows. '
+                               'Run with --rebuild to repair it.')
+
+        self.stdout.write(self.style.SUCCESS('Link access table is consistent.'))
@@ -0,0 +1,76 @@
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from auroraworld.link import filter_links
+from auroraworld.models import Category, Link, Share
+from auroraworld.user import filter_users, paginate_users, filter_recent_recipients
+from auroraworld.versions import USERS_KEY, links_key, version_query
+
+FULL_SCAN = re.compile(r'^SCAN (?:TABLE )?(\w+)(?!.*\b(?:USING|VIRTUAL TABLE)\b)')
+
+# Queries that read a whole (small or inherently unfiltered) table on purpose.
+ALLOWED_SCANS = {
+    'get_categories': {'categories'},
+    'get_users': {'users'},
+}
+
+
+def view_queries():
+    user_id = 'user_id'
+    link_id = 'link_id'
+    category_id = 'category_id'
+
+    return [
+        ('get_categories', Category.objects.all()),
+        ('get_users', filter_users(user_id, '')),
+        ('get_users search', paginate_users(filter_users(user_id, 'prefix'), 'cursor:id')),
+        ('get_users recent', filter_recent_recipients(user_id)),
+        ('get_users etag', version_query([USERS_KEY, links_key(user_id)])),
+        ('get_links own', filter_links(user_id, 'own', 'all', '')),
+        ('get_links own category', filter_links(user_id, 'own', category_id, '')),
+        ('get_links shared-unwritable', filter_links(user_id, 'shared-unwritable', 'all', '')),
+        ('get_links shared-writable', filter_links(user_id, 'shared-writable', category_id, '')),
+        ('get_links search', filter_links(user_id, 'own', 'all', 'name')),
+        ('get_links etag', version_query([links_key(user_id)])),
+        ('get_shares', Share.objects.filter(link_id=link_id, link__user_id=user_id)),
+        ('remove_link', Link.objects.filter(id=link_id, user_id=user_id)),
+        ('update_link', Link.objects.filter(id=link_id, accesses__user_id=user_id,
+                                            accesses__access_level__in=['own', 'shared-writable']).distinct()),
+        ('remove_update_share', Share.objects.filter(id=link_id, link__user_id=user_id)),
+    ]
+
+
+class Command(BaseCommand):
+    help = 'Runs EXPLAIN QUERY PLAN on each view query and fails on full table scans.'
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('EXPLAIN QUERY PLAN is only supported on SQLite.')
+
+        failures = []
+
+        for label, queryset in view_queries():
+            sql, params = queryset.query.sql_with_params()
+
+            with connection.cursor() as cursor:
+                cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+                plan = [row[-1] for row in cursor.fetchall()]
+
+            allowed = ALLOWED_SCANS.get(label.split(' ')[0], set())
+
+            self.stdout.write(label)
+
+            for detail in plan:
+                self.stdout.write('    ' + detail)
+
+                match = FULL_SCAN.match(detail)
+
+                if match and match.group(1) not in allowed:
+                    failures.append(f'{label}: {detail}')
+
+        if failures:
+            raise CommandError('Full table scans found:\n' + '\n'.join(failures))
+
+        self.stdout.write(self.style.SUCCESS('No full table scans found.'))
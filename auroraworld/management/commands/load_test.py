@@ -0,0 +1,71 @@
+import json
+import statistics
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = 'Fires concurrent requests at a running server and reports throughput and latency per concurrency level.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://localhost:4000')
+        parser.add_argument('--path', default='/api/categories')
+        parser.add_argument('--email', required=True)
+        parser.add_argument('--password', required=True)
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 10, 50, 100])
+
+    def handle(self, *args, **options):
+        access_token = self.sign_in(options['url'], options['email'], options['password'])
+
+        for concurrency in options['concurrency']:
+            with ThreadPoolExecutor(max_workers=concurrency) as clients:
+                started = time.perf_counter()
+
+                latencies = list(clients.map(
+                    lambda _: self.fetch(options['url'] + options['path'], access_token),
+                    range(options['requests']),
+                ))
+
+                elapsed = time.perf_counter() - started
+
+            latencies.sort()
+            failures = sum(1 for latency in latencies if latency is None)
+            latencies = [latency for latency in latencies if latency is not None] or [0.0]
+
+            self.stdout.write(
+                f'concurrency {concurrency}: {options["requests"] / elapsed:.1f} req/s, '
+                f'p50 {statistics.median(latencies) * 1000:.1f}ms, '
+                f'p95 {latencies[int(len(latencies) * 0.95) - 1] * 1000:.1f}ms, '
+                f'{failures} failed'
+            )
+
+    def sign_in(self, url, email, password):
+        request = urllib.request.Request(
+            url + '/auth/sign-in',
+            data=json.dumps({'email': email, 'password': password}).encode(),
+            headers={'Content-Type': 'application/json'},
+            method='POST',
+        )
+
+        try:
+            with urllib.request.urlopen(request) as response:
+                return json.load(response)['data']['accessToken']
+        except Exception as error:
+            raise CommandError(f'Sign-in failed: {error}')
+
+    def fetch(self, url, access_token):
+        request = urllib.request.Request(url, headers={'Authorization': 'Bearer ' + access_token})
+
+        started = time.perf_counter()
+
+        try:
+            with urllib.request.urlopen(request) as response:
+                response.read()
+        except Exception:
+            return None
+
+        return time.perf_counter() - started
@@ -0,0 +1,60 @@
+import mimetypes
+import os
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.core.management.base import BaseCommand
+from django.template.loader import render_to_string
+
+from auroraworld.compression import CODECS, COMPRESSIBLE_TYPES
+
+# The files served through serve_precompressed by the index and favicon views.
+STATIC_FILES = ['favicon.ico']
+TEMPLATES = ['index.html']
+
+# Build-time levels: slow to compress, but each file is compressed once and served many times.
+LEVELS = {'gzip': 9, 'br': 11, 'zstd': 19}
+
+
+class Command(BaseCommand):
+    help = 'Writes the favicon and the index template with gzip, brotli and zstd variants into PRECOMPRESSED_ROOT.'
+
+    def handle(self, *args, **options):
+        os.makedirs(settings.PRECOMPRESSED_ROOT, exist_ok=True)
+
+        for name in STATIC_FILES:
+            with open(finders.find(name), 'rb') as file:
+                self.write(name, file.read())
+
+        for name in TEMPLATES:
+            self.write(name, render_to_string(name).encode())
+
+    def write(self, name, content):
+        path = os.path.join(settings.PRECOMPRESSED_ROOT, name)
+
+        with open(path, 'wb') as file:
+            file.write(content)
+
+        sizes = [f'{len(content)} bytes']
+        content_type = mimetypes.guess_type(name)[0] or ''
+
+        for codec in CODECS.values():
+            if not codec or not content_type.startswith(COMPRESSIBLE_TYPES):
+                continue
+
+            variant = f'{path}.{codec.extension}'
+            compressed = codec.compress(content, LEVELS[codec.encoding])
+
+            # A variant that is not smaller is removed, so a stale one from an earlier build is never served.
+            if len(content) <= len(compressed):
+                if os.path.exists(variant):
+                    os.remove(variant)
+
+                continue
+
+            with open(variant, 'wb') as file:
+                file.write(compressed)
+
+            sizes.append(f'{codec.encoding} {len(compressed)}')
+
+        self.stdout.write(f'{name}: {", ".join(sizes)}')
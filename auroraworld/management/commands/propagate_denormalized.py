@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from auroraworld.propagation import propagate_all
+
+
+class Command(BaseCommand):
+    help = 'Rewrites the denormalized category names and user emails on links and shares from their sources.'
+
+    def handle(self, *args, **options):
+        totals = propagate_all()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Updated {totals["links"]} links and {totals["shares"]} shares in {totals["seconds"]:.3f}s.'
+        ))
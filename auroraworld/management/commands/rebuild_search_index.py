@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from auroraworld import search
+
+
+class Command(BaseCommand):
+    help = 'Recreates the links full-text search index and its triggers from the links table.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        if not search.is_supported(options['database']):
+            raise CommandError('Full-text search is only supported on SQLite.')
+
+        search.rebuild(options['database'])
+
+        self.stdout.write(self.style.SUCCESS('Search index rebuilt.'))
@@ -0,0 +1,23 @@
+import sqlite3
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = 'Copies the default SQLite database onto the read replica file with the online backup API.'
+
+    def handle(self, *args, **options):
+        if 'replica' not in settings.DATABASES:
+            raise CommandError('Set DATABASE_READ_NAME to configure a read replica.')
+
+        source = sqlite3.connect(settings.DATABASES['default']['NAME'])
+        target = sqlite3.connect(settings.DATABASES['replica']['NAME'])
+
+        with target:
+            source.backup(target)
+
+        source.close()
+        target.close()
+
+        self.stdout.write(self.style.SUCCESS(f'Copied the database to {settings.DATABASES["replica"]["NAME"]}.'))
@@ -0,0 +1,169 @@
+import hmac
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.http import HttpResponse
+
+from .category import local_categories
+from .histogram import Histogram
+from .tokens import revocation_index, user_cache
+from .verifyToken import token_cache_stats
+
+QUANTILES = [0.5, 0.9, 0.95, 0.99, 0.999]
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+MAX_CAPTURED_QUERIES = 50
+
+current_recorder = ContextVar('current_recorder', default=None)
+
+
+class QueryRecorder:
+    def __init__(self):
+        self.queries = 0
+        self.sql_duration = 0.0
+        self.statements = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+
+            self.queries += 1
+            self.sql_duration += elapsed
+
+            if len(self.statements) < MAX_CAPTURED_QUERIES:
+                self.statements.append((elapsed, sql))
+
+
+def record_query(execute, sql, params, many, context):
+    # Installed on every connection; the context variable carries the recorder into sync_to_async threads.
+    recorder = current_recorder.get()
+
+    if recorder is None:
+        return execute(sql, params, many, context)
+
+    return recorder(execute, sql, params, many, context)
+
+
+class RouteMetrics:
+    # Durations are recorded in microseconds and sizes in bytes; render() converts to Prometheus base units.
+    def __init__(self):
+        self.duration = Histogram()
+        self.queries = Histogram()
+        self.sql_duration = Histogram()
+        self.response_size = Histogram()
+        self.statuses = Counter()
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.routes = {}
+        self._lock = threading.Lock()
+
+    def route(self, route, method):
+        with self._lock:
+            return self.routes.setdefault((route, method), RouteMetrics())
+
+    def record(self, route, method, status, duration, queries, sql_duration, response_size):
+        metrics = self.route(route, method)
+
+        metrics.duration.record(duration * 1_000_000)
+        metrics.queries.record(queries)
+        metrics.sql_duration.record(sql_duration * 1_000_000)
+        metrics.response_size.record(response_size)
+
+        with self._lock:
+            metrics.statuses[status] += 1
+
+    def clear(self):
+        with self._lock:
+            self.routes.clear()
+
+
+registry = MetricsRegistry()
+
+
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_labels(labels):
+    return '{' + ','.join(f'{key}="{escape_label(value)}"' for key, value in labels.items()) + '}'
+
+
+def render_summary(lines, name, description, routes, attribute, scale):
+    lines.append(f'# HELP {name} {description}')
+    lines.append(f'# TYPE {name} summary')
+
+    for (route, method), metrics in routes:
+        histogram = getattr(metrics, attribute)
+        labels = {'route': route, 'method': method}
+
+        for quantile, value in histogram.percentiles(QUANTILES).items():
+            lines.append(f'{name}{format_labels({**labels, "quantile": quantile})} {value / scale:g}')
+
+        lines.append(f'{name}_sum{format_labels(labels)} {histogram.total / scale:g}')
+        lines.append(f'{name}_count{format_labels(labels)} {histogram.count}')
+
+
+def render_caches(lines, caches):
+    keys = sorted({key for stats in caches.values() for key in stats})
+
+    for key in keys:
+        lines.append(f'# HELP auroraworld_cache_{key} In-process cache and filter statistics.')
+        lines.append(f'# TYPE auroraworld_cache_{key} gauge')
+
+        for name, stats in caches.items():
+            if key in stats:
+                lines.append(f'auroraworld_cache_{key}{format_labels({"cache": name})} {stats[key]:g}')
+
+
+def render():
+    with registry._lock:
+        routes = sorted(registry.routes.items())
+        statuses = [(key, dict(metrics.statuses)) for key, metrics in routes]
+
+    lines = []
+
+    render_summary(lines, 'auroraworld_request_duration_seconds', 'Wall time per request.', routes, 'duration',
+                   1_000_000)
+    render_summary(lines, 'auroraworld_request_queries', 'SQL queries per request.', routes, 'queries', 1)
+    render_summary(lines, 'auroraworld_request_sql_duration_seconds', 'SQL time per request.', routes,
+                   'sql_duration', 1_000_000)
+    render_summary(lines, 'auroraworld_response_size_bytes', 'Response body size.', routes, 'response_size', 1)
+
+    lines.append('# HELP auroraworld_requests_total Requests by route, method and status.')
+    lines.append('# TYPE auroraworld_requests_total counter')
+
+    for (route, method), counts in statuses:
+        for status, count in sorted(counts.items()):
+            labels = format_labels({'route': route, 'method': method, 'status': status})
+
+            lines.append(f'auroraworld_requests_total{labels} {count}')
+
+    render_caches(lines, {
+        'token': token_cache_stats(),
+        'user': user_cache.stats(),
+        'category': local_categories.stats(),
+        'revocation': revocation_index.stats(),
+    })
+
+    return '\n'.join(lines) + '\n'
+
+
+def get_metrics(request):
+    # Scrapers send METRICS_TOKEN as a bearer token. Route names, latencies and cache sizes are not for the public,
+    # so without a token configured the endpoint turns every request away.
+    authorization = request.META.get('HTTP_AUTHORIZATION', '')
+
+    if not settings.METRICS_TOKEN or not hmac.compare_digest(authorization, f'Bearer {settings.METRICS_TOKEN}'):
+        return HttpResponse('Unauthorized\n', status=401, content_type=CONTENT_TYPE)
+
+    return HttpResponse(render(), content_type=CONTENT_TYPE)
@@ -0,0 +1,124 @@
+import logging
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from .compression import compress_response
+from .metrics import QueryRecorder, current_recorder, registry
+
+logger = logging.getLogger(__name__)
+
+
+class RequestMetrics:
+    def __init__(self, request):
+        self.request = request
+        self.started = time.perf_counter()
+        self.recorder = QueryRecorder()
+        self.size = 0
+
+        current_recorder.set(self.recorder)
+
+    def finish(self, response):
+        if not response.streaming:
+            self.size = len(response.content)
+            self.record(response)
+        elif response.is_async:
+            response.streaming_content = self.astream(response, response.streaming_content)
+        else:
+            response.streaming_content = self.stream(response, response.streaming_content)
+
+        return response
+
+    def stream(self, response, chunks):
+        # Streamed responses are recorded when the last chunk is sent, so their queries and time are included.
+        try:
+            for chunk in chunks:
+                self.size += len(chunk)
+
+                yield chunk
+        finally:
+            self.record(response)
+
+    async def astream(self, response, chunks):
+        try:
+            async for chunk in chunks:
+                self.size += len(chunk)
+
+                yield chunk
+        finally:
+            self.record(response)
+
+    def record(self, response):
+        current_recorder.set(None)
+
+        match = self.request.resolver_match
+        route = match.route if match else 'unmatched'
+        duration = time.perf_counter() - self.started
+
+        registry.record(route, self.request.method, response.status_code, duration, self.recorder.queries,
+                        self.recorder.sql_duration, self.size)
+
+        if settings.SLOW_REQUEST_MS <= duration * 1000:
+            self.log_slow(route, response, duration)
+
+    def log_slow(self, route, response, duration):
+        statements = '\n'.join(f'  {elapsed * 1000:8.2f}ms  {sql}' for elapsed, sql in self.recorder.statements)
+
+        logger.warning(
+            'Slow request %s %s (%s) %d in %.1fms: %d queries, %.1fms SQL, %d bytes\n%s',
+            self.request.method, self.request.path, route, response.status_code, duration * 1000,
+            self.recorder.queries, self.recorder.sql_duration * 1000, self.size, statements,
+        )
+
+
+class MetricsMiddleware:
+    # Records wall time, SQL query count, SQL time and response size per URL pattern into metrics.registry.
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        if not settings.METRICS_ENABLED:
+            return self.get_response(request)
+
+        metrics = RequestMetrics(request)
+
+        return metrics.finish(self.get_response(request))
+
+    async def __acall__(self, request):
+        if not settings.METRICS_ENABLED:
+            return await self.get_response(request)
+
+        metrics = RequestMetrics(request)
+
+        return metrics.finish(await self.get_response(request))
+
+
+class CompressionMiddleware:
+    # Compresses compressible responses above COMPRESSION_MIN_SIZE with the best encoding the client accepts.
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        return compress_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return compress_response(request, await self.get_response(request))
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.19 on 2026-10-18 09:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auroraworld', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='link',
+            index=models.Index(fields=['user', 'category', 'id'], name='links_user_category_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='share',
+            index=models.Index(fields=['user', 'is_writable', 'link'], name='shares_user_writable_idx'),
+        ),
+    ]
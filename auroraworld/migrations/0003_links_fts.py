@@ -0,0 +1,53 @@
+from django.db import migrations
+
+# The links_fts index and its triggers as auroraworld/search.py defined them when this migration was written.
+# Migrations keep their own copy of the SQL, so later changes to search.py do not change what this one does.
+CREATE_SQL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS links_fts USING fts5(name, url, content='links', content_rowid='rowid')",
+    """CREATE TRIGGER IF NOT EXISTS links_fts_insert AFTER INSERT ON links BEGIN
+        INSERT INTO links_fts(rowid, name, url) VALUES (new.rowid, new.name, new.url);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS links_fts_delete AFTER DELETE ON links BEGIN
+        INSERT INTO links_fts(links_fts, rowid, name, url) VALUES ('delete', old.rowid, old.name, old.url);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS links_fts_update AFTER UPDATE OF name, url ON links BEGIN
+        INSERT INTO links_fts(links_fts, rowid, name, url) VALUES ('delete', old.rowid, old.name, old.url);
+        INSERT INTO links_fts(rowid, name, url) VALUES (new.rowid, new.name, new.url);
+    END""",
+]
+
+DROP_SQL = [
+    'DROP TRIGGER IF EXISTS links_fts_insert',
+    'DROP TRIGGER IF EXISTS links_fts_delete',
+    'DROP TRIGGER IF EXISTS links_fts_update',
+    'DROP TABLE IF EXISTS links_fts',
+]
+
+REBUILD_SQL = "INSERT INTO links_fts(links_fts) VALUES ('rebuild')"
+
+
+def install(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+
+    for sql in DROP_SQL + CREATE_SQL + [REBUILD_SQL]:
+        schema_editor.execute(sql)
+
+
+def uninstall(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+
+    for sql in DROP_SQL:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auroraworld', '0002_link_share_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(install, uninstall),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 4.2.19 on 2026-10-18 09:23
+
+from django.db import migrations, models
+
+# The links_fts triggers as 0003_links_fts installed them, copied so this migration does not depend on search.py.
+CREATE_SQL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS links_fts USING fts5(name, url, content='links', content_rowid='rowid')",
+    """CREATE TRIGGER IF NOT EXISTS links_fts_insert AFTER INSERT ON links BEGIN
+        INSERT INTO links_fts(rowid, name, url) VALUES (new.rowid, new.name, new.url);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS links_fts_delete AFTER DELETE ON links BEGIN
+        INSERT INTO links_fts(links_fts, rowid, name, url) VALUES ('delete', old.rowid, old.name, old.url);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS links_fts_update AFTER UPDATE OF name, url ON links BEGIN
+        INSERT INTO links_fts(links_fts, rowid, name, url) VALUES ('delete', old.rowid, old.name, old.url);
+        INSERT INTO links_fts(rowid, name, url) VALUES (new.rowid, new.name, new.url);
+    END""",
+]
+
+DROP_SQL = [
+    'DROP TRIGGER IF EXISTS links_fts_insert',
+    'DROP TRIGGER IF EXISTS links_fts_delete',
+    'DROP TRIGGER IF EXISTS links_fts_update',
+    'DROP TABLE IF EXISTS links_fts',
+]
+
+REBUILD_SQL = "INSERT INTO links_fts(links_fts) VALUES ('rebuild')"
+
+
+def install(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+
+    for sql in DROP_SQL + CREATE_SQL + [REBUILD_SQL]:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auroraworld', '0003_links_fts'),
+    ]
+
+    operations = [
+        # Unapplying removes the columns below, which rebuilds the links table again, so the triggers go back in
+        # once that is done.
+        migrations.RunPython(migrations.RunPython.noop, install),
+        migrations.AddField(
+            model_name='link',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_column='updated_at'),
+        ),
+        migrations.AddField(
+            model_name='share',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_column='updated_at'),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_column='updated_at'),
+        ),
+        # Adding a NOT NULL column rebuilds the links table on SQLite, which drops the search triggers.
+        migrations.RunPython(install, migrations.RunPython.noop),
+    ]
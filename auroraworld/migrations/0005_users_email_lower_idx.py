@@ -0,0 +1,18 @@
+# Generated by Django 4.2.19 on 2026-10-18 09:31
+
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auroraworld', '0004_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(django.db.models.functions.text.Lower('email'), models.F('id'), name='users_email_lower_idx'),
+        ),
+    ]
@@ -0,0 +1,103 @@
+# Generated by Django 4.2.19 on 2026-10-18 09:33
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+# The user_link_access triggers as auroraworld/access.py defined them when this migration was written. Migrations
+# keep their own copy of the SQL, so later changes to access.py do not change what this one does.
+CREATE_SQL = [
+    """CREATE TRIGGER IF NOT EXISTS access_link_insert AFTER INSERT ON links BEGIN
+        INSERT INTO user_link_access (user_id, link_id, access_level, category_id)
+        VALUES (new.user_id, new.id, 'own', new.category_id);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS access_link_delete AFTER DELETE ON links BEGIN
+        DELETE FROM user_link_access WHERE link_id = old.id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS access_link_update AFTER UPDATE OF user_id, category_id ON links
+    WHEN old.user_id IS NOT new.user_id OR old.category_id IS NOT new.category_id BEGIN
+        UPDATE user_link_access SET category_id = new.category_id WHERE link_id = new.id;
+        UPDATE user_link_access SET user_id = new.user_id WHERE link_id = new.id AND access_level = 'own';
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS access_share_insert AFTER INSERT ON shares BEGIN
+        INSERT INTO user_link_access (user_id, link_id, access_level, category_id)
+        SELECT new.user_id, new.link_id, CASE WHEN new.is_writable THEN 'shared-writable' ELSE 'shared-unwritable' END,
+            category_id
+        FROM links WHERE id = new.link_id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS access_share_delete AFTER DELETE ON shares BEGIN
+        DELETE FROM user_link_access WHERE user_id = old.user_id AND link_id = old.link_id
+        AND access_level IN ('shared-writable', 'shared-unwritable');
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS access_share_update AFTER UPDATE OF user_id, link_id, is_writable ON shares
+    WHEN old.user_id IS NOT new.user_id OR old.link_id IS NOT new.link_id OR old.is_writable IS NOT new.is_writable
+    BEGIN
+        DELETE FROM user_link_access WHERE user_id = old.user_id AND link_id = old.link_id
+        AND access_level IN ('shared-writable', 'shared-unwritable');
+        INSERT INTO user_link_access (user_id, link_id, access_level, category_id)
+        SELECT new.user_id, new.link_id, CASE WHEN new.is_writable THEN 'shared-writable' ELSE 'shared-unwritable' END,
+            category_id
+        FROM links WHERE id = new.link_id;
+    END""",
+]
+
+DROP_SQL = [
+    'DROP TRIGGER IF EXISTS access_link_insert',
+    'DROP TRIGGER IF EXISTS access_link_delete',
+    'DROP TRIGGER IF EXISTS access_link_update',
+    'DROP TRIGGER IF EXISTS access_share_insert',
+    'DROP TRIGGER IF EXISTS access_share_delete',
+    'DROP TRIGGER IF EXISTS access_share_update',
+]
+
+REBUILD_SQL = [
+    'DELETE FROM user_link_access',
+    """INSERT INTO user_link_access (user_id, link_id, access_level, category_id)
+    SELECT user_id, id, 'own', category_id FROM links
+    UNION ALL
+    SELECT shares.user_id, shares.link_id,
+        CASE WHEN shares.is_writable THEN 'shared-writable' ELSE 'shared-unwritable' END, links.category_id
+    FROM shares JOIN links ON links.id = shares.link_id""",
+]
+
+
+def install(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+
+    for sql in DROP_SQL + CREATE_SQL + REBUILD_SQL:
+        schema_editor.execute(sql)
+
+
+def uninstall(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+
+    for sql in DROP_SQL:
+        schema_editor.execute(sql)
+
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auroraworld', '0005_users_email_lower_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserLinkAccess',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('access_level', models.CharField(db_column='access_level', max_length=32)),
+                ('category_id', models.CharField(db_column='category_id', max_length=255)),
+                ('link', models.ForeignKey(db_column='link_id', on_delete=django.db.models.deletion.DO_NOTHING, related_name='accesses', to='auroraworld.link')),
+                ('user', models.ForeignKey(db_column='user_id', on_delete=django.db.models.deletion.DO_NOTHING, to='auroraworld.user')),
+            ],
+            options={
+                'db_table': 'user_link_access',
+                'indexes': [models.Index(fields=['user', 'access_level', 'category_id', 'link'], name='access_user_level_cat_idx')],
+                'unique_together': {('user', 'access_level', 'link')},
+            },
+        ),
+        migrations.RunPython(install, uninstall),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.19 on 2026-10-18 09:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auroraworld', '0006_user_link_access'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RevokedToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('jti', models.CharField(db_column='jti', max_length=255, unique=True)),
+                ('user_id', models.CharField(db_column='user_id', max_length=255)),
+                ('expires_at', models.DateTimeField(db_column='expires_at', db_index=True)),
+            ],
+            options={
+                'db_table': 'revoked_tokens',
+            },
+        ),
+    ]
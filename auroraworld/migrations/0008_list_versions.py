@@ -0,0 +1,112 @@
+# Generated by Django 4.2.19 on 2026-10-18 10:25
+
+from django.db import migrations, models
+
+# The list_versions triggers as auroraworld/versions.py defined them when this migration was written. Migrations
+# keep their own copy of the SQL, so later changes to versions.py do not change what this one does.
+USERS_KEY = 'users'
+
+NOW_SQL = "CAST((julianday('now') - 2440587.5) * 86400000000 AS INTEGER)"
+
+
+def bump(keys):
+    # The WHERE clause is required for SQLite to parse ON CONFLICT after INSERT ... SELECT.
+    return (f'INSERT INTO list_versions (key, version) SELECT key, {NOW_SQL} FROM ({keys}) WHERE true '
+            f'ON CONFLICT (key) DO UPDATE SET version = max(version + 1, excluded.version);')
+
+
+def link_users(row):
+    # The link's owner and everyone it is shared with.
+    return (f"SELECT 'links:' || {row}.user_id AS key "
+            f"UNION SELECT 'links:' || user_id FROM shares WHERE link_id = {row}.id")
+
+
+def share_users(row):
+    # The recipient, who sees the link in get_links, and the owner, whose recent recipients change.
+    return (f"SELECT 'links:' || {row}.user_id AS key "
+            f"UNION SELECT 'links:' || user_id FROM links WHERE id = {row}.link_id")
+
+
+CREATE_SQL = [
+    f"""CREATE TRIGGER IF NOT EXISTS versions_link_insert AFTER INSERT ON links BEGIN
+        {bump(link_users('new'))}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS versions_link_update AFTER UPDATE ON links BEGIN
+        {bump(link_users('old') + ' UNION ' + link_users('new'))}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS versions_link_delete AFTER DELETE ON links BEGIN
+        {bump(link_users('old'))}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS versions_share_insert AFTER INSERT ON shares BEGIN
+        {bump(share_users('new'))}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS versions_share_update AFTER UPDATE ON shares BEGIN
+        {bump(share_users('old') + ' UNION ' + share_users('new'))}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS versions_share_delete AFTER DELETE ON shares BEGIN
+        {bump(share_users('old'))}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS versions_user_insert AFTER INSERT ON users BEGIN
+        {bump(f"SELECT '{USERS_KEY}' AS key UNION SELECT 'links:' || new.id")}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS versions_user_update AFTER UPDATE OF id, email ON users BEGIN
+        {bump(f"SELECT '{USERS_KEY}' AS key")}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS versions_user_delete AFTER DELETE ON users BEGIN
+        {bump(f"SELECT '{USERS_KEY}' AS key")}
+    END""",
+]
+
+DROP_SQL = [
+    'DROP TRIGGER IF EXISTS versions_link_insert',
+    'DROP TRIGGER IF EXISTS versions_link_update',
+    'DROP TRIGGER IF EXISTS versions_link_delete',
+    'DROP TRIGGER IF EXISTS versions_share_insert',
+    'DROP TRIGGER IF EXISTS versions_share_update',
+    'DROP TRIGGER IF EXISTS versions_share_delete',
+    'DROP TRIGGER IF EXISTS versions_user_insert',
+    'DROP TRIGGER IF EXISTS versions_user_update',
+    'DROP TRIGGER IF EXISTS versions_user_delete',
+]
+
+# Every list starts from the time the triggers were installed.
+SEED_SQL = [
+    bump(f"SELECT '{USERS_KEY}' AS key UNION SELECT 'links:' || id FROM users"),
+]
+
+
+def install(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+
+    for sql in DROP_SQL + CREATE_SQL + SEED_SQL:
+        schema_editor.execute(sql)
+
+
+def uninstall(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+
+    for sql in DROP_SQL:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auroraworld', '0007_revoked_tokens'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ListVersion',
+            fields=[
+                ('key', models.CharField(db_column='key', max_length=255, primary_key=True, serialize=False)),
+                ('version', models.BigIntegerField(db_column='version')),
+            ],
+            options={
+                'db_table': 'list_versions',
+            },
+        ),
+        migrations.RunPython(install, uninstall),
+    ]
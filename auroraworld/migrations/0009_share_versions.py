@@ -0,0 +1,90 @@
+from django.db import migrations
+
+# Reinstalls the link and share triggers of 0008_list_versions so that they also move the link's 'shares:<link id>'
+# version. Unapplying puts the 0008 triggers back. The SQL is copied here for the same reason as in 0008.
+NOW_SQL = "CAST((julianday('now') - 2440587.5) * 86400000000 AS INTEGER)"
+
+
+def bump(keys):
+    # The WHERE clause is required for SQLite to parse ON CONFLICT after INSERT ... SELECT.
+    return (f'INSERT INTO list_versions (key, version) SELECT key, {NOW_SQL} FROM ({keys}) WHERE true '
+            f'ON CONFLICT (key) DO UPDATE SET version = max(version + 1, excluded.version);')
+
+
+def link_lists(row, shares):
+    keys = (f"SELECT 'links:' || {row}.user_id AS key "
+            f"UNION SELECT 'links:' || user_id FROM shares WHERE link_id = {row}.id")
+
+    return f"{keys} UNION SELECT 'shares:' || {row}.id" if shares else keys
+
+
+def share_lists(row, shares):
+    keys = (f"SELECT 'links:' || {row}.user_id AS key "
+            f"UNION SELECT 'links:' || user_id FROM links WHERE id = {row}.link_id")
+
+    return f"{keys} UNION SELECT 'shares:' || {row}.link_id" if shares else keys
+
+
+def create_sql(shares):
+    return [
+        f"""CREATE TRIGGER IF NOT EXISTS versions_link_insert AFTER INSERT ON links BEGIN
+        {bump(link_lists('new', shares))}
+    END""",
+        f"""CREATE TRIGGER IF NOT EXISTS versions_link_update AFTER UPDATE ON links BEGIN
+        {bump(link_lists('old', shares) + ' UNION ' + link_lists('new', shares))}
+    END""",
+        f"""CREATE TRIGGER IF NOT EXISTS versions_link_delete AFTER DELETE ON links BEGIN
+        {bump(link_lists('old', shares))}
+    END""",
+        f"""CREATE TRIGGER IF NOT EXISTS versions_share_insert AFTER INSERT ON shares BEGIN
+        {bump(share_lists('new', shares))}
+    END""",
+        f"""CREATE TRIGGER IF NOT EXISTS versions_share_update AFTER UPDATE ON shares BEGIN
+        {bump(share_lists('old', shares) + ' UNION ' + share_lists('new', shares))}
+    END""",
+        f"""CREATE TRIGGER IF NOT EXISTS versions_share_delete AFTER DELETE ON shares BEGIN
+        {bump(share_lists('old', shares))}
+    END""",
+    ]
+
+
+DROP_SQL = [
+    'DROP TRIGGER IF EXISTS versions_link_insert',
+    'DROP TRIGGER IF EXISTS versions_link_update',
+    'DROP TRIGGER IF EXISTS versions_link_delete',
+    'DROP TRIGGER IF EXISTS versions_share_insert',
+    'DROP TRIGGER IF EXISTS versions_share_update',
+    'DROP TRIGGER IF EXISTS versions_share_delete',
+]
+
+# Every shares list starts from the time the triggers were installed.
+SEED_SQL = [
+    bump("SELECT 'shares:' || id AS key FROM links"),
+]
+
+
+def install(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+
+    for sql in DROP_SQL + create_sql(shares=True) + SEED_SQL:
+        schema_editor.execute(sql)
+
+
+def uninstall(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+
+    for sql in DROP_SQL + create_sql(shares=False):
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auroraworld', '0008_list_versions'),
+    ]
+
+    operations = [
+        migrations.RunPython(install, uninstall),
+    ]
@@ -1,13 +1,18 @@
 from django.db import models
+from django.db.models.functions import Lower
 
 
 class User(models.Model):
     id = models.CharField(primary_key=True, max_length=255, db_column='id')
     email = models.CharField(unique=True, max_length=255, db_column='email')
     password = models.CharField(max_length=255, db_column='password')
+    updated_at = models.DateTimeField(auto_now=True, db_column='updated_at')
 
     class Meta:
         db_table = 'users'
+        indexes = [
+            models.Index(Lower('email'), 'id', name='users_email_lower_idx'),
+        ]
 
     def __str__(self):
         return self.id
@@ -40,9 +45,13 @@ class Link(models.Model):
     category_name = models.CharField(max_length=255, db_column='category_name')
     name = models.CharField(max_length=255, db_column='name')
     url = models.CharField(max_length=255, db_column='url')
+    updated_at = models.DateTimeField(auto_now=True, db_column='updated_at')
 
     class Meta:
         db_table = 'links'
+        indexes = [
+            models.Index(fields=['user', 'category', 'id'], name='links_user_category_idx'),
+        ]
 
     def __str__(self):
         return self.id
@@ -62,10 +71,71 @@ class Share(models.Model):
     )
     user_email = models.CharField(max_length=255, db_column='user_email')
     is_writable = models.BooleanField(default=False, db_column='is_writable')
+    updated_at = models.DateTimeField(auto_now=True, db_column='updated_at')
 
     class Meta:
         db_table = 'shares'
         unique_together = (('link', 'user'),)
+        indexes = [
+            models.Index(fields=['user', 'is_writable', 'link'], name='shares_user_writable_idx'),
+        ]
 
     def __str__(self):
         return self.id
+
+
+# One row per link a user can see: their own links plus every share they receive. The rows are
+# maintained by the SQLite triggers in access.py, so the foreign keys leave deletion to them.
+class UserLinkAccess(models.Model):
+    OWN = 'own'
+    SHARED_WRITABLE = 'shared-writable'
+    SHARED_UNWRITABLE = 'shared-unwritable'
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.DO_NOTHING,
+        db_column='user_id'
+    )
+    link = models.ForeignKey(
+        Link,
+        on_delete=models.DO_NOTHING,
+        related_name='accesses',
+        db_column='link_id'
+    )
+    access_level = models.CharField(max_length=32, db_column='access_level')
+    category_id = models.CharField(max_length=255, db_column='category_id')
+
+    class Meta:
+        db_table = 'user_link_access'
+        unique_together = (('user', 'access_level', 'link'),)
+        indexes = [
+            models.Index(fields=['user', 'access_level', 'category_id', 'link'], name='access_user_level_cat_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.user_id}:{self.access_level}:{self.link_id}'
+
+
+class RevokedToken(models.Model):
+    jti = models.CharField(unique=True, max_length=255, db_column='jti')
+    user_id = models.CharField(max_length=255, db_column='user_id')
+    expires_at = models.DateTimeField(db_index=True, db_column='expires_at')
+
+    class Meta:
+        db_table = 'revoked_tokens'
+
+    def __str__(self):
+        return self.jti
+
+
+# A high-water mark per cached list, moved on by the SQLite triggers in versions.py whenever a row the list shows
+# changes, so a list ETag is one primary key lookup however many rows the list holds.
+class ListVersion(models.Model):
+    key = models.CharField(primary_key=True, max_length=255, db_column='key')
+    version = models.BigIntegerField(db_column='version')
+
+    class Meta:
+        db_table = 'list_versions'
+
+    def __str__(self):
+        return f'{self.key}:{self.version}'
@@ -0,0 +1,10 @@
+def parse_limit(limit, cursor, max_limit):
+    # The page size for a list request: the requested limit capped at max_limit, max_limit when only a cursor is
+    # given, or None for the whole list. Anything but a positive integer raises ValueError.
+    if limit:
+        if not limit.isdigit() or int(limit) <= 0:
+            raise ValueError(limit)
+
+        return min(int(limit), max_limit)
+
+    return max_limit if cursor else None
@@ -0,0 +1,97 @@
+import logging
+import time
+
+from django.utils import timezone
+
+from .models import Category, Link, Share, User
+from .sqlite import immediate_atomic
+
+logger = logging.getLogger(__name__)
+
+PROPAGATION_BATCH_SIZE = 500
+
+
+def update_in_batches(stale_rows, **values):
+    # Walks the stale rows in primary key order so every UPDATE touches at most one batch of rows.
+    # queryset.update() skips auto_now, so updated_at is set explicitly.
+    rows = 0
+    last_id = ''
+
+    while True:
+        ids = list(
+            stale_rows.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:PROPAGATION_BATCH_SIZE]
+        )
+
+        if not ids:
+            return rows
+
+        rows += stale_rows.model.objects.filter(id__in=ids).update(updated_at=timezone.now(), **values)
+        last_id = ids[-1]
+
+
+def propagate_category(category_id, category_name):
+    started = time.perf_counter()
+
+    with immediate_atomic():
+        rows = update_in_batches(
+            Link.objects.filter(category_id=category_id).exclude(category_name=category_name),
+            category_name=category_name,
+        )
+
+    elapsed = time.perf_counter() - started
+
+    logger.info('Propagated category %s to %d links in %.3fs', category_id, rows, elapsed)
+
+    return {'links': rows, 'seconds': elapsed}
+
+
+def propagate_user(user_id, email):
+    started = time.perf_counter()
+
+    with immediate_atomic():
+        links = update_in_batches(
+            Link.objects.filter(user_id=user_id).exclude(created_by=email),
+            created_by=email,
+        )
+        shares = update_in_batches(
+            Share.objects.filter(user_id=user_id).exclude(user_email=email),
+            user_email=email,
+        )
+
+    elapsed = time.perf_counter() - started
+
+    logger.info('Propagated user %s to %d links and %d shares in %.3fs', user_id, links, shares, elapsed)
+
+    return {'links': links, 'shares': shares, 'seconds': elapsed}
+
+
+def track_change(instance, field, update_fields):
+    # Called from pre_save: remembers whether the denormalized source column is about to change.
+    instance._propagate = False
+
+    if instance._state.adding or (update_fields is not None and field not in update_fields):
+        return
+
+    previous = type(instance).objects.filter(pk=instance.pk).values_list(field, flat=True).first()
+
+    instance._propagate = previous is not None and previous != getattr(instance, field)
+
+
+def propagate_all():
+    # Re-applies every category name and user email, for rows written before propagation existed.
+    totals = {'links': 0, 'shares': 0, 'seconds': 0.0}
+
+    for category_id, category_name in Category.objects.values_list('id', 'name'):
+        result = propagate_category(category_id, category_name)
+
+        totals['links'] += result['links']
+        totals['seconds'] += result['seconds']
+
+    for user_id, email in User.objects.values_list('id', 'email'):
+        result = propagate_user(user_id, email)
+
+        totals['links'] += result['links']
+        totals['shares'] += result['shares']
+        totals['seconds'] += result['seconds']
+
+    return totals
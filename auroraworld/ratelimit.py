@@ -0,0 +1,174 @@
+import math
+import random
+import sqlite3
+import threading
+import time
+from functools import lru_cache, wraps
+
+from django.conf import settings
+from django.http import JsonResponse
+
+from .verifyToken import token_user_id
+
+PERIODS = {'second': 1, 'minute': 60, 'hour': 60 * 60, 'day': 24 * 60 * 60}
+
+# One upsert refills the bucket for the time since its last update and takes a token if a whole one is left, so
+# workers sharing the file never read and write in separate steps. A new key starts with a full bucket.
+TAKE_SQL = '''
+INSERT INTO rate_buckets (key, tokens, updated_at, allowed) VALUES (:key, :capacity - 1, :now, 1)
+ON CONFLICT (key) DO UPDATE SET
+    allowed = min(:capacity, tokens + max(0, :now - updated_at) * :rate) >= 1,
+    tokens = min(:capacity, tokens + max(0, :now - updated_at) * :rate)
+        - (min(:capacity, tokens + max(0, :now - updated_at) * :rate) >= 1),
+    updated_at = max(:now, updated_at)
+RETURNING allowed, tokens
+'''
+
+
+@lru_cache(maxsize=None)
+def parse_rate(rate):
+    # '10/minute' is a burst of 10 requests refilled at 10 per minute.
+    count, _, period = rate.partition('/')
+
+    return int(count), int(count) / PERIODS[period]
+
+
+class TokenBucketStore:
+    # Buckets live in a small SQLite file of their own, outside Django's connections and transactions, so every
+    # gunicorn worker on the host shares them. Losing the counters in a crash is harmless, hence synchronous = OFF.
+    # The check runs on the event loop in the async views, so it waits at most RATE_LIMIT_BUSY_TIMEOUT for the write
+    # lock before the decorators give up and let the request through.
+    def __init__(self, path):
+        self.path = path
+        self.allowed = 0
+        self.limited = 0
+        self._local = threading.local()
+
+    def connection(self):
+        connection = getattr(self._local, 'connection', None)
+
+        if connection is None:
+            connection = sqlite3.connect(str(self.path), isolation_level=None, check_same_thread=False)
+            connection.execute(f'PRAGMA busy_timeout = {settings.RATE_LIMIT_BUSY_TIMEOUT}')
+            connection.execute('PRAGMA journal_mode = WAL')
+            connection.execute('PRAGMA synchronous = OFF')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS rate_buckets '
+                '(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL, allowed INTEGER NOT NULL) '
+                'WITHOUT ROWID'
+            )
+
+            self._local.connection = connection
+
+        return connection
+
+    def take(self, key, capacity, rate, now=None):
+        now = time.time() if now is None else now
+        connection = self.connection()
+
+        allowed, tokens = connection.execute(
+            TAKE_SQL, {'key': key, 'capacity': capacity, 'rate': rate, 'now': now}
+        ).fetchone()
+
+        if allowed:
+            self.allowed += 1
+        else:
+            self.limited += 1
+
+        if random.random() < settings.RATE_LIMIT_PRUNE_PROBABILITY:
+            self.prune(now)
+
+        return bool(allowed), tokens
+
+    def prune(self, now=None):
+        # A bucket left alone this long has refilled, so dropping its row changes nothing.
+        now = time.time() if now is None else now
+
+        self.connection().execute(
+            'DELETE FROM rate_buckets WHERE updated_at < ?', (now - settings.RATE_LIMIT_IDLE_SECONDS,)
+        )
+
+    def stats(self):
+        return {'allowed': self.allowed, 'limited': self.limited}
+
+
+store = TokenBucketStore(settings.RATE_LIMIT_DATABASE)
+
+
+def get_route(request):
+    match = getattr(request, 'resolver_match', None)
+
+    return match.route if match else request.path_info.lstrip('/')
+
+
+def get_client_ip(request):
+    # Behind a proxy, set RATE_LIMIT_IP_HEADER to the header it fills in, such as HTTP_X_REAL_IP.
+    return request.META.get(settings.RATE_LIMIT_IP_HEADER) or request.META.get('REMOTE_ADDR', '')
+
+
+def check_rate(request):
+    # Returns a 429 response when the caller is over the route's budget, otherwise None. Callers are keyed by the
+    # user their bearer token names, or by client IP when there is no valid token, as on the auth routes.
+    if not settings.RATE_LIMIT_ENABLED:
+        return None
+
+    route = get_route(request)
+    rate = settings.RATE_LIMITS.get(route, settings.RATE_LIMITS.get('*'))
+
+    if not rate:
+        return None
+
+    user_id = getattr(request, 'user_id', None) or token_user_id(request)
+    key = f'{route}|user:{user_id}' if user_id else f'{route}|ip:{get_client_ip(request)}'
+    capacity, refill = parse_rate(rate)
+
+    allowed, tokens = store.take(key, capacity, refill)
+
+    if allowed:
+        return None
+
+    response = JsonResponse({'message': 'Too Many Requests'}, status=429)
+    response.headers['Retry-After'] = str(max(1, math.ceil((1 - tokens) / refill)))
+
+    return response
+
+
+def rate_limit(func):
+    @wraps(func)
+    def wrapper(request, *args, **kwargs):
+        try:
+            response = check_rate(request)
+        except sqlite3.Error as error:
+            # A limiter that cannot reach its store lets the request through rather than failing it.
+            print(error)
+
+            response = None
+
+        if response is not None:
+            return response
+
+        return func(request, *args, **kwargs)
+
+    return wrapper
+
+
+def arate_limit(func):
+    @wraps(func)
+    async def wrapper(request, *args, **kwargs):
+        # The upsert takes tens of microseconds, less than a hop to the thread pool, so it runs on the event loop.
+        # A locked file holds the loop for RATE_LIMIT_BUSY_TIMEOUT at most.
+        try:
+            response = check_rate(request)
+        except sqlite3.Error as error:
+            print(error)
+
+            response = None
+
+        if response is not None:
+            return response
+
+        return await func(request, *args, **kwargs)
+
+    wrapper.csrf_exempt = True
+
+    return wrapper
@@ -0,0 +1,68 @@
+import json
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    # Optional: pip install orjson. Without it every response falls back to the stdlib encoder.
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def encode_default(value):
+    # orjson hands back whatever it cannot encode natively, including datetimes, so they keep DRF's formatting.
+    return JSONEncoder().default(value)
+
+
+def dumps(data):
+    content = orjson.dumps(data, default=encode_default,
+                           option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS)
+
+    # JSONRenderer escapes U+2028 and U+2029, which are line terminators in JavaScript, and orjson writes them raw.
+    # Both start with the byte 0xe2, which a memchr finds in a fraction of the time a replace takes to copy the body.
+    # Floats still differ (1.1e16 against Python's 1.1e+16), but the API has none.
+    if b'\xe2' in content:
+        content = content.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+    return content
+
+
+def json_line(data):
+    # One NDJSON line for the streaming responses.
+    if is_enabled():
+        return dumps(data) + b'\n'
+
+    return json.dumps(data) + '\n'
+
+
+def is_enabled():
+    return settings.FAST_JSON and orjson is not None
+
+
+class FastJSONRenderer(JSONRenderer):
+    # Same bytes as JSONRenderer for the API's payloads; indented browsable requests keep the stdlib path.
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        if not is_enabled() or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        return dumps(data)
+
+
+class FastJsonResponse(HttpResponse):
+    # JsonResponse for the async views, encoded with orjson when FAST_JSON is on.
+    def __init__(self, data, **kwargs):
+        kwargs.setdefault('content_type', 'application/json')
+
+        if is_enabled():
+            content = dumps(data)
+        else:
+            content = json.dumps(data, cls=DjangoJSONEncoder)
+
+        super().__init__(content=content, **kwargs)
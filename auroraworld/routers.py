@@ -0,0 +1,157 @@
+import random
+import sqlite3
+import threading
+import time
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+
+read_alias = ContextVar('read_alias', default=None)
+
+PRUNE_PROBABILITY = 0.01
+
+
+class ReadReplicaRouter:
+    # Reads go to the replica only inside views decorated with read_from_replica; everything else uses default.
+    def db_for_read(self, model, **hints):
+        return read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
+
+
+class StickyStore:
+    # Users who wrote in the last READ_STICKY_SECONDS, kept in a small SQLite file of their own like the rate
+    # limiter's buckets, so a write handled by one worker sends that user's reads to the primary in every worker on
+    # the host. The lookup runs on the event loop in the async views, hence the short busy timeout.
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+
+    def connection(self):
+        connection = getattr(self._local, 'connection', None)
+
+        if connection is None:
+            connection = sqlite3.connect(str(self.path), isolation_level=None, check_same_thread=False)
+            connection.execute(f'PRAGMA busy_timeout = {settings.READ_STICKY_BUSY_TIMEOUT}')
+            connection.execute('PRAGMA journal_mode = WAL')
+            connection.execute('PRAGMA synchronous = OFF')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS sticky_users (user_id TEXT PRIMARY KEY, until REAL NOT NULL) WITHOUT ROWID'
+            )
+
+            self._local.connection = connection
+
+        return connection
+
+    def is_sticky(self, user_id, now=None):
+        now = time.time() if now is None else now
+
+        return self.connection().execute(
+            'SELECT 1 FROM sticky_users WHERE user_id = ? AND ? < until', (user_id, now)
+        ).fetchone() is not None
+
+    def mark(self, user_id, now=None):
+        now = time.time() if now is None else now
+        connection = self.connection()
+
+        connection.execute(
+            'INSERT INTO sticky_users (user_id, until) VALUES (?, ?) '
+            'ON CONFLICT (user_id) DO UPDATE SET until = max(until, excluded.until)',
+            (user_id, now + settings.READ_STICKY_SECONDS),
+        )
+
+        if random.random() < PRUNE_PROBABILITY:
+            connection.execute('DELETE FROM sticky_users WHERE until <= ?', (now,))
+
+
+sticky_store = StickyStore(settings.READ_STICKY_DATABASE)
+
+
+def get_read_alias(user_id=None):
+    if settings.READ_DATABASE == 'default':
+        return 'default'
+
+    try:
+        if user_id and sticky_store.is_sticky(user_id):
+            return 'default'
+    except sqlite3.Error as error:
+        # Without the store there is no telling whether the user just wrote, so they read from the primary.
+        print(error)
+
+        return 'default'
+
+    return settings.READ_DATABASE
+
+
+def mark_written(user_id):
+    if settings.READ_DATABASE != 'default' and user_id:
+        try:
+            sticky_store.mark(user_id)
+        except sqlite3.Error as error:
+            print(error)
+
+
+def pin_reads(queryset):
+    # A streaming response is iterated after the view has returned and read_alias has been reset, so its queryset
+    # keeps the alias chosen for the request instead of falling back to the primary.
+    return queryset.using(queryset.db)
+
+
+def read_from_replica(func):
+    @wraps(func)
+    def wrapper(request, *args, **kwargs):
+        token = read_alias.set(get_read_alias(getattr(request, 'user_id', None)))
+
+        try:
+            return func(request, *args, **kwargs)
+        finally:
+            read_alias.reset(token)
+
+    return wrapper
+
+
+def aread_from_replica(func):
+    @wraps(func)
+    async def wrapper(request, *args, **kwargs):
+        token = read_alias.set(get_read_alias(getattr(request, 'user_id', None)))
+
+        try:
+            return await func(request, *args, **kwargs)
+        finally:
+            read_alias.reset(token)
+
+    return wrapper
+
+
+def sticky_writes(func):
+    @wraps(func)
+    def wrapper(request, *args, **kwargs):
+        response = func(request, *args, **kwargs)
+
+        if response.status_code < 400:
+            mark_written(getattr(request, 'user_id', None))
+
+        return response
+
+    return wrapper
+
+
+def asticky_writes(func):
+    @wraps(func)
+    async def wrapper(request, *args, **kwargs):
+        response = await func(request, *args, **kwargs)
+
+        if response.status_code < 400:
+            mark_written(getattr(request, 'user_id', None))
+
+        return response
+
+    return wrapper
@@ -0,0 +1,72 @@
+from django.db import connections
+
+# links_fts is an external-content FTS5 index over links.name and links.url keyed by the links rowid.
+# Migrations that rebuild the links table (and VACUUM) renumber rowids, so they must reinstall it from a copy of
+# this SQL, as 0003_links_fts and 0004_updated_at do.
+CREATE_SQL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS links_fts USING fts5(name, url, content='links', content_rowid='rowid')",
+    """CREATE TRIGGER IF NOT EXISTS links_fts_insert AFTER INSERT ON links BEGIN
+        INSERT INTO links_fts(rowid, name, url) VALUES (new.rowid, new.name, new.url);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS links_fts_delete AFTER DELETE ON links BEGIN
+        INSERT INTO links_fts(links_fts, rowid, name, url) VALUES ('delete', old.rowid, old.name, old.url);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS links_fts_update AFTER UPDATE OF name, url ON links BEGIN
+        INSERT INTO links_fts(links_fts, rowid, name, url) VALUES ('delete', old.rowid, old.name, old.url);
+        INSERT INTO links_fts(rowid, name, url) VALUES (new.rowid, new.name, new.url);
+    END""",
+]
+
+DROP_SQL = [
+    'DROP TRIGGER IF EXISTS links_fts_insert',
+    'DROP TRIGGER IF EXISTS links_fts_delete',
+    'DROP TRIGGER IF EXISTS links_fts_update',
+    'DROP TABLE IF EXISTS links_fts',
+]
+
+REBUILD_SQL = "INSERT INTO links_fts(links_fts) VALUES ('rebuild')"
+
+
+def is_supported(using='default'):
+    return connections[using].vendor == 'sqlite'
+
+
+def rebuild(using='default'):
+    with connections[using].cursor() as cursor:
+        for sql in CREATE_SQL + [REBUILD_SQL]:
+            cursor.execute(sql)
+
+
+def build_match_query(text):
+    # Every whitespace separated token becomes a quoted prefix phrase; FTS5 ANDs them together.
+    tokens = ['"' + token.replace('"', '""') + '"*' for token in text.split()]
+
+    return ' '.join(tokens)
+
+
+def search_links(existing_links, text):
+    match_query = build_match_query(text)
+
+    if not match_query:
+        return existing_links.order_by('id')
+
+    if not is_supported(existing_links.db):
+        return existing_links.filter(name__icontains=text).order_by('id')
+
+    return existing_links.extra(
+        select={'search_rank': 'links_fts.rank'},
+        tables=['links_fts'],
+        where=['links_fts.rowid = links.rowid', 'links_fts MATCH %s'],
+        params=[match_query],
+    ).order_by('search_rank', 'id')
+
+
+def is_ranked(existing_links):
+    return 'search_rank' in existing_links.query.extra_select
+
+
+def after_rank(existing_links, search_rank, link_id):
+    return existing_links.extra(
+        where=['(links_fts.rank > %s OR (links_fts.rank = %s AND links.id > %s))'],
+        params=[search_rank, search_rank, link_id],
+    )
@@ -1,14 +1,38 @@
-import uuid
-
-from django.db import IntegrityError, transaction
+from django.db import IntegrityError
+from django.utils import timezone
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 
+from auroraworld.etag import make_etag, etag_matches, not_modified
+from auroraworld.ids import new_id
 from auroraworld.models import Link, User, Share
+from auroraworld.ratelimit import rate_limit
+from auroraworld.routers import read_from_replica, sticky_writes
+from auroraworld.sqlite import immediate_atomic
 from auroraworld.verifyToken import verify_token
+from auroraworld.versions import get_versions, shares_key
+
+BULK_BATCH_SIZE = 500
+MAX_BATCH_OPERATIONS = 1000
+
+
+def serialize_share(existing_share):
+    return {
+        'id': existing_share.id,
+        'link_id': existing_share.link_id,
+        'user_id': existing_share.user_id,
+        'user_email': existing_share.user_email,
+        'is_writable': 1 if existing_share.is_writable else 0,
+    }
 
 
+def shares_etag(session_user_id, link_id):
+    return make_etag(session_user_id, link_id, get_versions(shares_key(link_id)))
+
+
+@rate_limit
 @verify_token
+@sticky_writes
 @api_view(['POST'])
 def add_share(request):
     try:
@@ -35,55 +59,130 @@ def add_share(request):
         except User.DoesNotExist:
             return Response({'message': 'Invalid Input'}, status=400)
 
-        new_share = None
+        try:
+            new_share = Share.objects.create(
+                id=new_id(),
+                link=existing_link,
+                user=existing_user,
+                user_email=existing_user.email,
+                is_writable=1 if is_writable else 0,
+            )
+        except IntegrityError:
+            return Response({'message': 'Share already exists.'}, status=409)
+
+        return Response({
+            'message': 'Share created successfully.',
+            'data': serialize_share(new_share),
+        }, status=201)
+    except Exception as error:
+        print(error)
+
+        return Response({'message': 'Server Error'}, status=500)
 
-        attempts = 0
-        max_attempts = 5
-        while attempts < max_attempts:
-            try:
-                share_id = uuid.uuid4().hex
 
-                new_share = Share.objects.create(
-                    id=share_id,
-                    link=existing_link,
-                    user=existing_user,
-                    user_email=existing_user.email,
-                    is_writable=1 if is_writable else 0,
-                )
+def create_shares(session_user_id, link_ids, user_ids, is_writable):
+    existing_link_ids = list(
+        Link.objects.filter(id__in=set(link_ids), user_id=session_user_id).values_list('id', flat=True)
+    )
+    existing_users = list(User.objects.filter(id__in=set(user_ids)).values_list('id', 'email'))
+    existing_user_ids = [existing_user_id for existing_user_id, _ in existing_users]
 
-                break
-            except IntegrityError as error:
-                error_str = str(error).lower()
+    existing_pairs = set(
+        Share.objects.filter(link_id__in=existing_link_ids, user_id__in=existing_user_ids)
+        .values_list('link_id', 'user_id')
+    )
 
-                if 'unique' in error_str and 'link_id' in error_str and 'user_id' in error_str:
-                    return Response({'message': 'Share already exists.'}, status=409)
-                elif 'shares.id' in error_str:
-                    attempts += 1
+    new_shares = [
+        Share(
+            id=new_id(),
+            link_id=existing_link_id,
+            user_id=existing_user_id,
+            user_email=existing_user_email,
+            is_writable=1 if is_writable else 0,
+        )
+        for existing_link_id in existing_link_ids
+        for existing_user_id, existing_user_email in existing_users
+        if (existing_link_id, existing_user_id) not in existing_pairs
+    ]
 
-                    continue
-                else:
-                    raise error
+    with immediate_atomic():
+        Share.objects.bulk_create(new_shares, batch_size=BULK_BATCH_SIZE, ignore_conflicts=True)
 
-        if new_share:
-            return Response({
-                'message': 'Share created successfully.',
-                'data': {
-                    'id': new_share.id,
-                    'link_id': new_share.link_id,
-                    'user_id': new_share.user_id,
-                    'user_email': new_share.user_email,
-                    'is_writable': new_share.is_writable,
-                },
-            }, status=201)
+    share_ids = {new_share.id for new_share in new_shares}
+
+    created_shares = Share.objects.filter(link_id__in=existing_link_ids, user_id__in=existing_user_ids)
+
+    return [
+        serialize_share(created_share)
+        for created_share in created_shares.only('id', 'link_id', 'user_id', 'user_email', 'is_writable')
+        if created_share.id in share_ids
+    ]
+
+
+def apply_share_operations(session_user_id, operations):
+    results = []
+    deletes = {}
+    updates = {}
+
+    for operation in operations:
+        result = {'id': None, 'op': None, 'status': 400, 'message': 'Invalid Input'}
+        results.append(result)
+
+        if not isinstance(operation, dict):
+            continue
+
+        share_id = str(operation.get('id') or '').strip()
+        op = operation.get('op')
+
+        result.update(id=share_id, op=op)
+
+        if not share_id or share_id in deletes or share_id in updates:
+            continue
+
+        if op == 'delete':
+            deletes[share_id] = result
+        elif op == 'update' and 'isWritable' in operation:
+            updates[share_id] = (result, 1 if operation.get('isWritable') else 0)
+
+    # One ownership query per kind, then every change in the same transaction, which holds the write lock from the
+    # start so the ownership reads cannot leave it stuck behind another writer.
+    with immediate_atomic():
+        deleted_ids = set(
+            Share.objects.filter(id__in=deletes, link__user_id=session_user_id).values_list('id', flat=True)
+        )
+        updated_shares = list(Share.objects.filter(id__in=updates, link__user_id=session_user_id))
+
+        if deleted_ids:
+            Share.objects.filter(id__in=deleted_ids).delete()
+
+        updated_at = timezone.now()
+
+        for updated_share in updated_shares:
+            updated_share.is_writable = updates[updated_share.id][1]
+            updated_share.updated_at = updated_at
+
+        Share.objects.bulk_update(updated_shares, ['is_writable', 'updated_at'], batch_size=BULK_BATCH_SIZE)
+
+    for share_id, result in deletes.items():
+        if share_id in deleted_ids:
+            result.update(status=200, message='Share removed successfully.')
         else:
-            return Response({'message': 'No share created.'}, status=400)
-    except Exception as error:
-        print(error)
+            result.update(message='No share removed.')
 
-        return Response({'message': 'Server Error'}, status=500)
+    for updated_share in updated_shares:
+        updates[updated_share.id][0].update(status=200, message='Share updated successfully.',
+                                            data=serialize_share(updated_share))
+
+    for result, _ in updates.values():
+        if result['status'] != 200:
+            result.update(message='No share updated.')
+
+    return results
 
 
+@rate_limit
 @verify_token
+@sticky_writes
 @api_view(['POST'])
 def add_shares(request):
     try:
@@ -101,66 +200,12 @@ def add_shares(request):
         if not session_user_id or not session_user_email:
             return Response({'message': 'Unauthorized'}, status=401)
 
-        share_ids = []
-
-        with transaction.atomic():
-            for link_id in link_ids:
-                try:
-                    existing_link = Link.objects.get(id=link_id, user_id=session_user_id)
-                except Link.DoesNotExist:
-                    continue
-
-                for user_id in user_ids:
-                    try:
-                        existing_user = User.objects.get(id=user_id)
-                    except User.DoesNotExist:
-                        continue
-
-                    attempts = 0
-                    max_attempts = 5
-                    while attempts < max_attempts:
-                        share_id = uuid.uuid4().hex
-
-                        with transaction.atomic():
-                            try:
-                                Share.objects.create(
-                                    id=share_id,
-                                    link=existing_link,
-                                    user=existing_user,
-                                    user_email=existing_user.email,
-                                    is_writable=1 if is_writable else 0,
-                                )
-
-                                share_ids.append(share_id)
-
-                                break
-                            except IntegrityError as error:
-                                error_str = str(error).lower()
-
-                                if 'unique' in error_str and 'link_id' in error_str and 'user_id' in error_str:
-                                    break
-                                elif 'unique' in error_str and 'id' in error_str:
-                                    attempts += 1
-
-                                    continue
-                                else:
-                                    raise error
-
-        new_shares = Share.objects.filter(id__in=share_ids)
-
-        if 0 < len(new_shares):
+        created_shares = create_shares(session_user_id, link_ids, user_ids, is_writable)
+
+        if 0 < len(created_shares):
             return Response({
                 'message': 'Shares created successfully.',
-                'data': [
-                    {
-                        'id': new_share.id,
-                        'link_id': new_share.link.id,
-                        'user_id': new_share.user.id,
-                        'user_email': new_share.user_email,
-                        'is_writable': 1 if new_share.is_writable else 0,
-                    }
-                    for new_share in new_shares
-                ]
+                'data': created_shares
             }, status=201)
         else:
             return Response({'message': 'No share created.'}, status=400)
@@ -170,7 +215,9 @@ def add_shares(request):
         return Response({'message': 'Server Error'}, status=500)
 
 
+@rate_limit
 @verify_token
+@read_from_replica
 @api_view(['GET'])
 def get_shares(request, link_id):
     try:
@@ -185,23 +232,24 @@ def get_shares(request, link_id):
 
         existing_shares = Share.objects.filter(link_id=link_id, link__user_id=session_user_id)
 
+        etag = shares_etag(session_user_id, link_id)
+
+        if etag_matches(request, etag):
+            return not_modified(etag)
+
         return Response({'message': '', 'data': [
-            {
-                'id': existing_share.id,
-                'link_id': existing_share.link.id,
-                'user_id': existing_share.user.id,
-                'user_email': existing_share.user_email,
-                'is_writable': 1 if existing_share.is_writable else 0,
-            }
+            serialize_share(existing_share)
             for existing_share in existing_shares
-        ]}, status=200)
+        ]}, status=200, headers={'ETag': etag})
     except Exception as error:
         print(error)
 
         return Response({'message': 'Server Error'}, status=500)
 
 
+@rate_limit
 @verify_token
+@sticky_writes
 @api_view(['DELETE', 'PUT'])
 def remove_update_share(request, share_id):
     try:
@@ -246,13 +294,33 @@ def remove_update_share(request, share_id):
             updated_share.is_writable = is_writable
             updated_share.save()
 
-            return Response({'message': 'Share updated successfully.', 'data': {
-                'id': updated_share.id,
-                'link_id': updated_share.link.id,
-                'user_id': updated_share.user.id,
-                'user_email': updated_share.user_email,
-                'is_writable': 1 if updated_share.is_writable else 0,
-            }}, status=200)
+            return Response({'message': 'Share updated successfully.', 'data': serialize_share(updated_share)},
+                            status=200)
+    except Exception as error:
+        print(error)
+
+        return Response({'message': 'Server Error'}, status=500)
+
+
+@rate_limit
+@verify_token
+@sticky_writes
+@api_view(['POST'])
+def batch_shares(request):
+    try:
+        operations = request.data.get('operations')
+
+        if not operations or not isinstance(operations, list) or MAX_BATCH_OPERATIONS < len(operations):
+            return Response({'message': 'Invalid Input'}, status=400)
+
+        session_user_id = getattr(request, 'user_id', None)
+        session_user_email = getattr(request, 'user_email', None)
+
+        if not session_user_id or not session_user_email:
+            return Response({'message': 'Unauthorized'}, status=401)
+
+        return Response({'message': 'Batch applied.', 'data': apply_share_operations(session_user_id, operations)},
+                        status=200)
     except Exception as error:
         print(error)
 
@@ -0,0 +1,62 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from .category import invalidate_categories
+from .metrics import record_query
+from .models import Category, User
+from .propagation import track_change, propagate_category, propagate_user
+from .sqlite import apply_pragmas
+from .tokens import invalidate_user
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def category_changed(sender, **kwargs):
+    # After commit, so no worker reloads the categories before the change is visible to it.
+    transaction.on_commit(invalidate_categories)
+
+
+@receiver(pre_save, sender=Category)
+def category_saving(sender, instance, raw, update_fields, **kwargs):
+    if not raw:
+        track_change(instance, 'name', update_fields)
+
+
+@receiver(post_save, sender=Category)
+def category_saved(sender, instance, raw, **kwargs):
+    if not raw and getattr(instance, '_propagate', False):
+        propagate_category(instance.id, instance.name)
+
+
+@receiver(pre_save, sender=User)
+def user_saving(sender, instance, raw, update_fields, **kwargs):
+    if not raw:
+        track_change(instance, 'email', update_fields)
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, raw, **kwargs):
+    if not raw and getattr(instance, '_propagate', False):
+        propagate_user(instance.id, instance.email)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, **kwargs):
+    invalidate_user(instance.id)
+
+
+@receiver(connection_created)
+def configure_connection(sender, connection, **kwargs):
+    if connection.vendor == 'sqlite' and settings.SQLITE_PRAGMAS:
+        with connection.cursor() as cursor:
+            apply_pragmas(cursor)
+
+
+@receiver(connection_created)
+def install_query_recorder(sender, connection, **kwargs):
+    if settings.METRICS_ENABLED and record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
@@ -0,0 +1,55 @@
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import transaction
+
+
+def get_pragmas():
+    return [
+        ('journal_mode', settings.SQLITE_JOURNAL_MODE),
+        ('synchronous', settings.SQLITE_SYNCHRONOUS),
+        ('busy_timeout', settings.SQLITE_BUSY_TIMEOUT),
+        ('mmap_size', settings.SQLITE_MMAP_SIZE),
+        ('cache_size', settings.SQLITE_CACHE_SIZE),
+        ('temp_store', settings.SQLITE_TEMP_STORE),
+    ]
+
+
+def apply_pragmas(cursor, pragmas=None):
+    for name, value in pragmas or get_pragmas():
+        cursor.execute(f'PRAGMA {name} = {value}')
+
+
+@contextmanager
+def immediate_atomic(using='default'):
+    # transaction.atomic() opened with BEGIN IMMEDIATE. A deferred transaction that reads before it writes holds a
+    # WAL snapshot, and upgrading that snapshot to the write lock fails at once with SQLITE_BUSY while another writer
+    # is active, since busy_timeout only covers waiting for the lock up front. Nested blocks keep the outer mode.
+    connection = transaction.get_connection(using)
+
+    if (connection.vendor != 'sqlite' or connection.in_atomic_block
+            or connection.settings_dict['OPTIONS'].get('transaction_mode') == 'IMMEDIATE'):
+        with transaction.atomic(using=using):
+            yield
+
+        return
+
+    # Django 4.2 has no supported way to choose how atomic() begins, so the transaction is opened by hand and
+    # atomic() runs inside it as it would inside any manually managed transaction; on_commit callbacks still run
+    # once the commit below turns autocommit back on. Django 5.1 does this itself with transaction_mode.
+    connection.set_autocommit(False)
+
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('BEGIN IMMEDIATE')
+
+        with transaction.atomic(using=using):
+            yield
+
+        connection.commit()
+    except BaseException:
+        connection.rollback()
+
+        raise
+    finally:
+        connection.set_autocommit(True)
@@ -1,3 +1,602 @@
-from django.test import TestCase
+import datetime
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from . import access, ratelimit, renderers, routers, search, versions
+from .category import get_registry, local_categories
+from .models import Category, Link, RevokedToken, Share, User
+from .propagation import propagate_user
+from .sqlite import immediate_atomic
+from .tokens import RevocationIndex, create_access_token
+
+
+# The limiter keeps its buckets in a file shared across runs, so it stays out of the way of these tests.
+@override_settings(RATE_LIMIT_ENABLED=False)
+class ApiTestCase(TestCase):
+    fixtures = ['default']
+
+    def setUp(self):
+        self.owner = User.objects.create(id='owner', email='owner@example.com', password='!')
+        self.recipient = User.objects.create(id='recipient', email='recipient@example.com', password='!')
+        self.category = Category.objects.first()
+
+        # Cached categories outlive the transaction each test is rolled back in.
+        caches[settings.CATEGORY_CACHE].clear()
+        local_categories.clear()
+
+    def authorize(self, user):
+        return {'HTTP_AUTHORIZATION': f'Bearer {create_access_token(user.id, user.email)}'}
+
+    def create_links(self, count, user=None, start=0):
+        user = user or self.owner
+
+        return Link.objects.bulk_create([
+            Link(id=f'{user.id}-link-{index:04d}', user=user, created_by=user.email, category=self.category,
+                 category_name=self.category.name, name=f'Link {index}', url=f'https://example.com/{index}')
+            for index in range(start, start + count)
+        ])
+
+
+def installed_triggers(prefix):
+    # Migrations carry their own copy of the trigger SQL, which must end up matching the module that defines it.
+    # Whitespace is collapsed, since a migration may wrap its copy differently.
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND name LIKE %s", [f'{prefix}%'])
+
+        return {name: ' '.join(sql.split()) for name, sql in cursor.fetchall()}
+
+
+def expected_triggers(create_sql):
+    # SQLite stores CREATE TRIGGER statements without IF NOT EXISTS.
+    return {
+        sql.split()[5]: ' '.join(sql.replace(' IF NOT EXISTS', '').split())
+        for sql in create_sql if sql.startswith('CREATE TRIGGER')
+    }
+
+
+class SearchTests(ApiTestCase):
+    def test_migrations_install_the_current_triggers(self):
+        self.assertEqual(installed_triggers('links_fts_'), expected_triggers(search.CREATE_SQL))
+
+
+class ListETagTests(ApiTestCase):
+    links_query = {'mode': 'own', 'categoryId': 'all', 'name': '', 'limit': '10'}
+    shared_query = {'mode': 'shared-writable', 'categoryId': 'all', 'name': ''}
+
+    def get(self, path, query, user, etag=None):
+        headers = self.authorize(user)
+
+        if etag:
+            headers['HTTP_IF_NONE_MATCH'] = etag
+
+        return self.client.get(path, query, **headers)
+
+    def test_not_modified_is_one_query_at_any_size(self):
+        for count in (5, 200):
+            self.create_links(count - Link.objects.count(), start=Link.objects.count())
+
+            etag = self.get('/api/links', self.links_query, self.owner)['ETag']
+
+            with self.assertNumQueries(1):
+                response = self.get('/api/links', self.links_query, self.owner, etag)
+
+            self.assertEqual(response.status_code, 304)
+
+    def test_queryset_update_changes_owner_etag(self):
+        self.create_links(3)
+
+        etag = self.get('/api/links', self.links_query, self.owner)['ETag']
+
+        Link.objects.filter(id='owner-link-0001').update(name='Renamed')
+
+        self.assertEqual(self.get('/api/links', self.links_query, self.owner, etag).status_code, 200)
+
+    def test_share_changes_recipient_etag(self):
+        self.create_links(3)
+
+        etag = self.get('/api/links', self.shared_query, self.recipient)['ETag']
+
+        Share.objects.create(id='share', link_id='owner-link-0001', user=self.recipient,
+                             user_email=self.recipient.email, is_writable=True)
+
+        response = self.get('/api/links', self.shared_query, self.recipient, etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([link['id'] for link in response.json()['data']], ['owner-link-0001'])
+
+        etag = response['ETag']
+
+        Link.objects.filter(id='owner-link-0001').update(url='https://example.com/moved')
+
+        self.assertEqual(self.get('/api/links', self.shared_query, self.recipient, etag).status_code, 200)
+
+    def test_migrations_install_the_current_triggers(self):
+        self.assertEqual(installed_triggers('versions_'), expected_triggers(versions.CREATE_SQL))
+
+    def test_share_update_changes_shares_etag(self):
+        self.create_links(1)
+        Share.objects.create(id='share', link_id='owner-link-0000', user=self.recipient,
+                             user_email=self.recipient.email, is_writable=False)
+
+        etag = self.get('/api/shares/owner-link-0000', {}, self.owner)['ETag']
+
+        with self.assertNumQueries(1):
+            self.assertEqual(self.get('/api/shares/owner-link-0000', {}, self.owner, etag).status_code, 304)
+
+        Share.objects.filter(id='share').update(is_writable=True)
+
+        response = self.get('/api/shares/owner-link-0000', {}, self.owner, etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['data'][0]['is_writable'], 1)
+
+    def test_user_changes_directory_etag(self):
+        etag = self.get('/api/users', {}, self.owner)['ETag']
+
+        self.assertEqual(self.get('/api/users', {}, self.owner, etag).status_code, 304)
+
+        User.objects.create(id='newcomer', email='newcomer@example.com', password='!')
+
+        self.assertEqual(self.get('/api/users', {}, self.owner, etag).status_code, 200)
+
+
+class QueryCountTests(ApiTestCase):
+    # Each endpoint must issue the same number of queries whatever the number of rows it touches.
+    sizes = (2, 20)
+
+    def setUp(self):
+        super().setUp()
+
+        self.link = self.create_links(1)[0]
+        self.headers = self.authorize(self.owner)
+
+        # Loaded once per process and version, so it is not counted against any one request.
+        get_registry()
+
+    def create_recipients(self, count):
+        return User.objects.bulk_create([
+            User(id=f'user-{index:04d}', email=f'user-{index:04d}@example.com', password='!') for index in range(count)
+        ])
+
+    def share_with(self, count):
+        Share.objects.all().delete()
+
+        Share.objects.bulk_create([
+            Share(id=f'share-{index:04d}', link=self.link, user=recipient, user_email=recipient.email)
+            for index, recipient in enumerate(User.objects.filter(id__startswith='user-')[:count])
+        ])
+
+    def test_get_shares(self):
+        self.create_recipients(max(self.sizes))
+
+        for size in self.sizes:
+            self.share_with(size)
+
+            with self.assertNumQueries(2):
+                response = self.client.get(f'/api/shares/{self.link.id}', **self.headers)
+
+            self.assertEqual(len(response.json()['data']), size)
+
+    def test_add_shares(self):
+        # Django sends at most 999 parameters per SQLite insert, so 10 links by 10 users is the largest square that
+        # still goes out as one statement.
+        sizes = (2, 10)
+        recipients = self.create_recipients(max(sizes))
+        links = self.create_links(max(sizes), start=1)
+
+        for size in sizes:
+            Share.objects.all().delete()
+
+            with self.assertNumQueries(7):
+                response = self.client.post('/api/shares', {
+                    'linkIds': [link.id for link in links[:size]],
+                    'userIds': [recipient.id for recipient in recipients[:size]],
+                    'isWritable': True,
+                }, content_type='application/json', **self.headers)
+
+            self.assertEqual(response.status_code, 201)
+            self.assertEqual(len(response.json()['data']), size * size)
+
+    def test_update_link(self):
+        self.create_recipients(max(self.sizes))
+
+        for size in self.sizes:
+            self.share_with(size)
+
+            with self.assertNumQueries(2):
+                response = self.client.put(f'/api/link/{self.link.id}', {
+                    'categoryId': self.category.id, 'name': f'Renamed {size}', 'url': 'https://example.com/renamed',
+                }, content_type='application/json', **self.headers)
+
+            self.assertEqual(response.status_code, 200)
+
+    def test_update_share(self):
+        self.create_recipients(max(self.sizes))
+
+        for size in self.sizes:
+            self.share_with(size)
+
+            with self.assertNumQueries(2):
+                response = self.client.put('/api/share/share-0001', {'isWritable': size % 2 == 0},
+                                           content_type='application/json', **self.headers)
+
+            self.assertEqual(response.status_code, 200)
+
+
+class LinkAccessTests(ApiTestCase):
+    query = {'categoryId': 'all', 'name': ''}
+
+    def setUp(self):
+        super().setUp()
+
+        self.create_links(3)
+        self.headers = self.authorize(self.owner)
+
+    def link_ids(self, user, mode, **query):
+        response = self.client.get('/api/links', {**self.query, 'mode': mode, **query}, **self.authorize(user))
+
+        return [link['id'] for link in response.json()['data']]
+
+    def assertConsistent(self):
+        self.assertEqual(access.check(), (0, 0))
+
+    def test_modes_follow_shares(self):
+        self.client.post('/api/share', {'linkId': 'owner-link-0001', 'userId': self.recipient.id, 'isWritable': False},
+                         content_type='application/json', **self.headers)
+        self.client.post('/api/shares', {'linkIds': ['owner-link-0002'], 'userIds': [self.recipient.id],
+                                         'isWritable': True}, content_type='application/json', **self.headers)
+
+        self.assertConsistent()
+        self.assertEqual(self.link_ids(self.owner, 'own'), ['owner-link-0000', 'owner-link-0001', 'owner-link-0002'])
+        self.assertEqual(self.link_ids(self.recipient, 'shared-unwritable'), ['owner-link-0001'])
+        self.assertEqual(self.link_ids(self.recipient, 'shared-writable'), ['owner-link-0002'])
+
+        share = Share.objects.get(link_id='owner-link-0001')
+
+        self.client.put(f'/api/share/{share.id}', {'isWritable': True}, content_type='application/json',
+                        **self.headers)
+
+        self.assertConsistent()
+        self.assertEqual(self.link_ids(self.recipient, 'shared-unwritable'), [])
+        self.assertEqual(self.link_ids(self.recipient, 'shared-writable'), ['owner-link-0001', 'owner-link-0002'])
+
+        self.client.delete(f'/api/share/{share.id}', **self.headers)
+
+        self.assertConsistent()
+        self.assertEqual(self.link_ids(self.recipient, 'shared-writable'), ['owner-link-0002'])
+
+    def test_link_changes_reach_recipients(self):
+        other = Category.objects.exclude(id=self.category.id).first()
+
+        Share.objects.create(id='share', link_id='owner-link-0002', user=self.recipient,
+                             user_email=self.recipient.email, is_writable=True)
+        Link.objects.filter(id='owner-link-0002').update(category=other, category_name=other.name)
+
+        self.assertConsistent()
+        self.assertEqual(self.link_ids(self.recipient, 'shared-writable', categoryId=other.id), ['owner-link-0002'])
+        self.assertEqual(self.link_ids(self.owner, 'own', categoryId=self.category.id),
+                         ['owner-link-0000', 'owner-link-0001'])
+
+        self.client.delete('/api/link/owner-link-0002', **self.headers)
+
+        self.assertConsistent()
+        self.assertEqual(self.link_ids(self.recipient, 'shared-writable'), [])
+
+    def test_rebuild_repairs_drift(self):
+        with connection.cursor() as cursor:
+            for sql in access.DROP_SQL:
+                cursor.execute(sql)
+
+        self.create_links(2, start=3)
+
+        self.assertEqual(access.check(), (2, 0))
+
+        access.rebuild()
+
+        self.assertConsistent()
+        self.assertEqual(len(self.link_ids(self.owner, 'own')), 5)
+
+    def test_migrations_install_the_current_triggers(self):
+        self.assertEqual(installed_triggers('access_'), expected_triggers(access.CREATE_SQL))
+
+
+class PropagationTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+
+        self.create_links(3)
+        self.create_links(2, user=self.recipient)
+
+        for index in range(3):
+            Share.objects.create(id=f'share-{index}', link_id=f'owner-link-{index:04d}', user=self.recipient,
+                                 user_email=self.recipient.email)
+
+    def test_category_rename_rewrites_links(self):
+        self.category.name = 'Renamed Category'
+        self.category.save()
+
+        self.assertEqual(set(Link.objects.filter(category=self.category).values_list('category_name', flat=True)),
+                         {'Renamed Category'})
+
+    def test_email_change_rewrites_links_and_shares(self):
+        self.recipient.email = 'moved@example.com'
+        self.recipient.save()
+
+        self.assertEqual(set(Link.objects.filter(user=self.recipient).values_list('created_by', flat=True)),
+                         {'moved@example.com'})
+        self.assertEqual(set(Share.objects.filter(user=self.recipient).values_list('user_email', flat=True)),
+                         {'moved@example.com'})
+        self.assertEqual(set(Link.objects.filter(user=self.owner).values_list('created_by', flat=True)),
+                         {self.owner.email})
+
+    def test_save_without_the_field_does_not_propagate(self):
+        self.recipient.email = 'unsaved@example.com'
+        self.recipient.password = 'changed'
+
+        with self.assertNumQueries(1):
+            self.recipient.save(update_fields=['password'])
+
+        self.assertFalse(Share.objects.filter(user_email='unsaved@example.com').exists())
+
+    def test_propagate_reports_rows_touched(self):
+        Link.objects.filter(user=self.recipient).update(created_by='stale@example.com')
+        Share.objects.filter(id='share-0').update(user_email='stale@example.com')
+
+        result = propagate_user(self.recipient.id, self.recipient.email)
+
+        self.assertEqual((result['links'], result['shares']), (2, 1))
+        self.assertEqual(propagate_user(self.recipient.id, self.recipient.email)['links'], 0)
+
+
+class CategoryCacheTests(ApiTestCase):
+    def names(self):
+        return get_registry()['names']
+
+    def test_rename_reaches_registry_after_commit(self):
+        self.names()
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self.category.name = 'Renamed Category'
+            self.category.save()
+
+            self.assertNotEqual(self.names()[self.category.id], 'Renamed Category')
+
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(self.names()[self.category.id], 'Renamed Category')
+
+    def test_change_from_another_worker_shows_once_the_version_expires(self):
+        self.names()
+
+        # Changed without signals, as another worker's invalidation never reaches a per-process cache.
+        Category.objects.filter(id=self.category.id).update(name='Renamed Elsewhere')
+
+        self.assertNotEqual(self.names()[self.category.id], 'Renamed Elsewhere')
+
+        with mock.patch('time.time', return_value=time.time() + settings.CATEGORY_CACHE_TTL + 1):
+            self.assertEqual(self.names()[self.category.id], 'Renamed Elsewhere')
+
+
+@override_settings(READ_DATABASE='replica')
+class ReadReplicaTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+
+        self.path = os.path.join(directory, 'sticky.sqlite3')
+        patcher = mock.patch.object(routers, 'sticky_store', routers.StickyStore(self.path))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_write_in_one_worker_is_sticky_in_another(self):
+        self.assertEqual(routers.get_read_alias(self.owner.id), 'replica')
+
+        routers.mark_written(self.owner.id)
+
+        # A second store on the same file stands in for another worker process.
+        with mock.patch.object(routers, 'sticky_store', routers.StickyStore(self.path)):
+            self.assertEqual(routers.get_read_alias(self.owner.id), 'default')
+            self.assertEqual(routers.get_read_alias(self.recipient.id), 'replica')
+
+            later = time.time() + settings.READ_STICKY_SECONDS + 1
+
+            with mock.patch('time.time', return_value=later):
+                self.assertEqual(routers.get_read_alias(self.owner.id), 'replica')
+
+    def test_unreadable_store_reads_from_primary(self):
+        with mock.patch.object(routers, 'sticky_store', routers.StickyStore(os.path.dirname(self.path))):
+            self.assertEqual(routers.get_read_alias(self.owner.id), 'default')
+
+    def test_streamed_queryset_keeps_request_alias(self):
+        token = routers.read_alias.set('replica')
+
+        try:
+            existing_links = routers.pin_reads(Link.objects.all())
+        finally:
+            routers.read_alias.reset(token)
+
+        self.assertEqual(existing_links.db, 'replica')
+
+
+class MetricsTests(ApiTestCase):
+    @override_settings(METRICS_TOKEN='')
+    def test_closed_without_a_token(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 401)
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer ').status_code, 401)
+
+    @override_settings(METRICS_TOKEN='scraper')
+    def test_open_to_the_token(self):
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer other').status_code, 401)
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer scraper').status_code, 200)
+
+
+@override_settings(RATE_LIMIT_ENABLED=True)
+class RateLimitTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+
+        self.store = ratelimit.TokenBucketStore(os.path.join(directory, 'ratelimit.sqlite3'))
+        patcher = mock.patch.object(ratelimit, 'store', self.store)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def exhaust(self, **headers):
+        with override_settings(RATE_LIMITS={'*': '2/minute'}):
+            statuses = [self.client.get('/api/categories', **headers).status_code for _ in range(3)]
+
+        return statuses
+
+    def test_exhausted_bucket_returns_retry_after(self):
+        with override_settings(RATE_LIMITS={'*': '2/minute'}):
+            for _ in range(2):
+                self.assertEqual(self.client.get('/api/categories', **self.authorize(self.owner)).status_code, 200)
+
+            response = self.client.get('/api/categories', **self.authorize(self.owner))
+
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '30')
+
+    def test_bad_tokens_are_limited_by_client_ip(self):
+        statuses = self.exhaust(HTTP_AUTHORIZATION='Bearer forged')
+
+        self.assertNotIn(429, statuses[:2])
+        self.assertEqual(statuses[2], 429)
+
+        # Another user behind the same address has a bucket of their own.
+        self.assertEqual(self.exhaust(**self.authorize(self.recipient)), [200, 200, 429])
+
+    def test_locked_store_lets_requests_through_without_waiting(self):
+        self.store.take('warmup', 1, 1)
+
+        # Another worker holding the write lock on the bucket file.
+        locker = sqlite3.connect(self.store.path, isolation_level=None)
+        locker.execute('BEGIN IMMEDIATE')
+        self.addCleanup(locker.close)
+
+        started = time.perf_counter()
+        response = self.client.get('/api/categories', **self.authorize(self.owner))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertLess(time.perf_counter() - started, settings.SQLITE_BUSY_TIMEOUT / 1000 / 2)
+
+
+@override_settings(REVOCATION_SYNC_SECONDS=0)
+class RevocationIndexTests(ApiTestCase):
+    def test_sync_purges_expired_rows_on_schedule(self):
+        index = RevocationIndex()
+        index.sync()
+
+        now = timezone.now()
+        RevokedToken.objects.create(jti='expired', user_id='owner', expires_at=now - datetime.timedelta(seconds=1))
+        RevokedToken.objects.create(jti='live', user_id='owner', expires_at=now + datetime.timedelta(days=1))
+
+        index.sync()
+
+        self.assertEqual(RevokedToken.objects.count(), 2)
+
+        with override_settings(REVOCATION_PURGE_SECONDS=0):
+            index.sync()
+
+        self.assertEqual(list(RevokedToken.objects.values_list('jti', flat=True)), ['live'])
+        self.assertTrue(index.is_revoked('live'))
+
+
+class UserDirectoryTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+
+        link = self.create_links(1)[0]
+        self.users = User.objects.bulk_create([
+            User(id=f'user-{index:04d}', email=f'user-{index:04d}@example.com', password='!') for index in range(8)
+        ])
+
+        for index, recipient in enumerate(self.users[:4]):
+            Share.objects.create(id=f'share-{index}', link=link, user=recipient, user_email=recipient.email)
+
+    def pages(self, limit):
+        pages, cursor = [], ''
+
+        while True:
+            response = self.client.get('/api/users', {'recent': 'true', 'limit': limit, 'cursor': cursor},
+                                       **self.authorize(self.owner))
+            body = response.json()
+
+            pages.append([user['id'] for user in body['data']])
+            cursor = body['next']
+
+            if not cursor:
+                return pages
+
+    def test_recent_recipients_count_against_the_limit(self):
+        everyone = sorted(user.id for user in self.users + [self.recipient])
+
+        for limit in (2, 4, 6):
+            pages = self.pages(limit)
+
+            self.assertTrue(all(len(page) <= limit for page in pages), pages)
+            self.assertEqual(sorted(sum(pages, [])), everyone)
+            self.assertEqual(len(pages[0]), limit)
+
+    def test_recent_recipients_lead_the_first_page(self):
+        self.assertEqual(set(self.pages(6)[0][:4]), {user.id for user in self.users[:4]})
+
+
+@skipUnless(renderers.orjson, 'orjson is not installed')
+@override_settings(FAST_JSON=True)
+class FastJsonTests(ApiTestCase):
+    def test_matches_json_renderer_byte_for_byte(self):
+        payload = {'message': '', 'data': [
+            {'id': 'link', 'name': 'caf\u00e9 \u2028 \u2029 \U0001f600 "quoted" </script>', 'is_writable': 1,
+             'shared': True, 'next': None, 'updated_at': timezone.now(), 'tags': ['a', 'b']},
+        ]}
+
+        self.assertEqual(renderers.FastJSONRenderer().render(payload), JSONRenderer().render(payload))
+
+
+# TestCase wraps every test in a transaction, where immediate_atomic() is a plain nested atomic().
+class ImmediateAtomicTests(TransactionTestCase):
+    def create_user(self):
+        return User.objects.create(id='writer', email='writer@example.com', password='!')
+
+    def test_begins_immediate_and_commits(self):
+        committed = []
+
+        with CaptureQueriesContext(connection) as queries:
+            with immediate_atomic():
+                self.create_user()
+                transaction.on_commit(lambda: committed.append(True))
+
+                self.assertEqual(committed, [])
+
+        # Django logs turning autocommit off as BEGIN, but nothing reaches SQLite ahead of BEGIN IMMEDIATE.
+        self.assertEqual([query['sql'] for query in queries][:2], ['BEGIN', 'BEGIN IMMEDIATE'])
+        self.assertEqual(committed, [True])
+        self.assertTrue(connection.get_autocommit())
+        self.assertTrue(User.objects.filter(id='writer').exists())
+
+    def test_rolls_back_on_error(self):
+        with self.assertRaises(ValueError):
+            with immediate_atomic():
+                self.create_user()
+                transaction.on_commit(self.fail)
+
+                raise ValueError
+
+        self.assertTrue(connection.get_autocommit())
+        self.assertFalse(User.objects.filter(id='writer').exists())
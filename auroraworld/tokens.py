@@ -0,0 +1,175 @@
+import datetime
+import hashlib
+import threading
+import time
+
+import jwt
+from django.conf import settings
+from django.db import IntegrityError, transaction
+
+from .bloom import BloomFilter
+from .ids import new_id
+from .lru import LRUCache
+from .models import RevokedToken, User
+
+user_cache = LRUCache(settings.USER_CACHE_SIZE, settings.USER_CACHE_TTL)
+
+
+def create_access_token(user_id, email):
+    return jwt.encode({
+        'id': user_id,
+        'email': email,
+        'iat': datetime.datetime.utcnow(),
+        'exp': datetime.datetime.utcnow() + datetime.timedelta(days=1),
+    }, settings.ACCESS_TOKEN_SECRET, algorithm='HS256')
+
+
+def create_refresh_token(user_id, email):
+    return jwt.encode({
+        'id': user_id,
+        'email': email,
+        'jti': new_id(),
+        'exp': datetime.datetime.utcnow() + datetime.timedelta(days=7)
+    }, settings.REFRESH_TOKEN_SECRET, algorithm='HS256')
+
+
+def session_data(user_id, email):
+    # What refresh and sign-in answer with: a new access token and the user it is for.
+    return {
+        'accessToken': create_access_token(user_id, email),
+        'id': user_id,
+        'email': email,
+    }
+
+
+def set_refresh_cookie(response, refresh_token):
+    response.set_cookie(
+        key='refreshToken',
+        value=refresh_token,
+        httponly=True,
+        max_age=7 * 24 * 60 * 60,
+        samesite='None',
+        secure=True
+    )
+
+
+def token_id(refresh_token, claims):
+    # Tokens issued before rotation carry no jti, so their digest stands in for it.
+    return claims.get('jti') or hashlib.sha256(refresh_token.encode()).hexdigest()
+
+
+class RevocationIndex:
+    # An in-process Bloom filter over revoked_tokens. A miss proves a jti was never revoked, so only hits (and
+    # false positives) reach the table. Revocations from other processes are pulled in by id at most every
+    # REVOCATION_SYNC_SECONDS; a stale filter only costs a failed insert in revoke(), never a wrong answer. Rows for
+    # tokens past their expiry can never be presented again, so each process deletes them every
+    # REVOCATION_PURGE_SECONDS; their bits stay in the filter until the next rebuild.
+    def __init__(self):
+        self.filter = None
+        self.last_id = 0
+        self.synced_at = 0.0
+        self.purged_at = 0.0
+        self._lock = threading.Lock()
+
+    def purge(self):
+        RevokedToken.objects.filter(expires_at__lte=datetime.datetime.now(datetime.timezone.utc)).delete()
+
+        self.purged_at = time.monotonic()
+
+    def rebuild(self):
+        self.purge()
+
+        capacity = max(settings.REVOCATION_FILTER_CAPACITY, 2 * RevokedToken.objects.count())
+
+        self.filter = BloomFilter(capacity, settings.REVOCATION_FILTER_ERROR_RATE)
+        self.last_id = 0
+
+    def sync(self):
+        with self._lock:
+            now = time.monotonic()
+
+            if self.filter is not None and now < self.synced_at + settings.REVOCATION_SYNC_SECONDS:
+                return
+
+            if self.filter is None or self.filter.is_full():
+                self.rebuild()
+            elif now >= self.purged_at + settings.REVOCATION_PURGE_SECONDS:
+                self.purge()
+
+            revoked_tokens = RevokedToken.objects.filter(id__gt=self.last_id).order_by('id').values_list('id', 'jti')
+
+            for revoked_id, jti in revoked_tokens.iterator():
+                self.filter.add(jti)
+                self.last_id = revoked_id
+
+            self.synced_at = now
+
+    def is_revoked(self, jti):
+        self.sync()
+
+        if jti not in self.filter:
+            return False
+
+        return RevokedToken.objects.filter(jti=jti).exists()
+
+    def revoke(self, jti, user_id, expires_at):
+        # The unique jti makes revocation a claim: of two refreshes racing on one token only one can win.
+        try:
+            with transaction.atomic():
+                RevokedToken.objects.create(
+                    jti=jti,
+                    user_id=user_id,
+                    expires_at=datetime.datetime.fromtimestamp(expires_at, datetime.timezone.utc),
+                )
+        except IntegrityError:
+            return False
+
+        self.sync()
+        self.filter.add(jti)
+
+        return True
+
+    def stats(self):
+        return self.filter.stats() if self.filter else {}
+
+
+revocation_index = RevocationIndex()
+
+
+def get_session_user(user_id):
+    session = user_cache.get(user_id)
+
+    if session is None:
+        session = User.objects.filter(id=user_id).values_list('id', 'email').first()
+
+        if session:
+            user_cache.set(user_id, session)
+
+    return session
+
+
+def invalidate_user(user_id):
+    user_cache.delete(user_id)
+
+
+def rotate_refresh_token(refresh_token, claims):
+    jti = token_id(refresh_token, claims)
+
+    if revocation_index.is_revoked(jti):
+        return None
+
+    session = get_session_user(claims.get('id'))
+
+    if not session or not revocation_index.revoke(jti, session[0], claims.get('exp')):
+        return None
+
+    return session
+
+
+def revoke_refresh_token(refresh_token):
+    try:
+        claims = jwt.decode(refresh_token, settings.REFRESH_TOKEN_SECRET, algorithms=['HS256'])
+    except jwt.InvalidTokenError:
+        return False
+
+    return revocation_index.revoke(token_id(refresh_token, claims), claims.get('id'), claims.get('exp'))
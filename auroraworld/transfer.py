@@ -0,0 +1,260 @@
+import codecs
+import csv
+import json
+from html import escape
+from html.parser import HTMLParser
+
+from .category import get_registry
+from .ids import new_id
+from .models import Link
+from .sqlite import immediate_atomic
+
+IMPORT_BATCH_SIZE = 500
+IMPORT_CHUNK_SIZE = 64 * 1024
+MAX_IMPORT_ERRORS = 100
+
+EXPORT_FIELDS = ['id', 'category_id', 'category_name', 'name', 'url']
+
+
+def read_lines(stream):
+    # The request body is read a line at a time, so an upload never has to fit in memory.
+    return codecs.iterdecode(iter(stream.readline, b''), 'utf-8-sig', errors='replace')
+
+
+def read_csv(stream):
+    yield from csv.DictReader(read_lines(stream))
+
+
+def read_ndjson(stream):
+    for line in read_lines(stream):
+        if not line.strip():
+            continue
+
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield None
+
+
+class BookmarkParser(HTMLParser):
+    # Netscape bookmark files nest <DL> lists under <H3> folder titles, with one <A> per bookmark.
+    def __init__(self):
+        super().__init__()
+
+        self.rows = []
+        self.folders = []
+        self.folder = None
+        self.tag = None
+        self.href = None
+        self.text = ''
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'dl':
+            self.folders.append(self.folder)
+            self.folder = None
+        elif tag in ('h3', 'a'):
+            self.tag = tag
+            self.href = dict(attrs).get('href')
+            self.text = ''
+
+    def handle_endtag(self, tag):
+        if tag == 'dl':
+            if self.folders:
+                self.folders.pop()
+        elif tag == 'h3' and self.tag == 'h3':
+            self.folder = self.text.strip()
+            self.tag = None
+        elif tag == 'a' and self.tag == 'a':
+            self.rows.append({'name': self.text, 'url': self.href or '', 'folders': [f for f in self.folders if f]})
+            self.tag = None
+
+    def handle_data(self, data):
+        if self.tag:
+            self.text += data
+
+
+def read_bookmarks(stream):
+    parser = BookmarkParser()
+    chunks = codecs.iterdecode(iter(lambda: stream.read(IMPORT_CHUNK_SIZE), b''), 'utf-8-sig', errors='replace')
+
+    for chunk in chunks:
+        parser.feed(chunk)
+
+        yield from parser.rows
+        parser.rows.clear()
+
+    parser.close()
+
+    yield from parser.rows
+
+
+READERS = {
+    'text/csv': read_csv,
+    'application/x-ndjson': read_ndjson,
+    'application/jsonl': read_ndjson,
+    'text/html': read_bookmarks,
+}
+
+
+def get_reader(content_type):
+    return READERS.get(content_type.split(';')[0].strip().lower())
+
+
+def clean_row(row, category_names, category_ids, default_category_id):
+    if not isinstance(row, dict):
+        return None, 'Invalid row.'
+
+    category_id = str(row.get('categoryId') or row.get('category_id') or '').strip()
+
+    if not category_id:
+        # Bookmark folders are matched to categories by name, innermost folder first.
+        folder = next((f for f in reversed(row.get('folders', [])) if f in category_ids), None)
+
+        category_id = category_ids[folder] if folder else default_category_id
+
+    name = str(row.get('name') or '').strip()
+    url = str(row.get('url') or '').strip()
+
+    if not name or not url:
+        return None, 'Missing name or url.'
+
+    if category_id not in category_names:
+        return None, 'Unknown category.'
+
+    return (category_id, category_names[category_id], name, url), None
+
+
+def import_rows(session_user_id, session_user_email, rows, default_category_id=''):
+    category_names = get_registry()['names']
+    category_ids = {category_name: category_id for category_id, category_name in category_names.items()}
+
+    created = 0
+    failed = 0
+    errors = []
+    batch = []
+
+    def flush():
+        # Each batch commits on its own, so a large import never holds the write lock for long. The lock is taken up
+        # front: the insert triggers read before they write, and that upgrade cannot wait for another writer.
+        with immediate_atomic():
+            Link.objects.bulk_create(batch)
+
+        batch.clear()
+
+    for index, row in enumerate(rows, start=1):
+        values, error = clean_row(row, category_names, category_ids, default_category_id)
+
+        if error:
+            failed += 1
+
+            if len(errors) < MAX_IMPORT_ERRORS:
+                errors.append({'row': index, 'message': error})
+
+            continue
+
+        category_id, category_name, name, url = values
+
+        batch.append(Link(
+            id=new_id(),
+            user_id=session_user_id,
+            created_by=session_user_email,
+            category_id=category_id,
+            category_name=category_name,
+            name=name,
+            url=url,
+        ))
+        created += 1
+
+        if IMPORT_BATCH_SIZE <= len(batch):
+            flush()
+
+    if batch:
+        flush()
+
+    return {'created': created, 'failed': failed, 'errors': errors}
+
+
+class EchoBuffer:
+    def write(self, value):
+        return value
+
+
+class CsvEncoder:
+    content_type = 'text/csv'
+    extension = 'csv'
+
+    def __init__(self):
+        self.writer = csv.writer(EchoBuffer())
+
+    def header(self):
+        return self.writer.writerow(EXPORT_FIELDS)
+
+    def encode(self, existing_link):
+        return self.writer.writerow([getattr(existing_link, field) for field in EXPORT_FIELDS])
+
+    def footer(self):
+        return ''
+
+
+class NdjsonEncoder:
+    content_type = 'application/x-ndjson'
+    extension = 'ndjson'
+
+    def header(self):
+        return ''
+
+    def encode(self, existing_link):
+        return json.dumps({field: getattr(existing_link, field) for field in EXPORT_FIELDS}) + '\n'
+
+    def footer(self):
+        return ''
+
+
+class BookmarkEncoder:
+    content_type = 'text/html'
+    extension = 'html'
+
+    def __init__(self):
+        self.category_id = None
+
+    def header(self):
+        return ('<!DOCTYPE NETSCAPE-Bookmark-file-1>\n'
+                '<META HTTP-EQUIV="Content-Type" CONTENT="text/html; charset=UTF-8">\n'
+                '<TITLE>Bookmarks</TITLE>\n<H1>Bookmarks</H1>\n<DL><p>\n')
+
+    def encode(self, existing_link):
+        # Links arrive grouped by category, so each category becomes one folder.
+        folder = ''
+
+        if existing_link.category_id != self.category_id:
+            folder = '</DL><p>\n' if self.category_id else ''
+            folder += f'<DT><H3>{escape(existing_link.category_name)}</H3>\n<DL><p>\n'
+
+            self.category_id = existing_link.category_id
+
+        return folder + f'<DT><A HREF="{escape(existing_link.url)}">{escape(existing_link.name)}</A>\n'
+
+    def footer(self):
+        return ('</DL><p>\n' if self.category_id else '') + '</DL><p>\n'
+
+
+ENCODERS = {
+    'csv': CsvEncoder,
+    'ndjson': NdjsonEncoder,
+    'html': BookmarkEncoder,
+}
+
+
+def get_encoder(output_format):
+    encoder = ENCODERS.get(output_format or 'ndjson')
+
+    return encoder() if encoder else None
+
+
+def export_lines(encoder, existing_links):
+    yield encoder.header()
+
+    for existing_link in existing_links:
+        yield encoder.encode(existing_link)
+
+    yield encoder.footer()
@@ -1,32 +1,50 @@
 # accounts/urls.py
 
+from django.conf import settings
 from django.urls import path
 
+from . import asyncAuth
+from . import asyncCategory
+from . import asyncLink
+from . import asyncShare
+from . import asyncUser
 from . import auth
 from . import category
 from . import link
+from . import metrics
 from . import share
 from . import user
 from . import views
 
+auth_views = asyncAuth if settings.ASYNC_VIEWS else auth
+category_views = asyncCategory if settings.ASYNC_VIEWS else category
+link_views = asyncLink if settings.ASYNC_VIEWS else link
+share_views = asyncShare if settings.ASYNC_VIEWS else share
+user_views = asyncUser if settings.ASYNC_VIEWS else user
+
 urlpatterns = [
     path('', views.index),
+    path('metrics', metrics.get_metrics),
 
-    path('auth/refresh', auth.refresh),
-    path('auth/sign-in', auth.sign_in),
-    path('auth/sign-out', auth.sign_out),
-    path('auth/sign-up', auth.sign_up),
+    path('auth/refresh', auth_views.refresh),
+    path('auth/sign-in', auth_views.sign_in),
+    path('auth/sign-out', auth_views.sign_out),
+    path('auth/sign-up', auth_views.sign_up),
 
-    path('api/categories', category.get_categories),
+    path('api/categories', category_views.get_categories),
 
-    path('api/link', link.add_link),
-    path('api/links', link.get_links),
-    path('api/link/<str:link_id>', link.remove_update_link),
+    path('api/link', link_views.add_link),
+    path('api/links', link_views.get_links),
+    path('api/links/import', link_views.import_links),
+    path('api/links/export', link_views.export_links),
+    path('api/links/batch', link_views.batch_links),
+    path('api/link/<str:link_id>', link_views.remove_update_link),
 
-    path('api/share', share.add_share),
-    path('api/shares', share.add_shares),
-    path('api/shares/<str:link_id>', share.get_shares),
-    path('api/share/<str:share_id>', share.remove_update_share),
+    path('api/share', share_views.add_share),
+    path('api/shares', share_views.add_shares),
+    path('api/shares/batch', share_views.batch_shares),
+    path('api/shares/<str:link_id>', share_views.get_shares),
+    path('api/share/<str:share_id>', share_views.remove_update_share),
 
-    path('api/users', user.get_users),
+    path('api/users', user_views.get_users),
 ]
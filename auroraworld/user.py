@@ -1,29 +1,124 @@
+from django.db.models import Q, Max
+from django.db.models.functions import Lower
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 
-from auroraworld.models import User
+from auroraworld.etag import make_etag, etag_matches, not_modified
+from auroraworld.models import User, Share
+from auroraworld.paging import parse_limit
+from auroraworld.ratelimit import rate_limit
+from auroraworld.routers import read_from_replica
 from auroraworld.verifyToken import verify_token
+from auroraworld.versions import USERS_KEY, get_versions, links_key
 
+MAX_LIMIT = 1000
+RECENT_LIMIT = 10
 
+# Sorts before every user, for when recent recipients alone fill the first page.
+DIRECTORY_START = ':'
+
+
+def filter_users(session_user_id, q):
+    existing_users = User.objects.exclude(id=session_user_id).annotate(email_lower=Lower('email'))
+
+    if q:
+        # A range over lower(email) lets SQLite walk users_email_lower_idx instead of scanning with LIKE.
+        prefix = q.lower()
+        existing_users = existing_users.filter(email_lower__gte=prefix, email_lower__lt=prefix + '\U0010ffff')
+
+    return existing_users.order_by('email_lower', 'id')
+
+
+def paginate_users(existing_users, cursor):
+    email_lower, _, user_id = cursor.rpartition(':')
+
+    return existing_users.filter(Q(email_lower__gt=email_lower) | Q(email_lower=email_lower, id__gt=user_id))
+
+
+def user_cursor(existing_user):
+    return f'{existing_user.email_lower}:{existing_user.id}'
+
+
+def filter_recent_recipients(session_user_id, limit=None):
+    # Recent recipients count against the first page, so a smaller limit shows fewer of them and leaves the rest to
+    # the directory pages.
+    return Share.objects.filter(link__user_id=session_user_id).exclude(user_id=session_user_id) \
+        .values('user_id').annotate(shared_at=Max('updated_at')).order_by('-shared_at') \
+        .values_list('user_id', flat=True)[:min(RECENT_LIMIT, limit or RECENT_LIMIT)]
+
+
+def page_cursor(existing_users, page_limit):
+    # Trims a page fetched with one extra row and returns it with the cursor to the next page, if there is one.
+    if len(existing_users) <= page_limit:
+        return existing_users, None
+
+    existing_users = existing_users[:page_limit]
+
+    return existing_users, user_cursor(existing_users[-1]) if existing_users else DIRECTORY_START
+
+
+def serialize_user(existing_user):
+    return {
+        'id': existing_user.id,
+        'email': existing_user.email,
+    }
+
+
+@rate_limit
 @verify_token
+@read_from_replica
 @api_view(['GET'])
 def get_users(request):
     try:
+        q = request.GET.get('q', '').strip()
+        limit = request.GET.get('limit', '').strip()
+        cursor = request.GET.get('cursor', '').strip()
+        recent = request.GET.get('recent', '').strip() in ('1', 'true')
+
+        try:
+            limit = parse_limit(limit, cursor, MAX_LIMIT)
+        except ValueError:
+            return Response({'message': 'Invalid Input'}, status=400)
+
         session_user_id = getattr(request, 'user_id', None)
         session_user_email = getattr(request, 'user_email', None)
 
         if not session_user_id or not session_user_email:
             return Response({'message': 'Unauthorized'}, status=401)
 
-        existing_users = User.objects.exclude(id=session_user_id)
+        existing_users = filter_users(session_user_id, q)
+
+        # The directory changes with any user; the recent recipients with the shares on the caller's links.
+        versions = get_versions(USERS_KEY, links_key(session_user_id))
+        etag = make_etag(session_user_id, q, limit, cursor, recent, versions)
+
+        if etag_matches(request, etag):
+            return not_modified(etag)
+
+        recent_users = []
+
+        if recent:
+            recent_user_ids = list(filter_recent_recipients(session_user_id, limit))
+
+            if not cursor:
+                recent_users = sorted(existing_users.filter(id__in=recent_user_ids),
+                                      key=lambda existing_user: recent_user_ids.index(existing_user.id))
+
+            existing_users = existing_users.exclude(id__in=recent_user_ids)
+
+        if cursor:
+            existing_users = paginate_users(existing_users, cursor)
+
+        next_cursor = None
+
+        if limit:
+            page_limit = limit - len(recent_users)
+            existing_users, next_cursor = page_cursor(list(existing_users[:page_limit + 1]), page_limit)
 
         return Response({'message': '', 'data': [
-            {
-                'id': existing_user.id,
-                'email': existing_user.email,
-            }
-            for existing_user in existing_users
-        ]}, status=200)
+            serialize_user(existing_user)
+            for existing_user in recent_users + list(existing_users)
+        ], 'next': next_cursor}, status=200, headers={'ETag': etag})
     except Exception as error:
         print(error)
 
@@ -0,0 +1,106 @@
+from .models import ListVersion
+
+# list_versions holds a high-water mark per list: 'links:<user id>' for everything get_links can show that user,
+# 'shares:<link id>' for get_shares on that link, and 'users' for the user directory. Triggers move it on for every
+# change to the rows behind the list, so single saves, bulk inserts, queryset updates and cascaded deletes are all
+# covered, as in access.py. Versions are microsecond timestamps kept strictly increasing, so a restored or recreated
+# database never reissues an old ETag.
+# Migrations that rebuild the links, shares or users table drop these triggers, so they must reinstall them from a
+# copy of this SQL, as 0008_list_versions and 0009_share_versions do.
+USERS_KEY = 'users'
+
+NOW_SQL = "CAST((julianday('now') - 2440587.5) * 86400000000 AS INTEGER)"
+
+
+def bump(keys):
+    # The WHERE clause is required for SQLite to parse ON CONFLICT after INSERT ... SELECT.
+    return (f'INSERT INTO list_versions (key, version) SELECT key, {NOW_SQL} FROM ({keys}) WHERE true '
+            f'ON CONFLICT (key) DO UPDATE SET version = max(version + 1, excluded.version);')
+
+
+def link_lists(row):
+    # The link's owner and everyone it is shared with, and the link's shares, whose owner check reads the link.
+    return (f"SELECT 'links:' || {row}.user_id AS key "
+            f"UNION SELECT 'links:' || user_id FROM shares WHERE link_id = {row}.id "
+            f"UNION SELECT 'shares:' || {row}.id")
+
+
+def share_lists(row):
+    # The recipient, who sees the link in get_links, the owner, whose recent recipients change, and the link's shares.
+    return (f"SELECT 'links:' || {row}.user_id AS key "
+            f"UNION SELECT 'links:' || user_id FROM links WHERE id = {row}.link_id "
+            f"UNION SELECT 'shares:' || {row}.link_id")
+
+
+CREATE_SQL = [
+    f"""CREATE TRIGGER IF NOT EXISTS versions_link_insert AFTER INSERT ON links BEGIN
+        {bump(link_lists('new'))}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS versions_link_update AFTER UPDATE ON links BEGIN
+        {bump(link_lists('old') + ' UNION ' + link_lists('new'))}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS versions_link_delete AFTER DELETE ON links BEGIN
+        {bump(link_lists('old'))}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS versions_share_insert AFTER INSERT ON shares BEGIN
+        {bump(share_lists('new'))}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS versions_share_update AFTER UPDATE ON shares BEGIN
+        {bump(share_lists('old') + ' UNION ' + share_lists('new'))}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS versions_share_delete AFTER DELETE ON shares BEGIN
+        {bump(share_lists('old'))}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS versions_user_insert AFTER INSERT ON users BEGIN
+        {bump(f"SELECT '{USERS_KEY}' AS key UNION SELECT 'links:' || new.id")}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS versions_user_update AFTER UPDATE OF id, email ON users BEGIN
+        {bump(f"SELECT '{USERS_KEY}' AS key")}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS versions_user_delete AFTER DELETE ON users BEGIN
+        {bump(f"SELECT '{USERS_KEY}' AS key")}
+    END""",
+]
+
+DROP_SQL = [
+    'DROP TRIGGER IF EXISTS versions_link_insert',
+    'DROP TRIGGER IF EXISTS versions_link_update',
+    'DROP TRIGGER IF EXISTS versions_link_delete',
+    'DROP TRIGGER IF EXISTS versions_share_insert',
+    'DROP TRIGGER IF EXISTS versions_share_update',
+    'DROP TRIGGER IF EXISTS versions_share_delete',
+    'DROP TRIGGER IF EXISTS versions_user_insert',
+    'DROP TRIGGER IF EXISTS versions_user_update',
+    'DROP TRIGGER IF EXISTS versions_user_delete',
+]
+
+# Every list starts from the time the triggers were installed.
+SEED_SQL = [
+    bump(f"SELECT '{USERS_KEY}' AS key UNION SELECT 'links:' || id FROM users "
+         "UNION SELECT 'shares:' || id FROM links"),
+]
+
+
+def links_key(user_id):
+    return f'links:{user_id}'
+
+
+def shares_key(link_id):
+    return f'shares:{link_id}'
+
+
+def version_query(keys):
+    return ListVersion.objects.filter(key__in=keys).values_list('key', 'version')
+
+
+def get_versions(*keys):
+    # One primary key lookup for all the lists an ETag depends on; a list never changed yet reads as 0.
+    versions = dict(version_query(keys))
+
+    return [versions.get(key, 0) for key in keys]
+
+
+async def aget_versions(*keys):
+    versions = {key: version async for key, version in version_query(keys)}
+
+    return [versions.get(key, 0) for key in keys]
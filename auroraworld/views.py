@@ -1,5 +1,13 @@
 from django.shortcuts import render
+from django.views.generic import RedirectView
+
+from .compression import serve_precompressed
 
 
 def index(request):
-    return render(request, 'index.html')
+    return serve_precompressed(request, 'index.html', 'text/html; charset=utf-8') or render(request, 'index.html')
+
+
+def favicon(request):
+    return serve_precompressed(request, 'favicon.ico', 'image/x-icon') \
+        or RedirectView.as_view(url='static/favicon.ico', permanent=True)(request)
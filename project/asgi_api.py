@@ -0,0 +1,14 @@
+"""
+ASGI config for API-only deployments, using the settings in project.settings_api.
+
+Serve it with ``uvicorn project.asgi_api:application``, with ``ASYNC_VIEWS=True`` for the async views.
+"""
+
+import os
+
+from django.core.asgi import get_asgi_application
+
+# Set rather than defaulted, so a DJANGO_SETTINGS_MODULE left over from the full profile cannot load it here.
+os.environ['DJANGO_SETTINGS_MODULE'] = 'project.settings_api'
+
+application = get_asgi_application()
@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
 import os
+import tempfile
 from pathlib import Path
 
 import environ
@@ -24,6 +25,20 @@ environ.Env.read_env(os.path.join(BASE_DIR, '.env'))
 ORIGINS = env('ORIGINS', default='http://localhost:5173')
 ACCESS_TOKEN_SECRET = env('ACCESS_TOKEN_SECRET', default='9aq~&_8F<Qq=>EZzwhWFE=DJ$dI+<T')
 REFRESH_TOKEN_SECRET = env('REFRESH_TOKEN_SECRET', default='DaL0`oWAXQ.z|uLPf6rBwYS$^CRyV8')
+ASYNC_VIEWS = env.bool('ASYNC_VIEWS', default=False)
+TOKEN_CACHE_SIZE = env.int('TOKEN_CACHE_SIZE', default=10000)
+TOKEN_CACHE_TTL = env.int('TOKEN_CACHE_TTL', default=300)
+FAST_JSON = env.bool('FAST_JSON', default=False)
+METRICS_ENABLED = env.bool('METRICS_ENABLED', default=True)
+METRICS_TOKEN = env('METRICS_TOKEN', default='')
+SLOW_REQUEST_MS = env.int('SLOW_REQUEST_MS', default=500)
+ID_GENERATOR = env('ID_GENERATOR', default='uuid7')
+USER_CACHE_SIZE = env.int('USER_CACHE_SIZE', default=10000)
+USER_CACHE_TTL = env.int('USER_CACHE_TTL', default=60)
+REVOCATION_FILTER_CAPACITY = env.int('REVOCATION_FILTER_CAPACITY', default=1000000)
+REVOCATION_FILTER_ERROR_RATE = env.float('REVOCATION_FILTER_ERROR_RATE', default=0.001)
+REVOCATION_SYNC_SECONDS = env.float('REVOCATION_SYNC_SECONDS', default=1.0)
+REVOCATION_PURGE_SECONDS = env.float('REVOCATION_PURGE_SECONDS', default=60 * 60)
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/4.2/howto/deployment/checklist/
@@ -50,6 +65,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'auroraworld.middleware.MetricsMiddleware',
+    'auroraworld.middleware.CompressionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -60,6 +77,14 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# FastJSONRenderer is JSONRenderer until FAST_JSON is set (and orjson is installed). The browsable API is left out in
+# that mode so content negotiation only has one renderer to consider.
+REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': ['auroraworld.renderers.FastJSONRenderer'] + (
+        [] if FAST_JSON else ['rest_framework.renderers.BrowsableAPIRenderer']
+    ),
+}
+
 CORS_ALLOWED_ORIGINS = (ORIGINS or 'http://localhost:5173').split(',')
 CORS_ALLOW_CREDENTIALS = True
 
@@ -90,9 +115,54 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': env.int('CONN_MAX_AGE', default=60),
+    }
+}
+
+# Setting DATABASE_READ_NAME adds a read-only 'replica' alias (for example a copied snapshot of db.sqlite3).
+DATABASE_READ_NAME = env('DATABASE_READ_NAME', default='')
+
+if DATABASE_READ_NAME:
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': DATABASE_READ_NAME,
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['auroraworld.routers.ReadReplicaRouter']
+READ_DATABASE = 'replica' if DATABASE_READ_NAME else 'default'
+# Seconds a user keeps reading from the primary after a write, so they see their own changes. The users this
+# applies to are kept in READ_STICKY_DATABASE, a file shared by the workers on a host.
+READ_STICKY_SECONDS = env.int('READ_STICKY_SECONDS', default=5)
+READ_STICKY_DATABASE = env('READ_STICKY_DATABASE',
+                           default=os.path.join(tempfile.gettempdir(), 'auroraworld-sticky.sqlite3'))
+READ_STICKY_BUSY_TIMEOUT = env.int('READ_STICKY_BUSY_TIMEOUT', default=50)
+
+# Applied to every new SQLite connection by auroraworld.signals.configure_connection.
+SQLITE_PRAGMAS = env.bool('SQLITE_PRAGMAS', default=True)
+SQLITE_JOURNAL_MODE = env('SQLITE_JOURNAL_MODE', default='WAL')
+SQLITE_SYNCHRONOUS = env('SQLITE_SYNCHRONOUS', default='NORMAL')
+SQLITE_BUSY_TIMEOUT = env.int('SQLITE_BUSY_TIMEOUT', default=5000)
+SQLITE_MMAP_SIZE = env.int('SQLITE_MMAP_SIZE', default=256 * 1024 * 1024)
+SQLITE_CACHE_SIZE = env.int('SQLITE_CACHE_SIZE', default=-64 * 1024)
+SQLITE_TEMP_STORE = env('SQLITE_TEMP_STORE', default='MEMORY')
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': env('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': env('CACHE_LOCATION', default='auroraworld'),
     }
 }
 
+# LocMemCache is per process, so with several workers a category change made in one reaches the others only when
+# their cached version expires after CATEGORY_CACHE_TTL seconds. A shared CACHE_BACKEND (Redis, Memcached) makes it
+# immediate.
+CATEGORY_CACHE = 'default'
+CATEGORY_CACHE_TTL = env.int('CATEGORY_CACHE_TTL', default=10)
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -111,6 +181,28 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Password hashing
+# https://docs.djangoproject.com/en/4.2/topics/auth/passwords/
+
+PASSWORD_HASHER = env('PASSWORD_HASHER', default='pbkdf2')
+
+PASSWORD_HASHERS = sorted([
+    'auroraworld.hashers.TunedPBKDF2PasswordHasher',
+    'auroraworld.hashers.TunedScryptPasswordHasher',
+    'auroraworld.hashers.TunedArgon2PasswordHasher',
+], key=lambda hasher: PASSWORD_HASHER.lower() not in hasher.lower())
+
+PBKDF2_ITERATIONS = env.int('PBKDF2_ITERATIONS', default=600000)
+SCRYPT_WORK_FACTOR = env.int('SCRYPT_WORK_FACTOR', default=2 ** 14)
+SCRYPT_BLOCK_SIZE = env.int('SCRYPT_BLOCK_SIZE', default=8)
+SCRYPT_PARALLELISM = env.int('SCRYPT_PARALLELISM', default=1)
+ARGON2_TIME_COST = env.int('ARGON2_TIME_COST', default=2)
+ARGON2_MEMORY_COST = env.int('ARGON2_MEMORY_COST', default=102400)
+ARGON2_PARALLELISM = env.int('ARGON2_PARALLELISM', default=8)
+
+# Hashing runs in a dedicated process pool so logins do not hold request threads on the CPU; 0 hashes inline.
+PASSWORD_HASHING_WORKERS = env.int('PASSWORD_HASHING_WORKERS', default=max(1, (os.cpu_count() or 2) // 2))
+
 # Internationalization
 # https://docs.djangoproject.com/en/4.2/topics/i18n/
 
@@ -127,6 +219,38 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# Response compression. Encodings are tried in this order; brotli and zstd need the brotli and zstandard packages.
+COMPRESSION_ENCODINGS = env.list('COMPRESSION_ENCODINGS', default=['zstd', 'br', 'gzip'])
+COMPRESSION_MIN_SIZE = env.int('COMPRESSION_MIN_SIZE', default=1024)
+COMPRESSION_STREAM_FLUSH_BYTES = env.int('COMPRESSION_STREAM_FLUSH_BYTES', default=16 * 1024)
+COMPRESSION_EXCLUDED_PATHS = tuple(env.list('COMPRESSION_EXCLUDED_PATHS', default=['/auth/']))
+COMPRESSION_GZIP_LEVEL = env.int('COMPRESSION_GZIP_LEVEL', default=6)
+COMPRESSION_BROTLI_QUALITY = env.int('COMPRESSION_BROTLI_QUALITY', default=4)
+COMPRESSION_ZSTD_LEVEL = env.int('COMPRESSION_ZSTD_LEVEL', default=3)
+
+# Written by the precompress_static command and served without compressing per request.
+PRECOMPRESSED_ROOT = BASE_DIR / 'precompressed'
+PRECOMPRESSED_MAX_AGE = env.int('PRECOMPRESSED_MAX_AGE', default=24 * 60 * 60)
+
+# Token buckets per route, keyed by user or, on the auth routes, by client IP. '10/minute' allows a burst of 10
+# refilled at 10 a minute; '*' covers every other decorated route. The file is shared by the workers on a host.
+RATE_LIMIT_ENABLED = env.bool('RATE_LIMIT_ENABLED', default=True)
+RATE_LIMIT_DATABASE = env('RATE_LIMIT_DATABASE',
+                          default=os.path.join(tempfile.gettempdir(), 'auroraworld-ratelimit.sqlite3'))
+RATE_LIMIT_IP_HEADER = env('RATE_LIMIT_IP_HEADER', default='REMOTE_ADDR')
+# Milliseconds a check waits for another worker's write before letting the request through unchecked.
+RATE_LIMIT_BUSY_TIMEOUT = env.int('RATE_LIMIT_BUSY_TIMEOUT', default=50)
+RATE_LIMIT_IDLE_SECONDS = env.int('RATE_LIMIT_IDLE_SECONDS', default=24 * 60 * 60)
+RATE_LIMIT_PRUNE_PROBABILITY = env.float('RATE_LIMIT_PRUNE_PROBABILITY', default=0.001)
+RATE_LIMITS = {
+    '*': env('RATE_LIMIT_DEFAULT', default='600/minute'),
+    'auth/refresh': env('RATE_LIMIT_REFRESH', default='30/minute'),
+    'auth/sign-in': env('RATE_LIMIT_SIGN_IN', default='10/minute'),
+    'auth/sign-out': env('RATE_LIMIT_SIGN_OUT', default='30/minute'),
+    'auth/sign-up': env('RATE_LIMIT_SIGN_UP', default='5/minute'),
+    'api/links/import': env('RATE_LIMIT_IMPORT', default='10/minute'),
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
@@ -0,0 +1,43 @@
+"""
+Settings for API-only deployments, served by project.wsgi_api and project.asgi_api.
+
+The API authenticates with JWTs in verify_token, so the admin, sessions, messages, CSRF, contrib.auth and
+clickjacking layers of the full profile do nothing for it but cost imports and per-request work.
+"""
+
+from .settings import *  # noqa: F401, F403
+from .settings import REST_FRAMEWORK
+
+INSTALLED_APPS = [
+    'corsheaders',
+    'auroraworld',
+]
+
+MIDDLEWARE = [
+    'auroraworld.middleware.MetricsMiddleware',
+    'auroraworld.middleware.CompressionMiddleware',
+    'corsheaders.middleware.CorsMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'django.middleware.common.CommonMiddleware',
+]
+
+# No authentication classes means DRF never asks contrib.auth for a user (or a session) on the way into a view.
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    'DEFAULT_AUTHENTICATION_CLASSES': [],
+    'DEFAULT_PERMISSION_CLASSES': [],
+    'UNAUTHENTICATED_USER': None,
+}
+
+# Only the index page is rendered, and only when precompress_static has not been run.
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [],
+        'APP_DIRS': True,
+    },
+]
+
+AUTH_PASSWORD_VALIDATORS = []
+
+WSGI_APPLICATION = 'project.wsgi_api.application'
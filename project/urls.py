@@ -14,12 +14,18 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
-from django.contrib import admin
+from django.apps import apps
 from django.urls import path, include
-from django.views.generic import RedirectView
+
+from auroraworld import views
 
 urlpatterns = [
     path('', include('auroraworld.urls')),
-    path('admin/', admin.site.urls),
-    path('favicon.ico', RedirectView.as_view(url='static/favicon.ico', permanent=True)),
+    path('favicon.ico', views.favicon),
 ]
+
+# The API-only profile (project.settings_api) leaves the admin out.
+if apps.is_installed('django.contrib.admin'):
+    from django.contrib import admin
+
+    urlpatterns.append(path('admin/', admin.site.urls))
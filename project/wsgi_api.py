@@ -0,0 +1,14 @@
+"""
+WSGI config for API-only deployments, using the settings in project.settings_api.
+
+Serve it with ``gunicorn project.wsgi_api``.
+"""
+
+import os
+
+from django.core.wsgi import get_wsgi_application
+
+# Set rather than defaulted, so a DJANGO_SETTINGS_MODULE left over from the full profile cannot load it here.
+os.environ['DJANGO_SETTINGS_MODULE'] = 'project.settings_api'
+
+application = get_wsgi_application()